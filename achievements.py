@@ -0,0 +1,215 @@
+"""
+محرك الإنجازات (Achievement Rule Engine).
+
+الإنجازات قواعد تعريفية في ملف بيانات مرفق (data/achievements.json) يُتحقق
+من مخططه عند التحميل، كل قاعدة تشترك في حدث واحد:
+- tap: نقرة صحيحة أثناء اللعب (mode، clicks).
+- game_end: نهاية لعبة (mode، score، clicks، taps، wrong_taps، penalties،
+  coins_gained، time_survived، total_games، total_clicks).
+- streak: جمع المكافأة اليومية (streak_day).
+- coins: تغيّر رصيد العملات (coins).
+
+شكل القاعدة:
+    {"id", "name", "description", "on": الحدث,
+     "when": {"field": [op, value], ...},          # شروط اختيارية (كلها)
+     "progress": {"target": N, "field": "clicks",  # تقدّم اختياري نحو هدف
+                  "accumulate": false}}            # true: مجموع عبر الأحداث، false: أفضل قيمة
+
+الفهرس: (الحدث، الوضع) -> القواعد المقفلة فقط؛ القاعدة المشروطة بـ mode == X
+تُفهرس تحت الوضع X، والبقية تحت None. الحدث يقيّم قواعد مفتاحيه فقط، والقاعدة
+المفتوحة تُزال من الفهرس، فكلفة كل حدث لا تتعلق بحجم الكتالوج.
+الوحدة لا تعتمد على Kivy.
+"""
+import json
+import operator
+from types import MappingProxyType
+
+EVENT_TAP = 'tap'
+EVENT_GAME_END = 'game_end'
+EVENT_STREAK = 'streak'
+EVENT_COINS = 'coins'
+EVENTS = (EVENT_TAP, EVENT_GAME_END, EVENT_STREAK, EVENT_COINS)
+
+OPERATORS = {
+    '==': operator.eq, '!=': operator.ne,
+    '>': operator.gt, '>=': operator.ge,
+    '<': operator.lt, '<=': operator.le,
+}
+
+_RULE_FIELDS = {'id': True, 'name': True, 'description': False, 'on': True, 'when': False, 'progress': False}
+_PROGRESS_FIELDS = {'target', 'field', 'accumulate'}
+
+
+class AchievementError(ValueError):
+    """خطأ في بيانات الإنجازات (مخطط غير صالح أو معرّف مكرر)."""
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def validate_rule(rule, index=0):
+    """التحقق من قاعدة واحدة وإرجاع نسخة مجمّدة منها (الشروط كـ tuples جاهزة للتقييم)."""
+    where = f"rule #{index} ({rule.get('id', '?') if isinstance(rule, dict) else '?'})"
+    if not isinstance(rule, dict):
+        raise AchievementError(f"{where}: expected an object")
+    unknown = set(rule) - set(_RULE_FIELDS)
+    if unknown:
+        raise AchievementError(f"{where}: unknown fields {sorted(unknown)}")
+    missing = [name for name, required in _RULE_FIELDS.items() if required and name not in rule]
+    if missing:
+        raise AchievementError(f"{where}: missing fields {missing}")
+    if not isinstance(rule['id'], str) or not rule['id']:
+        raise AchievementError(f"{where}: id must be a non-empty string")
+    if rule['on'] not in EVENTS:
+        raise AchievementError(f"{where}: unknown event {rule['on']!r}")
+
+    conditions = []
+    mode = None
+    for field, test in (rule.get('when') or {}).items():
+        if (not isinstance(test, (list, tuple)) or len(test) != 2 or test[0] not in OPERATORS):
+            raise AchievementError(f"{where}: condition on {field!r} must be [op, value]")
+        op, value = test
+        if field == 'mode' and op == '==':
+            mode = value    # يحدد مفتاح الفهرس بدل تقييمه عند كل حدث
+            continue
+        conditions.append((field, OPERATORS[op], value))
+
+    progress = rule.get('progress')
+    if progress is not None:
+        if not isinstance(progress, dict) or set(progress) - _PROGRESS_FIELDS:
+            raise AchievementError(f"{where}: progress accepts only {sorted(_PROGRESS_FIELDS)}")
+        if not _is_number(progress.get('target')) or progress['target'] <= 0:
+            raise AchievementError(f"{where}: progress target must be a positive number")
+        if not progress.get('accumulate') and not isinstance(progress.get('field'), str):
+            raise AchievementError(f"{where}: progress needs a field unless it accumulates")
+        progress = MappingProxyType({'target': progress['target'], 'field': progress.get('field'),
+                                     'accumulate': bool(progress.get('accumulate'))})
+
+    frozen = dict(rule)
+    frozen['description'] = rule.get('description', '')
+    frozen['mode'] = mode
+    frozen['conditions'] = tuple(conditions)
+    frozen['progress'] = progress
+    return MappingProxyType(frozen)
+
+
+def load_rules(path):
+    """تحميل القواعد من ملف JSON بالشكل {"achievements": [...]} مع التحقق من المخطط."""
+    with open(path, 'r', encoding='utf-8') as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as e:
+            raise AchievementError(f"{path}: invalid JSON ({e})") from e
+    if not isinstance(data, dict) or not isinstance(data.get('achievements'), list):
+        raise AchievementError(f"{path}: expected an object with an 'achievements' list")
+    return rules_from_list(data['achievements'])
+
+
+def rules_from_list(items):
+    rules = tuple(validate_rule(item, i) for i, item in enumerate(items))
+    seen = set()
+    for rule in rules:
+        if rule['id'] in seen:
+            raise AchievementError(f"duplicate achievement id {rule['id']!r}")
+        seen.add(rule['id'])
+    return rules
+
+
+class AchievementEngine:
+    """
+    rules: القواعد المحققة (load_rules). unlocked: المعرّفات المفتوحة مسبقًا.
+    progress: التقدم المحفوظ ({id: قيمة}). on_unlock(rule) تُستدعى عند كل فتح.
+    """
+
+    def __init__(self, rules, unlocked=(), progress=None, on_unlock=None):
+        self.rules = tuple(rules)
+        self.by_id = MappingProxyType({rule['id']: rule for rule in self.rules})
+        self.on_unlock = on_unlock
+        self._listeners = []
+        self._progress = {key: value for key, value in (progress or {}).items() if key in self.by_id}
+        self.progress_dirty = False     # تغيّر منذ آخر progress_snapshot()
+        self.progress_version = 0       # يزيد مع كل تغيّر (للعرض)
+        unlocked = set(unlocked)
+        self._index = {}
+        for rule in self.rules:
+            if rule['id'] not in unlocked:
+                self._index.setdefault((rule['on'], rule['mode']), {})[rule['id']] = rule
+
+    def __len__(self):
+        """عدد القواعد التي ما زالت مقفلة (في الفهرس)."""
+        return sum(len(rules) for rules in self._index.values())
+
+    def add_listener(self, callback):
+        """callback(rule) بعد كل فتح (لتحديث العرض دون إعادة مسح كل الإنجازات)."""
+        self._listeners.append(callback)
+
+    def dispatch(self, event, mode=None, **fields):
+        """تقييم القواعد المقفلة المشتركة في الحدث فقط؛ تُرجع قائمة المفتوح الآن."""
+        index = self._index
+        general = index.get((event, None))
+        specific = index.get((event, mode)) if mode is not None else None
+        if not general and not specific:
+            return []
+        fields['mode'] = mode
+        unlocked = []
+        for rules in (general, specific):
+            if rules:
+                for rule in rules.values():
+                    if self._evaluate(rule, fields):
+                        unlocked.append(rule)
+        for rule in unlocked:
+            self._retire(rule)
+        return [rule['id'] for rule in unlocked]
+
+    def _evaluate(self, rule, fields):
+        for field, test, value in rule['conditions']:
+            actual = fields.get(field)
+            if actual is None or not test(actual, value):
+                return False
+        progress = rule['progress']
+        if progress is None:
+            return True
+        rule_id = rule['id']
+        current = self._progress.get(rule_id, 0)
+        field = progress['field']
+        if progress['accumulate']:
+            step = fields.get(field, 0) if field else 1
+            if not step:
+                return False
+            current += step
+        else:
+            value = fields.get(field)
+            if value is None or value <= current:
+                return current >= progress['target']
+            current = value
+        self._progress[rule_id] = current
+        self.progress_dirty = True
+        self.progress_version += 1
+        return current >= progress['target']
+
+    def _retire(self, rule):
+        rules = self._index.get((rule['on'], rule['mode']))
+        if rules is not None:
+            rules.pop(rule['id'], None)
+            if not rules:
+                del self._index[(rule['on'], rule['mode'])]
+        self._progress.pop(rule['id'], None)
+        self.progress_dirty = True
+        self.progress_version += 1
+        if self.on_unlock is not None:
+            self.on_unlock(rule)
+        for listener in self._listeners:
+            listener(rule)
+
+    def progress(self, rule_id):
+        """(القيمة الحالية، الهدف) لقاعدة بتقدم، أو None."""
+        rule = self.by_id.get(rule_id)
+        if rule is None or rule['progress'] is None:
+            return None
+        return self._progress.get(rule_id, 0), rule['progress']['target']
+
+    def progress_snapshot(self):
+        """التقدم غير المكتمل للحفظ ({id: قيمة})، ويصفّر علامة التغيير."""
+        self.progress_dirty = False
+        return dict(self._progress)
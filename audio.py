@@ -0,0 +1,210 @@
+"""
+مؤثرات صوتية بزمن استجابة منخفض (Audio Feedback).
+
+تحميل ملف صوت (SoundLoader.load) يقرأه ويفك ترميزه، وهذا لا يحدث على مسار
+النقرة أبدًا: كل مؤثر يُحمَّل مسبقًا في إطارات الخمول بعد الإقلاع إلى مجموعة أصوات
+(voice pool)، صوت واحد في كل خطوة. التشغيل بعدها play() على صوت جاهز فقط؛ المؤثر
+الذي لم يكتمل تحميله بعد يُتخطى ولا يُحمَّل عند الطلب.
+
+مزود Kivy يشغّل كل كائن Sound مرة واحدة في الوقت نفسه (play() أثناء التشغيل تعيده
+من أوله)، لذا لكل مؤثر عدة أصوات بالتناوب حتى تتداخل النقرات المتقاربة. الحدود
+تحت عاصفة نقرات:
+- نفس المؤثر لا يُعاد قبل RETRIGGER_INTERVAL (النقرات الأسرع يكفيها صوت واحد).
+- إن انشغلت كل أصوات المؤثر يُعاد تشغيل أقدمها (voice stealing).
+- الأصوات المتزامنة لكل المؤثرات لا تتجاوز MAX_VOICES؛ الزائد يُسقط.
+
+trigger() تُرجع زمن الاستجابة (من لحظة الطلب حتى عودة play()) بالملي ثانية، أو None
+إن لم يُشغَّل شيء. NullLoader مزود بلا جهاز صوت للأدوات والتشغيل بلا واجهة.
+الوحدة لا تعتمد على Kivy: المحمِّل (loader) يُمرَّر عند الإنشاء.
+"""
+import logging
+import os
+import time
+
+Logger = logging.getLogger('kivy')
+
+SOUND_DIR = 'data/sounds'
+
+SFX_TAP = 'tap'
+SFX_WRONG = 'wrong'
+SFX_POWERUP = 'powerup'
+SFX_REACTION = 'reaction'
+# المؤثر -> (الملف، عدد الأصوات)، بترتيب التحميل المسبق
+EFFECTS = {
+    SFX_TAP: ('tap.wav', 4),
+    SFX_REACTION: ('reaction.wav', 2),
+    SFX_WRONG: ('wrong.wav', 2),
+    SFX_POWERUP: ('powerup.wav', 1),
+}
+
+MAX_VOICES = 6                 # أصوات متزامنة لكل المؤثرات
+RETRIGGER_INTERVAL = 0.035     # ثوانٍ بين تشغيلين لنفس المؤثر
+MIN_VOICE_TIME = 0.05          # مدة الصوت إن لم يبلّغ المزود طوله
+
+
+class Voice:
+    """صوت محمّل واحد وموعد انتهاء تشغيله الحالي (ساعة المحرك)."""
+    __slots__ = ('sound', 'length', 'busy_until')
+
+    def __init__(self, sound):
+        self.sound = sound
+        self.length = max(getattr(sound, 'length', 0) or 0, MIN_VOICE_TIME)
+        self.busy_until = 0.0
+
+
+class AudioEngine:
+    """
+    loader(path) يُرجع كائنًا بواجهة Kivy Sound (play/stop/volume/length) أو None.
+    effects بصيغة EFFECTS؛ الملفات نسبية إلى sound_dir.
+    """
+
+    def __init__(self, loader, effects=EFFECTS, sound_dir=SOUND_DIR, max_voices=MAX_VOICES,
+                 retrigger=RETRIGGER_INTERVAL, volume=1.0, clock=time.perf_counter):
+        self.loader = loader
+        self.max_voices = max_voices
+        self.retrigger = retrigger
+        self.volume = volume
+        self.clock = clock
+        self.enabled = True
+        self._pools = {name: [] for name in effects}
+        self._last = {name: float('-inf') for name in effects}
+        self._preload = [(name, os.path.join(sound_dir, filename))
+                         for name, (filename, voices) in effects.items() for _ in range(voices)]
+        self._failed = set()
+        self.stats = {'triggered': 0, 'played': 0, 'coalesced': 0, 'stolen': 0, 'dropped': 0,
+                      'not_loaded': 0, 'loaded': 0, 'load_ms': 0.0}
+
+    # --- التحميل المسبق ---
+
+    @property
+    def ready(self):
+        return not self._preload
+
+    def preload_step(self):
+        """تحميل صوت واحد (خطوة خمول واحدة)؛ تُرجع True إن بقي ما يُحمَّل."""
+        while self._preload:
+            name, path = self._preload.pop(0)
+            if name in self._failed:
+                continue
+            started = self.clock()
+            sound = self.loader(path)
+            self.stats['load_ms'] += (self.clock() - started) * 1000.0
+            if sound is None:
+                # الملف مفقود أو المزود لا يدعمه: لا محاولة أخرى لهذا المؤثر
+                self._failed.add(name)
+                Logger.warning(f"Audio: could not load {path}; '{name}' stays silent")
+                continue
+            sound.volume = self.volume
+            self._pools[name].append(Voice(sound))
+            self.stats['loaded'] += 1
+            break
+        return bool(self._preload)
+
+    def preload_all(self):
+        while self.preload_step():
+            pass
+
+    # --- التشغيل ---
+
+    def trigger(self, name, now=None):
+        """تشغيل المؤثر name فورًا إن أمكن؛ تُرجع زمن الاستجابة (ms) أو None."""
+        stats = self.stats
+        stats['triggered'] += 1
+        if not self.enabled:
+            return None
+        now = self.clock() if now is None else now
+        if now - self._last[name] < self.retrigger:
+            stats['coalesced'] += 1
+            return None
+        pool = self._pools[name]
+        if not pool:
+            stats['not_loaded'] += 1
+            return None
+
+        voice = None
+        oldest = pool[0]
+        for candidate in pool:
+            if candidate.busy_until <= now:
+                voice = candidate
+                break
+            if candidate.busy_until < oldest.busy_until:
+                oldest = candidate
+        if voice is None:
+            # كل أصوات المؤثر مشغولة: أقدمها يُعاد من أوله (لا يزيد عدد المتزامن)
+            voice = oldest
+            voice.sound.stop()
+            stats['stolen'] += 1
+        elif self.active_voices(now) >= self.max_voices:
+            stats['dropped'] += 1
+            return None
+
+        voice.sound.play()
+        voice.busy_until = now + voice.length
+        self._last[name] = now
+        stats['played'] += 1
+        return (self.clock() - now) * 1000.0
+
+    def active_voices(self, now=None):
+        now = self.clock() if now is None else now
+        return sum(1 for pool in self._pools.values() for voice in pool if voice.busy_until > now)
+
+    def stop_all(self):
+        for pool in self._pools.values():
+            for voice in pool:
+                if voice.busy_until:
+                    voice.sound.stop()
+                    voice.busy_until = 0.0
+
+
+# --- مزود بلا جهاز صوت ---
+
+class NullSound:
+    """صوت صامت بواجهة Kivy Sound؛ play_cost (ثوانٍ) يحاكي كلفة بدء التشغيل."""
+    __slots__ = ('source', 'length', 'volume', 'state', 'plays', 'play_cost')
+
+    def __init__(self, source, length, play_cost=0.0):
+        self.source = source
+        self.length = length
+        self.volume = 1.0
+        self.state = 'stop'
+        self.plays = 0
+        self.play_cost = play_cost
+
+    def play(self):
+        if self.play_cost:
+            _spin(self.play_cost)
+        self.state = 'play'
+        self.plays += 1
+
+    def stop(self):
+        self.state = 'stop'
+
+
+class NullLoader:
+    """
+    محمِّل NullSound: يتحقق من وجود الملف (كالمزود الحقيقي) ويحاكي كلفة فك الترميز
+    decode_cost وبدء التشغيل play_cost (ثوانٍ). length طول كل صوت.
+    """
+
+    def __init__(self, length=0.1, decode_cost=0.0, play_cost=0.0, require_files=True):
+        self.length = length
+        self.decode_cost = decode_cost
+        self.play_cost = play_cost
+        self.require_files = require_files
+        self.sounds = []
+
+    def __call__(self, path):
+        if self.require_files and not os.path.exists(path):
+            return None
+        if self.decode_cost:
+            _spin(self.decode_cost)
+        sound = NullSound(path, self.length, self.play_cost)
+        self.sounds.append(sound)
+        return sound
+
+
+def _spin(seconds):
+    # انتظار نشط: النوم أقل دقة من كلف بأجزاء الملي ثانية
+    until = time.perf_counter() + seconds
+    while time.perf_counter() < until:
+        pass
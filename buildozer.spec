@@ -6,6 +6,9 @@ package.identifier = clicker
 
 source.dir = .
 source.include_exts = py,kv,png,jpg,ttf,wav,mp3
+source.include_patterns = data/*.json
+# أدوات القياس والتحميل للمطورين فقط
+source.exclude_dirs = tools, tests
 version = 1.0.0
 orientation = portrait
 fullscreen = 0
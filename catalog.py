@@ -0,0 +1,129 @@
+"""
+كتالوج المتجر (Shop Catalog).
+
+يُبنى مرة واحدة عند الاستيراد من ملف بيانات مرفق، مع التحقق من المخطط،
+ويوفر فهارس ثابتة (غير قابلة للتعديل) حسب المعرّف وحسب النوع، وألوان الثيمات
+محسوبة مسبقًا كـ RGBA tuples. كل بحث أثناء اللعب أو الشراء O(1) مهما كبر المتجر.
+"""
+import json
+from types import MappingProxyType
+
+ITEM_TYPES = ('theme', 'upgrade')
+DEFAULT_ITEM_COLOR = (0.2, 0.2, 0.2, 1.0)
+DEFAULT_THEME_COLOR = (0.0, 0.0, 0.0, 1.0)
+
+# الحقول المسموح بها لكل نوع: {الحقل: إلزامي؟}
+_COMMON_FIELDS = {'id': True, 'name': True, 'price': True, 'type': True}
+_TYPE_FIELDS = {
+    'theme': {'color': True},
+    'upgrade': {'effect': True, 'level': False, 'max_level': False},
+}
+
+
+class CatalogError(ValueError):
+    """خطأ في بيانات الكتالوج (مخطط غير صالح أو معرّف مكرر)."""
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def validate_item(item, index=0):
+    """التحقق من عنصر واحد وإرجاع نسخة مجمّدة منه."""
+    where = f"item #{index} ({item.get('id', '?') if isinstance(item, dict) else '?'})"
+    if not isinstance(item, dict):
+        raise CatalogError(f"{where}: expected an object")
+    item_type = item.get('type')
+    if item_type not in ITEM_TYPES:
+        raise CatalogError(f"{where}: unknown type {item_type!r}")
+
+    fields = dict(_COMMON_FIELDS, **_TYPE_FIELDS[item_type])
+    unknown = set(item) - set(fields)
+    if unknown:
+        raise CatalogError(f"{where}: unknown fields {sorted(unknown)}")
+    missing = [name for name, required in fields.items() if required and name not in item]
+    if missing:
+        raise CatalogError(f"{where}: missing fields {missing}")
+
+    if not isinstance(item['id'], str) or not item['id']:
+        raise CatalogError(f"{where}: id must be a non-empty string")
+    if not isinstance(item['name'], str):
+        raise CatalogError(f"{where}: name must be a string")
+    if not _is_number(item['price']) or item['price'] < 0:
+        raise CatalogError(f"{where}: price must be a non-negative number")
+
+    frozen = dict(item)
+    if item_type == 'theme':
+        color = item['color']
+        if (not isinstance(color, (list, tuple)) or len(color) != 4
+                or not all(_is_number(c) and 0 <= c <= 1 for c in color)):
+            raise CatalogError(f"{where}: color must be 4 numbers in [0, 1]")
+        frozen['color'] = tuple(float(c) for c in color)
+    else:
+        effect = item['effect']
+        if not isinstance(effect, dict) or not effect or not all(
+                isinstance(k, str) and _is_number(v) for k, v in effect.items()):
+            raise CatalogError(f"{where}: effect must map effect names to numbers")
+        max_level = item.get('max_level', 1)
+        if not isinstance(max_level, int) or max_level < 1:
+            raise CatalogError(f"{where}: max_level must be a positive integer")
+        frozen['effect'] = MappingProxyType(dict(effect))
+        frozen['max_level'] = max_level
+    return MappingProxyType(frozen)
+
+
+class Catalog:
+    """كتالوج ثابت مع فهارس حسب المعرّف والنوع."""
+
+    def __init__(self, items):
+        self.items = tuple(validate_item(item, i) for i, item in enumerate(items))
+
+        by_id = {}
+        for item in self.items:
+            if item['id'] in by_id:
+                raise CatalogError(f"duplicate item id {item['id']!r}")
+            by_id[item['id']] = item
+        self.by_id = MappingProxyType(by_id)
+        self.by_type = MappingProxyType({
+            item_type: tuple(item for item in self.items if item['type'] == item_type)
+            for item_type in ITEM_TYPES
+        })
+        self.theme_colors = MappingProxyType({item['id']: item['color'] for item in self.by_type['theme']})
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __contains__(self, item_id):
+        return item_id in self.by_id
+
+    def __getitem__(self, item_id):
+        return self.by_id[item_id]
+
+    def get(self, item_id, default=None):
+        return self.by_id.get(item_id, default)
+
+    def of_type(self, item_type):
+        return self.by_type.get(item_type, ())
+
+    def theme_color(self, theme_id, default=DEFAULT_THEME_COLOR):
+        """لون الثيم كـ RGBA tuple محسوب مسبقًا."""
+        return self.theme_colors.get(theme_id, default)
+
+    def item_color(self, item_id):
+        """لون بطاقة العنصر في المتجر (لون الثيم أو اللون الافتراضي)."""
+        return self.theme_colors.get(item_id, DEFAULT_ITEM_COLOR)
+
+
+def load_catalog(path):
+    """تحميل كتالوج من ملف JSON بالشكل {"items": [...]} مع التحقق من المخطط."""
+    with open(path, 'r', encoding='utf-8') as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as e:
+            raise CatalogError(f"{path}: invalid JSON ({e})") from e
+    if not isinstance(data, dict) or not isinstance(data.get('items'), list):
+        raise CatalogError(f"{path}: expected an object with an 'items' list")
+    return Catalog(data['items'])
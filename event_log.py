@@ -0,0 +1,218 @@
+"""
+سجل أحداث اللعبة المضغوط وإعادة تشغيله (Event Log & Replay).
+
+كل لعبة تُسجَّل في مخزن ثابت الحجم مخصص مسبقًا (bytearray) من سجلات معبأة
+(الوقت، النوع، x، y) بحجم 17 بايتًا؛ عند امتلائه يتوقف التسجيل ويُعلَّم السجل
+مقتطعًا (سقف ذاكرة ثابت). السجل يُكتب مرة واحدة عند نهاية اللعبة.
+
+ما يُسجَّل:
+- المدخلات بالوقت الذي مُرِّر للقلب نفسه: نقرة، نقرة خاطئة، +TIME، عرض لون رد
+  الفعل، إيقاف واستئناف. x و y موضع اللمسة النسبي (أو -1).
+- مواعيد القلب التي أنتجت تغييرات (ظهور/اختفاء الأزرار، لون رد الفعل، النهاية)
+  بوقت التقدم الذي نفذها. التقدم الذي لا ينفذ أي موعد لا يغيّر الحالة فلا يُسجَّل.
+
+القلب حتمي لكل بذرة، فإعادة تمرير هذه الأحداث بنفس الترتيب والأوقات إلى
+GameCore بنفس البذرة والتأثيرات تعيد اللعبة نفسها بالضبط (Replayer).
+الوحدة لا تعتمد على Kivy.
+"""
+import json
+import struct
+import time
+
+from game_core import FOE, POWERUP, REACTION, REACTION_COLORS, STATE, OVER, GameCore
+from upgrades import base_effects
+
+LOG_VERSION = 1
+DEFAULT_CAPACITY = 4096          # ~70 KB لكل لعبة
+RECORD = struct.Struct('<dBff')  # الوقت (ساعة القلب)، النوع، x، y
+
+# --- أنواع الأحداث ---
+# مدخلات (تُعاد كمدخلات للقلب)
+TAP = 1
+WRONG_TAP = 2
+POWERUP_TAP = 3
+REACTION_PRESENTED = 4
+PAUSE = 5
+RESUME = 6
+# مواعيد القلب (تُعاد كتقدم للوقت tick عند وقتها)
+FOE_SHOW = 10
+FOE_HIDE = 11
+POWERUP_SHOW = 12
+POWERUP_HIDE = 13
+REACTION_PROMPT = 14     # x = ترتيب اللون في REACTION_COLORS
+GAME_END = 15
+TIMER_KINDS = frozenset((FOE_SHOW, FOE_HIDE, POWERUP_SHOW, POWERUP_HIDE, REACTION_PROMPT, GAME_END))
+
+EVENT_NAMES = {
+    TAP: 'tap', WRONG_TAP: 'wrong_tap', POWERUP_TAP: 'powerup_tap',
+    REACTION_PRESENTED: 'reaction_presented', PAUSE: 'pause', RESUME: 'resume',
+    FOE_SHOW: 'foe_show', FOE_HIDE: 'foe_hide', POWERUP_SHOW: 'powerup_show',
+    POWERUP_HIDE: 'powerup_hide', REACTION_PROMPT: 'reaction_prompt', GAME_END: 'game_end',
+}
+_COLOR_INDEX = {name: float(i) for i, name in enumerate(REACTION_COLORS)}
+# نوع الحدث -> مدخل القلب عند إعادة التشغيل (البقية tick)
+_CORE_INPUTS = {
+    TAP: 'tap', WRONG_TAP: 'wrong_tap', POWERUP_TAP: 'powerup',
+    REACTION_PRESENTED: 'reaction_presented', PAUSE: 'pause', RESUME: 'resume',
+}
+
+
+class EventLog:
+    """سجل لعبة واحدة؛ reset() تعيد استخدام نفس المخزن للعبة التالية."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.buffer = bytearray(capacity * RECORD.size)
+        self.reset()
+
+    def reset(self, core=None, started_at=0.0):
+        """بدء سجل جديد للعبة core (قبل core.start(started_at))."""
+        self.mode = core.mode if core is not None else ''
+        self.seed = core.seed if core is not None else None
+        self.effects = dict(core.effects._asdict()) if core is not None else {}
+        self.present_reactions = core.present_reactions if core is not None else False
+        self.started_at = started_at
+        self.count = 0
+        self.truncated = False
+        self.result = None
+
+    def __len__(self):
+        return self.count
+
+    def record(self, t, kind, x=-1.0, y=-1.0):
+        count = self.count
+        if count >= self.capacity:
+            self.truncated = True
+            return
+        RECORD.pack_into(self.buffer, count * RECORD.size, t, kind, x, y)
+        self.count = count + 1
+
+    def record_deltas(self, t, deltas):
+        """تسجيل تغييرات المواعيد من قائمة deltas للقلب (الوقت وحده لا يُسجَّل)."""
+        for kind, value in deltas:
+            if kind == FOE or kind == POWERUP:
+                visible, pos = value
+                if visible:
+                    self.record(t, FOE_SHOW if kind == FOE else POWERUP_SHOW, pos['x'], pos['y'])
+                else:
+                    self.record(t, FOE_HIDE if kind == FOE else POWERUP_HIDE)
+            elif kind == REACTION:
+                self.record(t, REACTION_PROMPT, _COLOR_INDEX.get(value, -1.0))
+            elif kind == STATE and value == OVER:
+                self.record(t, GAME_END)
+
+    def __iter__(self):
+        """(t, kind, x, y) بترتيب التسجيل."""
+        return RECORD.iter_unpack(memoryview(self.buffer)[:self.count * RECORD.size])
+
+    def finish(self, result):
+        """ملخص النتيجة للمقارنة عند إعادة التشغيل."""
+        self.result = {'score': result.score, 'clicks': result.clicks, 'taps': result.taps,
+                       'wrong_taps': result.wrong_taps, 'penalties': result.penalties}
+
+    def to_record(self):
+        """صيغة الحفظ: ترويسة JSON وبايتات الأحداث."""
+        header = {'v': LOG_VERSION, 'mode': self.mode, 'seed': self.seed, 'effects': self.effects,
+                  'present_reactions': self.present_reactions, 'started_at': self.started_at, 'count': self.count, 'truncated': self.truncated,
+                  'result': self.result}
+        return {'header': json.dumps(header, separators=(',', ':')),
+                'events': bytes(self.buffer[:self.count * RECORD.size])}
+
+    @classmethod
+    def from_record(cls, header, events):
+        header = json.loads(header) if isinstance(header, str) else header
+        if header.get('v') != LOG_VERSION:
+            raise ValueError(f"unsupported event log version {header.get('v')!r}")
+        count = len(events) // RECORD.size
+        log = cls(capacity=max(count, 1))
+        log.mode = header['mode']
+        log.seed = header['seed']
+        log.effects = dict(header.get('effects') or {})
+        log.present_reactions = header.get('present_reactions', False)
+        log.started_at = header['started_at']
+        log.buffer[:count * RECORD.size] = events[:count * RECORD.size]
+        log.count = count
+        log.truncated = header.get('truncated', False)
+        log.result = header.get('result')
+        return log
+
+    def matches(self, result):
+        """هل طابقت نتيجة إعادة التشغيل النتيجة المسجلة؟ (None إن تعذر الحكم)"""
+        expected = self.result
+        if expected is None or self.truncated:
+            return None
+        return (expected['score'] == result.score and expected['taps'] == result.taps
+                and expected['wrong_taps'] == result.wrong_taps)
+
+    def new_core(self, **kwargs):
+        """GameCore مطابق للعبة المسجلة (نفس الوضع والبذرة والتأثيرات)."""
+        return GameCore(self.mode, effects=base_effects(**self.effects), seed=self.seed,
+                        present_reactions=self.present_reactions, **kwargs)
+
+
+def feed(core, kind, t):
+    """تمرير حدث مسجل إلى GameCore بوقته المسجل؛ تُرجع deltas."""
+    return getattr(core, _CORE_INPUTS.get(kind, 'tick'))(t) or []
+
+
+def replay_core(log):
+    """إعادة لعبة كاملة على القلب وحده فورًا (بلا واجهة ولا انتظار)؛ تُرجع GameResult."""
+    core = log.new_core()
+    t = log.started_at
+    core.start(t)
+    for t, kind, _x, _y in log:
+        feed(core, kind, t)
+    if core.running:
+        core.end(t)     # سجل مقتطع: تنتهي اللعبة عند آخر حدث
+    return core.result
+
+
+class Replayer:
+    """
+    يقدّم أحداث سجل على ساعة افتراضية: started_at + (الوقت الحقيقي منذ begin) × speed.
+    due() تُرجع الأحداث التي حان وقتها بترتيب تسجيلها (لا بترتيب أوقاتها؛ وقت
+    اللمسة قد يسبق تقدمًا سُجّل قبلها).
+    """
+
+    def __init__(self, log, speed=1.0, clock=time.perf_counter):
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self.log = log
+        self.speed = speed
+        self.clock = clock
+        self.events = list(log)
+        self.position = 0
+        self._began_at = None
+        self._paused_at = None
+        self.result = None
+
+    def begin(self):
+        self._began_at = self.clock()
+        return self.log.started_at
+
+    def now(self):
+        at = self._paused_at if self._paused_at is not None else self.clock()
+        return self.log.started_at + (at - self._began_at) * self.speed
+
+    def pause(self):
+        if self._paused_at is None:
+            self._paused_at = self.clock()
+
+    def resume(self):
+        if self._paused_at is not None:
+            self._began_at += self.clock() - self._paused_at
+            self._paused_at = None
+
+    @property
+    def done(self):
+        return self.position >= len(self.events)
+
+    def due(self, now=None):
+        now = self.now() if now is None else now
+        events = self.events
+        start = self.position
+        end = start
+        while end < len(events) and events[end][0] <= now:
+            end += 1
+        self.position = end
+        return events[start:end]
@@ -0,0 +1,97 @@
+"""
+طبقة التغذية الراجعة البصرية لكل نقرة (Feedback Layer).
+
+كل تأثير (وميض الشاشة، نبضة زر النقر) كائن واحد مخصص مسبقًا يحمل لونه وموعد
+انتهائه؛ النقرات لا تنشئ دوال مؤجلة ولا تكتب في الواجهة مباشرة، بل تحدّث حالة
+التأثير فقط. التطبيق على الواجهة يحدث مرة واحدة لكل إطار عبر apply(now) ولا
+يكتب إلا إن تغيرت الحالة فعلًا، فتبقى الكلفة ثابتة مهما تسارعت النقرات.
+
+دمج الومضات المتداخلة: الومضة الجديدة تحل محل الحالية فقط إن كانت تنتهي بعدها،
+فومضات النقر القصيرة لا تقطع وميض الخطأ الأحمر الأطول، وتتابعها يمدد الوميض
+نفسه دون تبديل اللون ذهابًا وإيابًا.
+الوحدة لا تعتمد على Kivy: الكتابة في الواجهة عبر دوال تُمرَّر عند الإنشاء.
+"""
+
+
+class FeedbackEffect:
+    """حالة تأثير لوني واحد؛ اللون يُنسخ في قائمة ثابتة بدل إنشاء قائمة جديدة."""
+    __slots__ = ('apply_color', 'rest_color', 'color', 'until', 'active', 'dirty')
+
+    def __init__(self, apply_color, rest_color=(0, 0, 0, 1)):
+        self.apply_color = apply_color
+        self.rest_color = list(rest_color)
+        self.color = [0.0, 0.0, 0.0, 1.0]
+        self.until = 0.0
+        self.active = False
+        self.dirty = False
+
+    def set_rest_color(self, color):
+        self.rest_color[:] = color
+        if not self.active:
+            self.dirty = True
+
+    def trigger(self, color, duration, now):
+        until = now + duration
+        if self.active and until < self.until:
+            return      # تأثير أطول ما زال ظاهرًا
+        current = self.color
+        if (not self.active or current[0] != color[0] or current[1] != color[1]
+                or current[2] != color[2] or current[3] != color[3]):
+            current[:] = color
+            self.dirty = True
+        self.until = until
+        self.active = True
+
+    def cancel(self):
+        if self.active:
+            self.active = False
+            self.dirty = True
+
+    def apply(self, now):
+        if self.active and now >= self.until:
+            self.active = False
+            self.dirty = True
+        if self.dirty:
+            self.dirty = False
+            self.apply_color(self.color if self.active else self.rest_color)
+
+
+class FeedbackLayer:
+    """
+    وميض الشاشة ونبضة زر النقر. apply_screen و apply_tap تستقبلان قائمة اللون
+    (RGBA) وتكتبانها في الواجهة؛ request_apply (اختيارية) تطلب تطبيقًا قبل رسم
+    الإطار التالي، ويجب أن يكون تكرار استدعائها في نفس الإطار بلا أثر.
+    """
+
+    def __init__(self, apply_screen, apply_tap, request_apply=None):
+        self.screen = FeedbackEffect(apply_screen)
+        self.tap = FeedbackEffect(apply_tap)
+        self._effects = (self.screen, self.tap)
+        self._request_apply = request_apply
+
+    def flash(self, color, duration, now):
+        self.screen.trigger(color, duration, now)
+        self._requested()
+
+    def pulse(self, color, duration, now):
+        self.tap.trigger(color, duration, now)
+        self._requested()
+
+    def _requested(self):
+        if self._request_apply is not None:
+            self._request_apply()
+
+    def apply(self, now):
+        """كتابة الحالة المدمجة في الواجهة (مرة لكل إطار)."""
+        for effect in self._effects:
+            effect.apply(now)
+
+    def reset(self):
+        """إنهاء كل التأثيرات فورًا وإرجاع ألوان الراحة."""
+        for effect in self._effects:
+            effect.cancel()
+            effect.apply(0.0)
+
+    @property
+    def active(self):
+        return self.screen.active or self.tap.active
@@ -0,0 +1,423 @@
+"""
+قلب اللعبة (Game Core) مستقل عن Kivy.
+
+آلة حالات حتمية لقواعد الأوضاع الأربعة (كلاسيك، بقاء، دقة، رد فعل):
+- مولد أرقام عشوائية بذرة (seed) خاصة بكل لعبة.
+- مصدر وقت صريح: كل مدخل يستقبل now (أو يُقرأ من clock).
+- المدخلات: start, tap, wrong_tap, powerup, tick.
+- كل مدخل يُرجع قائمة تغييرات (deltas) بالشكل (النوع، القيمة) تعرضها
+  GameScreen فقط، دون أي منطق لعب داخل الواجهة.
+
+بهذا يمكن تشغيل آلاف الألعاب المحاكاة في الثانية بلا نافذة (simulate_game).
+"""
+import random
+import time
+from collections import namedtuple
+
+from scheduler import DeadlineScheduler
+from upgrades import base_effects
+
+# --- إعدادات اللعب الأساسية ---
+TIME_LIMIT = 10.0
+BASE_PENALTY_TIME = 1.0
+COINS_PER_CLICK = 0.5
+SURVIVAL_START_TIME = 5.0
+SURVIVAL_TIME_BONUS = 0.5
+POWERUP_TIME_BONUS = 2.0
+REACTION_TIME_WINDOW = 0.8  # وقت النقر المتاح في وضع رد الفعل
+REACTION_NEXT_DELAY = 0.1   # الفاصل بين نقرة صحيحة واللون التالي
+
+# --- تعريف الألوان لوضع رد الفعل ---
+REACTION_COLORS = {
+    "RED": [0.8, 0.2, 0.2, 1],
+    "GREEN": [0.2, 0.8, 0.2, 1],
+    "BLUE": [0.2, 0.2, 0.8, 1],
+}
+
+# --- قواعد كل وضع ---
+ModeRules = namedtuple('ModeRules', 'start_time timed hazards earns_coins')
+MODE_RULES = {
+    'classic': ModeRules(start_time=TIME_LIMIT, timed=True, hazards=True, earns_coins=True),
+    'survival': ModeRules(start_time=SURVIVAL_START_TIME, timed=True, hazards=True, earns_coins=True),
+    'accuracy': ModeRules(start_time=999, timed=False, hazards=False, earns_coins=False),
+    'reaction': ModeRules(start_time=999, timed=False, hazards=False, earns_coins=True),
+}
+
+# --- حالات آلة الحالات ---
+READY = 'ready'
+RUNNING = 'running'
+OVER = 'over'
+
+# --- أنواع التغييرات (deltas) ---
+SCORE = 'score'            # عدد النقرات المحتسبة
+TIME = 'time'              # الوقت المتبقي
+FOE = 'foe'                # (ظاهر؟، pos_hint أو None)
+POWERUP = 'powerup'        # (ظاهر؟، pos_hint أو None)
+REACTION = 'reaction'      # اسم اللون المطلوب
+REACTION_TIME = 'reaction_time'  # زمن رد الفعل لنقرة صحيحة (ثوانٍ)
+FLASH = 'flash'            # (اللون، المدة)
+SHAKE = 'shake'            # (المدة، الشدة)
+TAP_PULSE = 'tap_pulse'    # نبضة لون زر النقر
+PENALTY = 'penalty'        # مقدار العقوبة بالثواني
+WRONG = 'wrong'            # نقرة خاطئة أو رد فعل فات وقته (مع عقوبة أو بدونها)
+BONUS = 'bonus'            # مقدار الوقت الإضافي بالثواني
+STATE = 'state'            # الحالة الجديدة
+GAME_OVER = 'game_over'    # GameResult
+
+# قيم التأثيرات الثابتة تُنشأ مرة واحدة بدل قائمة لون جديدة مع كل نقرة
+TAP_FLASH = ((1, 1, 1, 1), 0.05)
+WRONG_TAP_FLASH = ((1, 0, 0, 1), 0.2)
+WRONG_TAP_SHAKE = (0.2, 5)
+REACTION_FLASHES = {name: (tuple(color), 0.05) for name, color in REACTION_COLORS.items()}
+
+# duration: زمن اللعب الفعلي من start() حتى النهاية بالثواني، دون فترات الإيقاف
+GameResult = namedtuple(
+    'GameResult', 'mode score clicks taps wrong_taps penalties time_left coins_gained seed duration')
+
+
+class GameCore:
+    """
+    لعبة واحدة: تبدأ READY، ثم RUNNING بعد start()، وتنتهي OVER مع GameResult.
+    كل المواعيد (نهاية الوقت، ظهور الأزرار وإخفاؤها، مهلة رد الفعل) مقابض في
+    DeadlineScheduler واحد بأوقات مطلقة، تُنفَّذ عند موعدها بالضبط من tick() أو
+    من أي مدخل. pause()/resume() تجمّد اللعبة كلها (الوقت والمواعيد).
+    """
+
+    def __init__(self, mode, effects=None, seed=None, clock=time.monotonic, present_reactions=False):
+        if mode not in MODE_RULES:
+            raise ValueError(f"unknown game mode {mode!r}")
+        self.mode = mode
+        self.rules = MODE_RULES[mode]
+        self.effects = effects if effects is not None else base_effects(penalty_time=BASE_PENALTY_TIME)
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+        self.clock = clock
+        self.timers = DeadlineScheduler()
+
+        self.state = READY
+        self.clicks = 0
+        self.taps = 0
+        self.wrong_taps = 0          # كل النقرات الخاطئة (للإحصائيات)
+        self.penalties = 0           # النقرات الخاطئة التي كلّفت وقتًا
+        self.time_left = self.rules.start_time
+        self.foe_visible = False
+        self.powerup_visible = False
+        self.reaction_color = ""
+        self.reaction_started_at = 0.0
+        # الواجهة تُبلغ عن عرض كل لون عبر reaction_presented()، وقبلها تُتجاهل النقرات
+        self.present_reactions = present_reactions
+        self.awaiting_presentation = False
+        self.early_taps = 0          # نقرات رد فعل سبقت عرض اللون (تُتجاهل)
+        self.result = None
+        self.started_at = None
+        self.duration = 0.0           # زمن اللعب حتى النهاية (يُحسب في _finish)
+
+        self._paused_at = None
+        self._paused_total = 0.0      # مجموع فترات الإيقاف
+        self._ends_at = None          # موعد نهاية الوقت (للأوضاع المؤقتة)
+        self._end_timer = None
+        self._foe_timer = None        # ظهور أو إخفاء زر DON'T TAP
+        self._powerup_timer = None    # ظهور أو إخفاء زر +TIME
+        self._reaction_timer = None   # مهلة رد الفعل أو اللون التالي
+
+    @property
+    def running(self):
+        return self.state == RUNNING
+
+    @property
+    def paused(self):
+        return self.timers.paused
+
+    def _now(self, now):
+        return self.clock() if now is None else now
+
+    # --- المدخلات ---
+
+    def start(self, now=None):
+        if self.state != READY:
+            return []
+        now = self._now(now)
+        self.state = RUNNING
+        self.started_at = now
+        deltas = [(STATE, RUNNING)]
+
+        if self.mode == 'reaction':
+            self._next_reaction(now, deltas)
+            return deltas
+
+        if self.rules.timed:
+            self.time_left += self.effects.bonus_time
+            self._ends_at = now + self.time_left
+            self._end_timer = self.timers.schedule_at(self._ends_at, self._time_up)
+            deltas.append((TIME, self.time_left))
+        if self.rules.hazards:
+            self._foe_timer = self.timers.schedule_at(
+                now + self.rng.uniform(1, 3) / self.effects.foe_spawn_rate, self._show_foe)
+            self._powerup_timer = self.timers.schedule_at(
+                now + self.rng.uniform(8, 15) / self.effects.powerup_spawn_rate, self._show_powerup)
+        return deltas
+
+    def tap(self, now=None):
+        """نقرة على زر النقر الرئيسي (صحيحة، أو رد فعل في وضع reaction)."""
+        if not self._accepting():
+            return []
+        now = self._now(now)
+        if self.mode == 'reaction':
+            return self._reaction_tap(now)
+
+        deltas = self._advance(now)
+        if self.state != RUNNING:
+            return deltas
+        self.taps += 1
+        self.clicks += 1 * self.effects.click_multiplier
+        deltas.append((SCORE, self.clicks))
+        deltas.append((FLASH, TAP_FLASH))
+        if self.mode == 'survival':
+            self._add_time(now, SURVIVAL_TIME_BONUS, deltas)
+        deltas.append((TAP_PULSE, None))
+        return deltas
+
+    def wrong_tap(self, now=None):
+        """
+        نقرة على زر DON'T TAP (لا تُحتسب إلا والزر ظاهر). الزر لا يظهر إلا في أوضاع
+        hazards (classic و survival)، وكل نقرة عليه تكلّف penalty_time.
+        """
+        if not self._accepting() or not self.foe_visible:
+            return []
+        now = self._now(now)
+        deltas = self._advance(now)
+        if self.state != RUNNING:
+            return deltas
+        self.wrong_taps += 1
+        deltas.append((WRONG, None))
+        deltas.append((SHAKE, WRONG_TAP_SHAKE))
+        deltas.append((FLASH, WRONG_TAP_FLASH))
+        self.penalties += 1
+        deltas.append((PENALTY, self.effects.penalty_time))
+        self._hide_foe(now, deltas, self.rng.uniform(1, 3))
+        self._add_time(now, -self.effects.penalty_time, deltas)
+        return deltas
+
+    def powerup(self, now=None):
+        """نقرة على زر +TIME."""
+        if not self._accepting() or not self.powerup_visible:
+            return []
+        now = self._now(now)
+        deltas = self._advance(now)
+        if self.state != RUNNING:
+            return deltas
+        deltas.append((BONUS, POWERUP_TIME_BONUS))
+        self._add_time(now, POWERUP_TIME_BONUS, deltas)
+        self._hide_powerup(now, deltas)
+        return deltas
+
+    def reaction_presented(self, now=None):
+        """
+        أول إطار عُرض فيه لون رد الفعل الحالي فعليًا: يبدأ قياس رد الفعل ومهلته
+        من هذه اللحظة بدل لحظة اختيار اللون (اختياري؛ بدونه يُعد اللون ظاهرًا فور اختياره).
+        """
+        if not self._accepting() or not self.reaction_color or not self.awaiting_presentation:
+            return []
+        now = self._now(now)
+        self.awaiting_presentation = False
+        self.reaction_started_at = max(now, self.reaction_started_at)
+        self._reaction_timer = self.timers.reschedule(
+            self._reaction_timer, self.reaction_started_at + REACTION_TIME_WINDOW, self._reaction_timeout)
+        return []
+
+    def tick(self, now=None):
+        """تقدّم الوقت: تنفيذ المواعيد المستحقة وتحديث الوقت المتبقي."""
+        if not self._accepting():
+            return []
+        return self._advance(self._now(now))
+
+    def time_left_at(self, now):
+        """الوقت المتبقي عند now دون تنفيذ أي موعد (للعرض فقط، مثل إعادة التشغيل)."""
+        if not self._accepting() or self._ends_at is None:
+            return self.time_left
+        return max(0.0, self._ends_at - now)
+
+    def pause(self, now=None):
+        """تجميد اللعبة: لا يمر الوقت ولا تُقبل المدخلات حتى resume()."""
+        if self.state == RUNNING and not self.paused:
+            self._paused_at = self._now(now)
+            self.timers.pause(self._paused_at)
+
+    def resume(self, now=None):
+        if self.state != RUNNING or not self.paused:
+            return []
+        offset = self.timers.resume(self._now(now))
+        self._paused_at = None
+        self._paused_total += offset
+        if self._ends_at is not None:
+            self._ends_at += offset
+        self.reaction_started_at += offset
+        return []
+
+    def end(self, now=None):
+        """إنهاء اللعبة فورًا (مثلاً عند مغادرة الشاشة)."""
+        if self.state != RUNNING:
+            return []
+        deltas = []
+        self._finish(self._now(now), deltas)
+        return deltas
+
+    # --- المنطق الداخلي ---
+
+    def _accepting(self):
+        return self.state == RUNNING and not self.timers.paused
+
+    def _advance(self, now):
+        deltas = []
+        self.timers.run_due(now, deltas)
+        if self.state == RUNNING and self._ends_at is not None:
+            self.time_left = max(0.0, self._ends_at - now)
+            deltas.append((TIME, self.time_left))
+        return deltas
+
+    def _add_time(self, now, seconds, deltas):
+        """تعديل الوقت المتبقي بإزاحة موعد النهاية (لا بتنقيص عداد كل إطار)."""
+        self._ends_at += seconds
+        self.time_left = max(0.0, self._ends_at - now)
+        deltas.append((TIME, self.time_left))
+        if self._ends_at <= now:
+            self._time_up(now, deltas)
+        else:
+            self._end_timer = self.timers.reschedule(self._end_timer, self._ends_at)
+
+    def _time_up(self, due, deltas):
+        self.time_left = 0
+        deltas.append((TIME, 0))
+        self._finish(due, deltas)
+
+    def _show_foe(self, due, deltas):
+        self.foe_visible = True
+        pos = {'x': self.rng.uniform(0.05, 0.65), 'y': self.rng.uniform(0.05, 0.55)}
+        self._foe_timer = self.timers.schedule_at(due + self.rng.uniform(0.5, 1.5), self._foe_timeout)
+        deltas.append((FOE, (True, pos)))
+
+    def _foe_timeout(self, due, deltas):
+        self._hide_foe(due, deltas, self.rng.uniform(1, 4))
+
+    def _hide_foe(self, now, deltas, delay):
+        self.foe_visible = False
+        self._foe_timer = self.timers.reschedule(
+            self._foe_timer, now + delay / self.effects.foe_spawn_rate, self._show_foe)
+        deltas.append((FOE, (False, None)))
+
+    def _show_powerup(self, due, deltas):
+        self.powerup_visible = True
+        pos = {'x': self.rng.uniform(0.1, 0.7), 'y': self.rng.uniform(0.1, 0.5)}
+        self._powerup_timer = self.timers.schedule_at(due + 1.5, self._hide_powerup)
+        deltas.append((POWERUP, (True, pos)))
+
+    def _hide_powerup(self, now, deltas):
+        self.powerup_visible = False
+        self._powerup_timer = self.timers.reschedule(
+            self._powerup_timer, now + self.rng.uniform(8, 15) / self.effects.powerup_spawn_rate,
+            self._show_powerup)
+        deltas.append((POWERUP, (False, None)))
+
+    def _next_reaction(self, now, deltas):
+        self.reaction_color = self.rng.choice(tuple(REACTION_COLORS))
+        self.reaction_started_at = now
+        self._reaction_timer = self.timers.schedule_at(now + REACTION_TIME_WINDOW, self._reaction_timeout)
+        self.awaiting_presentation = self.present_reactions
+        deltas.append((REACTION, self.reaction_color))
+
+    def _reaction_timeout(self, due, deltas):
+        # رد فعل فات وقته: النقرة المتأخرة تصل بعد هذا الموعد فتنتهي اللعبة هنا قبلها
+        deltas.append((WRONG, None))
+        self._finish(due, deltas)
+
+    def _reaction_tap(self, now):
+        deltas = self._advance(now)
+        if self.state != RUNNING or not self.reaction_color:
+            # انتهت اللعبة، أو نقرة في الفاصل بين لونين (تُتجاهل)
+            return deltas
+        reaction_time = now - self.reaction_started_at
+        if self.awaiting_presentation or reaction_time < 0 or (REACTION, self.reaction_color) in deltas:
+            # اللون لم يُعرض بعد عند لحظة النقرة (اختير للتو أو لم يُرسم إطاره)، ومنها
+            # لمسات سُحبت بين رسم اللون وأول on_flip: وقتها قبل العرض فلا يمكن أن تكون
+            # ردًا عليه. لا تُحتسب ولا تُعاقب، وتُعد في early_taps
+            self.early_taps += 1
+            return deltas
+        self._reaction_timer.cancel()
+        if reaction_time <= REACTION_TIME_WINDOW:
+            self.taps += 1
+            self.clicks += 1
+            deltas.append((SCORE, self.clicks))
+            deltas.append((REACTION_TIME, reaction_time))
+            deltas.append((FLASH, REACTION_FLASHES[self.reaction_color]))
+            self.reaction_color = ""
+            self._reaction_timer = self.timers.schedule_at(now + REACTION_NEXT_DELAY, self._next_reaction)
+        else:
+            self.wrong_taps += 1
+            self.penalties += 1
+            deltas.append((WRONG, None))
+            self._finish(now, deltas)
+        return deltas
+
+    def elapsed(self, now):
+        """زمن اللعب حتى now دون فترات الإيقاف (أثناء الإيقاف يتوقف عند لحظته)."""
+        if self.started_at is None:
+            return 0.0
+        if self._paused_at is not None:
+            now = self._paused_at
+        return max(0.0, now - self.started_at - self._paused_total)
+
+    def _finish(self, now, deltas):
+        self.duration = self.elapsed(now)
+        self.state = OVER
+        self.foe_visible = self.powerup_visible = False
+        self.timers.clear()
+
+        coins_gained = 0
+        if self.rules.earns_coins:
+            coins_gained = int(self.clicks * COINS_PER_CLICK * self.effects.click_multiplier * self.effects.coin_yield)
+        # نتيجة البقاء زمن اللعب نفسه (الوقت المتبقي عند النهاية صفر دائمًا تقريبًا)
+        score = self.duration if self.mode == 'survival' else self.clicks
+        self.result = GameResult(
+            mode=self.mode, score=score, clicks=self.clicks, taps=self.taps,
+            wrong_taps=self.wrong_taps, penalties=self.penalties, time_left=self.time_left,
+            coins_gained=coins_gained, seed=self.seed, duration=self.duration)
+        deltas.append((STATE, OVER))
+        deltas.append((GAME_OVER, self.result))
+
+
+def time_survived(result):
+    """زمن البقاء لنتيجة لعبة منتهية (صفر لغير وضع البقاء)."""
+    return result.duration if result.mode == 'survival' else 0.0
+
+
+def simulate_game(mode, seed=0, taps_per_second=8.0, wrong_tap_chance=0.02, powerup_chance=0.5,
+                  effects=None, tick_interval=0.1, max_duration=60.0):
+    """
+    تشغيل لعبة كاملة بلا واجهة بساعة افتراضية (للقياس والاختبار).
+    اللاعب الافتراضي ينقر بمعدل ثابت مع تذبذب، ويضغط أحيانًا على زر DON'T TAP
+    أو +TIME عند ظهورهما. تُرجع GameResult.
+    """
+    player = random.Random(seed ^ 0x5EED)
+    core = GameCore(mode, effects=effects, seed=seed, clock=lambda: 0.0)
+    now = 0.0
+    core.start(now)
+    next_tap = now + player.expovariate(taps_per_second)
+    next_tick = now + tick_interval
+    while core.running and now < max_duration:
+        # معالجة المدخلات بترتيب زمني صارم
+        if next_tap <= next_tick:
+            now = next_tap
+            if core.foe_visible and player.random() < wrong_tap_chance:
+                core.wrong_tap(now)
+            else:
+                core.tap(now)
+            next_tap += player.expovariate(taps_per_second)
+        else:
+            now = next_tick
+            core.tick(now)
+            if core.powerup_visible and player.random() < powerup_chance * tick_interval:
+                core.powerup(now)
+            next_tick += tick_interval
+    if core.running:
+        core.end(now)
+    return core.result
@@ -0,0 +1,75 @@
+"""
+تخطيط النصوص الرقمية من أطلس حروف مرسوم مسبقًا (Glyph Atlas).
+
+نصوص عداد اللعب (النتيجة والوقت) تتغير مع كل نقرة وكل إطار، وكل تغيير في نص
+Label يعيد رسم نسيجه بالخط ورفعه إلى الذاكرة الرسومية. هنا تُرسم حروف مجموعة
+صغيرة (الأرقام وبضع علامات) مرة واحدة في نسيج واحد، ويصبح تغيير النص إعادة حساب
+رؤوس مستطيلات (أربعة رؤوس لكل حرف) تشير إلى مواضعها في ذلك النسيج، دون أي رسم
+بالخط ولا رفع نسيج.
+
+GlyphAtlas لا يعرف إلا المقاسات: موضع كل حرف وعرضه في النسيج وإحداثيات v للحافتين.
+الرسم بالخط وبناء Mesh في main.py (GlyphLabel). الوحدة لا تعتمد على Kivy.
+"""
+
+GLYPH_CHARSET = '0123456789.:+-s'
+GLYPH_SEPARATOR = ' '     # فاصل بين الحروف في النسيج حتى لا تتسرب حواف حرف إلى جاره
+
+
+def atlas_text(charset=GLYPH_CHARSET, separator=GLYPH_SEPARATOR):
+    """النص الذي يُرسم نسيجًا للأطلس: حروف المجموعة بينها الفاصل."""
+    return separator.join(charset)
+
+
+class GlyphAtlas:
+    """
+    مواضع حروف charset في نسيج عرضه width وارتفاعه height (بكسل).
+    extents(text) دالة قياس بنفس خط النسيج (عرض النص بالبكسل).
+    v_bottom/v_top إحداثيات النسيج للحافة السفلية والعلوية (نسيج Label مقلوب رأسيًا).
+    """
+
+    def __init__(self, charset, extents, width, height, v_bottom=0.0, v_top=1.0,
+                 separator=GLYPH_SEPARATOR):
+        self.charset = charset
+        self.height = height
+        self.v_bottom = v_bottom
+        self.v_top = v_top
+        text = atlas_text(charset, separator)
+        self.glyphs = {}
+        step = 1 + len(separator)
+        for i, char in enumerate(charset):
+            x = extents(text[:i * step]) if i else 0
+            advance = extents(char)
+            self.glyphs[char] = (advance, x / width, (x + advance) / width)
+
+    def covers(self, text):
+        glyphs = self.glyphs
+        return all(char in glyphs for char in text)
+
+    def measure(self, text):
+        glyphs = self.glyphs
+        return sum(glyphs[char][0] for char in text if char in glyphs)
+
+    def layout(self, text, vertices, indices):
+        """
+        كتابة رؤوس (x, y, u, v) وفهارس المثلثات لـ text في القائمتين (تُفرَّغان أولًا)،
+        بدءًا من (0, 0). الحروف خارج charset تُتجاهل. تُرجع عرض النص.
+        """
+        del vertices[:]
+        del indices[:]
+        glyphs = self.glyphs
+        top = self.height
+        v0 = self.v_bottom
+        v1 = self.v_top
+        x = 0
+        n = 0
+        for char in text:
+            glyph = glyphs.get(char)
+            if glyph is None:
+                continue
+            advance, u0, u1 = glyph
+            right = x + advance
+            vertices.extend((x, 0, u0, v0, right, 0, u1, v0, right, top, u1, v1, x, top, u0, v1))
+            indices.extend((n, n + 1, n + 2, n + 2, n + 3, n))
+            n += 4
+            x = right
+        return x
@@ -0,0 +1,190 @@
+"""
+قياسات زمن الاستجابة في الميدان (Latency Instrumentation).
+
+كل قياس يُسجَّل في مخطط كمّيات متدفق (QuantileSketch) بذاكرة ثابتة، بأسلوب
+DDSketch: دلاء لوغاريتمية بدقة نسبية محددة (1% افتراضيًا)، وعند تجاوز الحد
+الأقصى للدلاء تُدمج أصغر الدلاء معًا (فتبقى p50/p90/p99 دقيقة).
+
+المقاييس لكل وضع لعب:
+- tap_handler: زمن معالجة دفعة لمسات الإطار على خيط الواجهة (من بدء المعالجة إلى
+  انتهاء العرض)، عينة لكل دفعة.
+- touch_to_handled: من لحظة اللمسة حتى انتهاء معالجة دفعتها (يشمل انتظارها في الطابور).
+- tap_to_frame: من النقرة إلى أول إطار يُعرض بعدها (ما يراه اللاعب فعلًا).
+- reaction: زمن رد فعل اللاعب في وضع رد الفعل.
+- audio_trigger: من طلب مؤثر صوتي حتى بدء تشغيله (audio.py).
+
+الإضافة O(1) بلا تخصيص تقريبًا، والحفظ صيغة JSON مضغوطة (فروق الفهارس + الأعداد).
+الوحدة لا تعتمد على Kivy.
+"""
+import math
+import time
+
+from models import GAME_MODES
+
+METRIC_TAP_HANDLER = 'tap_handler'
+METRIC_TOUCH_TO_HANDLED = 'touch_to_handled'
+METRIC_TAP_TO_FRAME = 'tap_to_frame'
+METRIC_REACTION = 'reaction'
+METRIC_AUDIO = 'audio_trigger'
+METRICS = (METRIC_TAP_HANDLER, METRIC_TOUCH_TO_HANDLED, METRIC_TAP_TO_FRAME, METRIC_REACTION, METRIC_AUDIO)
+
+SKETCH_RELATIVE_ACCURACY = 0.01
+SKETCH_MAX_BUCKETS = 512
+SKETCH_MIN_VALUE = 1e-3        # القيم الأصغر (بالملي ثانية) تُعد صفرًا
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+
+class QuantileSketch:
+    """مخطط كمّيات بدقة نسبية ثابتة وذاكرة محدودة (max_buckets دلو)."""
+
+    def __init__(self, relative_accuracy=SKETCH_RELATIVE_ACCURACY, max_buckets=SKETCH_MAX_BUCKETS):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value):
+        self.count += 1
+        if value <= SKETCH_MIN_VALUE:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        buckets = self.buckets
+        if index in buckets:
+            buckets[index] += 1
+        else:
+            buckets[index] = 1
+            if len(buckets) > self.max_buckets:
+                self._collapse()
+
+    def _collapse(self):
+        """دمج أصغر دلوين (يضحّي بدقة الكمّيات الدنيا فقط)."""
+        lowest, second = sorted(self.buckets)[:2]
+        self.buckets[second] += self.buckets.pop(lowest)
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("cannot merge sketches with different accuracy")
+        self.count += other.count
+        self.zero_count += other.zero_count
+        for index, n in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + n
+        while len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def quantile(self, q):
+        """القيمة التقريبية عند الكمّية q (None إن كان المخطط فارغًا)."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def to_dict(self):
+        """صيغة مضغوطة: أزواج (فرق الفهرس عن الدلو السابق، العدد) في قائمة مسطحة."""
+        flat = []
+        previous = 0
+        for index in sorted(self.buckets):
+            flat.append(index - previous)
+            flat.append(self.buckets[index])
+            previous = index
+        return {"a": self.relative_accuracy, "z": self.zero_count, "b": flat}
+
+    @classmethod
+    def from_dict(cls, data, max_buckets=SKETCH_MAX_BUCKETS):
+        sketch = cls(data.get("a", SKETCH_RELATIVE_ACCURACY), max_buckets)
+        sketch.zero_count = data.get("z", 0)
+        flat = data.get("b", ())
+        index = 0
+        for gap, n in zip(flat[::2], flat[1::2]):
+            index += gap
+            sketch.buckets[index] = n
+        sketch.count = sketch.zero_count + sum(sketch.buckets.values())
+        while len(sketch.buckets) > max_buckets:
+            sketch._collapse()
+        return sketch
+
+
+def sketch_key(metric, mode):
+    return f"{metric}:{mode}"
+
+
+class LatencyMonitor:
+    """
+    مخطط لكل (مقياس، وضع). saved: القيم المحفوظة من المستودع ({key: dict}).
+    زمن النقرة حتى الإطار يُغلق في frame_presented() التي تُستدعى من Window.on_flip.
+    """
+
+    def __init__(self, saved=None, clock=time.perf_counter):
+        self.clock = clock
+        self.sketches = {}
+        for key, data in (saved or {}).items():
+            try:
+                self.sketches[key] = QuantileSketch.from_dict(data)
+            except (TypeError, ValueError, AttributeError):
+                continue    # بيانات تالفة: يبدأ المقياس من جديد
+        self._pending_frame_taps = []
+
+    def sketch(self, metric, mode):
+        key = sketch_key(metric, mode)
+        sketch = self.sketches.get(key)
+        if sketch is None:
+            sketch = self.sketches[key] = QuantileSketch()
+        return sketch
+
+    def record(self, metric, mode, value_ms):
+        self.sketch(metric, mode).add(value_ms)
+
+    def taps_handled(self, mode, batch_started_at, touch_times):
+        """
+        نهاية معالجة دفعة بدأت عند batch_started_at، ولمساتها في أوقات touch_times
+        (نفس ساعة clock): عينة tap_handler واحدة للدفعة، وعينة touch_to_handled لكل لمسة.
+        """
+        now = self.clock()
+        self.sketch(METRIC_TAP_HANDLER, mode).add((now - batch_started_at) * 1000.0)
+        waited = self.sketch(METRIC_TOUCH_TO_HANDLED, mode)
+        pending = self._pending_frame_taps
+        for t in touch_times:
+            waited.add((now - t) * 1000.0)
+            pending.append((mode, t))
+
+    def frame_presented(self, *args):
+        pending = self._pending_frame_taps
+        if not pending:
+            return
+        now = self.clock()
+        for mode, started_at in pending:
+            self.sketch(METRIC_TAP_TO_FRAME, mode).add((now - started_at) * 1000.0)
+        pending.clear()
+
+    def quantiles(self, metric, mode=None, qs=DEFAULT_QUANTILES):
+        """الكمّيات لوضع واحد، أو لكل الأوضاع مدمجة إن كان mode None."""
+        if mode is not None:
+            sketch = self.sketches.get(sketch_key(metric, mode))
+        else:
+            sketch = None
+            for m in GAME_MODES:
+                part = self.sketches.get(sketch_key(metric, m))
+                if part is None:
+                    continue
+                if sketch is None:
+                    sketch = QuantileSketch(part.relative_accuracy)
+                sketch.merge(part)
+        if sketch is None or not sketch.count:
+            return None
+        return tuple(sketch.quantile(q) for q in qs)
+
+    def snapshot(self):
+        """الصيغة المضغوطة لكل المخططات (للحفظ)."""
+        return {key: sketch.to_dict() for key, sketch in self.sketches.items()}
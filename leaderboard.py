@@ -0,0 +1,118 @@
+"""
+لوحات الصدارة المحلية (Local Leaderboards).
+
+لكل وضع لوحة عامة (كل التشكيلات، ALL_LOADOUTS) ولوحة لكل تشكيلة ترقيات
+(loadout_key)، كل منها تحتفظ بأفضل K نتيجة فقط في كومة صغرى جذرها أضعف
+نتيجة محفوظة: النتيجة التي لا تتفوق على الجذر تُرفض بمقارنة واحدة، والإدراج
+O(log K). الترتيب تنازلي بالنتيجة، وعند التعادل تتقدم النتيجة الأقدم (seq).
+
+اللوحات تُحمَّل من المخزن كلٌّ عند أول حاجة إليها (أفضل K صفًا عبر فهرس)،
+فلا يُقرأ سجل الألعاب الكامل أبدًا. الوحدة لا تعتمد على Kivy.
+"""
+import heapq
+from collections import namedtuple
+
+LEADERBOARD_SIZE = 50
+PAGE_SIZE = 10
+ALL_LOADOUTS = '*'
+BASE_LOADOUT = 'base'
+
+Entry = namedtuple('Entry', 'score seq played_at time_survived')
+
+
+def loadout_key(levels):
+    """مفتاح ثابت لتشكيلة الترقيات: "id=مستوى,..." للمستويات غير الصفرية مرتبة، أو "base"."""
+    parts = [f"{item_id}={level}" for item_id, level in sorted(levels.items()) if level]
+    return ','.join(parts) or BASE_LOADOUT
+
+
+def board_key(mode, loadout=ALL_LOADOUTS):
+    return f"{mode}/{loadout}"
+
+
+def split_board_key(key):
+    mode, _, loadout = key.partition('/')
+    return mode, loadout
+
+
+class Leaderboard:
+    """أفضل size نتيجة للوحة واحدة."""
+
+    def __init__(self, size=LEADERBOARD_SIZE, entries=()):
+        self.size = size
+        self._heap = [(e.score, -e.seq, e) for e in entries]
+        heapq.heapify(self._heap)
+        while len(self._heap) > size:
+            heapq.heappop(self._heap)
+        self._sorted = None
+
+    def __len__(self):
+        return len(self._heap)
+
+    def qualifies(self, score):
+        """هل تدخل نتيجة جديدة اللوحة؟ (الأحدث يخسر التعادل، فيلزم التفوق على الجذر)"""
+        return len(self._heap) < self.size or score > self._heap[0][0]
+
+    def insert(self, entry):
+        """إدراج O(log K)؛ تُرجع ترتيب النتيجة (يبدأ من 1، بمسح O(K) للداخلة فقط) أو None."""
+        item = (entry.score, -entry.seq, entry)
+        if len(self._heap) < self.size:
+            heapq.heappush(self._heap, item)
+        elif item[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, item)
+        else:
+            return None
+        self._sorted = None
+        return self.rank(entry)
+
+    def rank(self, entry):
+        key = (entry.score, -entry.seq)
+        return 1 + sum(1 for score, neg_seq, _ in self._heap if (score, neg_seq) > key)
+
+    def entries(self):
+        """النتائج مرتبة (الأفضل أولًا)؛ تُحسب مرة حتى الإدراج التالي."""
+        if self._sorted is None:
+            self._sorted = [item[2] for item in sorted(self._heap, reverse=True)]
+        return self._sorted
+
+    def page(self, index, per_page=PAGE_SIZE):
+        start = index * per_page
+        return self.entries()[start:start + per_page]
+
+    def page_count(self, per_page=PAGE_SIZE):
+        return max(1, -(-len(self._heap) // per_page))
+
+    def snapshot(self):
+        """[[seq, score, time_survived, played_at], ...] للحفظ (قابلة لـ JSON)."""
+        return [[e.seq, e.score, e.time_survived, e.played_at] for e in self.entries()]
+
+
+class Leaderboards:
+    """
+    كل اللوحات. loader(mode, loadout, size) تُرجع [Entry, ...] من المخزن وتُستدعى
+    مرة لكل لوحة. next_seq: الرقم التسلسلي للنتيجة التالية (يحدد الأقدم عند التعادل).
+    """
+
+    def __init__(self, loader, size=LEADERBOARD_SIZE, next_seq=1):
+        self._loader = loader
+        self.size = size
+        self.next_seq = next_seq
+        self._boards = {}
+
+    def board(self, mode, loadout=ALL_LOADOUTS):
+        key = board_key(mode, loadout)
+        board = self._boards.get(key)
+        if board is None:
+            board = Leaderboard(self.size, self._loader(mode, loadout, self.size))
+            self._boards[key] = board
+        return board
+
+    def record(self, mode, loadout, score, played_at, time_survived=0.0):
+        """
+        إدراج نتيجة في لوحة الوضع العامة ولوحة تشكيلتها؛ تُرجع (الترتيب العام،
+        ترتيب التشكيلة)، وكل منهما None إن لم تدخل النتيجة تلك اللوحة.
+        """
+        entry = Entry(score, self.next_seq, played_at, time_survived)
+        self.next_seq += 1
+        return (self.board(mode, ALL_LOADOUTS).insert(entry),
+                self.board(mode, loadout).insert(entry))
@@ -1,120 +1,157 @@
+# أولًا: متتبع الإقلاع (إن فُعّل) يقيس زمن استيراد كل ما يليه
+import startup_trace
 import kivy
 from kivy.app import App
+from kivy.logger import Logger
 from kivy.uix.screenmanager import Screen, ScreenManager
+from kivy.resources import resource_find
 from kivy.clock import Clock
 from kivy.lang import Builder
-from kivy.properties import StringProperty, NumericProperty, DictProperty, ListProperty, ObjectProperty, BooleanProperty
+from kivy.properties import StringProperty, NumericProperty, ListProperty, ObjectProperty, BooleanProperty
 from kivy.core.window import Window
 from kivy.animation import Animation
-import json
-import os
-import random
 from kivy.factory import Factory
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
+from kivy.uix.button import Button
+from kivy.uix.widget import Widget
+from kivy.graphics import Color, Mesh, PopMatrix, PushMatrix, Rectangle, Translate
+from kivy.core.text import Label as CoreLabel
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
 from datetime import datetime, timedelta, date
+import os
+import time
+from persistence import PersistenceWriter
+from catalog import load_catalog
+from profile_store import ProfileStore
+from profile_repository import (ProfileRepository, SECTION_COINS, SECTION_DAILY,
+                                SECTION_UPGRADES, SECTION_SCORES)
+from instrumentation import (LatencyMonitor, METRIC_AUDIO, METRIC_REACTION, METRIC_TAP_HANDLER,
+                             METRIC_TAP_TO_FRAME, METRIC_TOUCH_TO_HANDLED)
+from upgrades import EffectsEngine, base_effects
+from models import GAME_MODES, Session
+from leaderboard import ALL_LOADOUTS, LEADERBOARD_SIZE, PAGE_SIZE, loadout_key
+from achievements import (AchievementEngine, load_rules, EVENT_TAP, EVENT_GAME_END, EVENT_STREAK,
+                          EVENT_COINS)
+from scheduler import DeadlineScheduler
+from submission import Submitter
+from feedback import FeedbackLayer
+from touch_input import TouchBatcher
+from glyph_label import GLYPH_CHARSET, GlyphAtlas, atlas_text
+from perf_hud import PerfMonitor, dump_path
+from audio import AudioEngine, NullLoader, SFX_POWERUP, SFX_REACTION, SFX_TAP, SFX_WRONG
+import event_log
+from event_log import EventLog, Replayer
+import game_core
+from game_core import (GameCore, MODE_RULES, TIME_LIMIT, BASE_PENALTY_TIME,
+                       REACTION_COLORS)
 
 kivy.require('1.9.0')
 
 # --- الثوابت والإعدادات العامة ---
+PROFILE_DB_FILE = 'profile.db'
+# خادم النتائج؛ بدون عنوان تبقى النتائج في طابور profile.db حتى يُضبط (tools/standin_server.py للتجربة)
+SUBMIT_URL = os.environ.get('CLICKER_SUBMIT_URL', '')
+# ملفات JSON القديمة (تُستورد مرة واحدة إلى PROFILE_DB_FILE)
 SCORE_FILE = 'high_score.json'
 ACHIEVEMENTS_FILE = 'achievements.json'
 CURRENCY_FILE = 'currency.json'
 STATS_FILE = 'stats.json'
 
-# إعدادات اللعب الأساسية
-TIME_LIMIT = 10.0
-BASE_PENALTY_TIME = 1.0
-COINS_PER_CLICK = 0.5
-SURVIVAL_START_TIME = 5.0
-SURVIVAL_TIME_BONUS = 0.5
-REACTION_TIME_WINDOW = 0.8  # وقت النقر المتاح في وضع رد الفعل
-
-# --- تعريف الألوان لوضع رد الفعل ---
-REACTION_COLORS = {
-    "RED": [0.8, 0.2, 0.2, 1],
-    "GREEN": [0.2, 0.8, 0.2, 1],
-    "BLUE": [0.2, 0.2, 0.8, 1],
-}
-
-# --- تعريف الإحصائيات الافتراضية ---
-DEFAULT_STATS = {
-    "total_clicks": 0,
-    "total_wrong_taps": 0,
-    "total_games_played": 0,
-    "survival_high_time": 0.0,
-    "accuracy_high_score": 0,
-    "reaction_high_score": 0
-}
-
 # --- تعريف الإنجازات (Data Model) ---
-ACHIEVEMENTS_DATA = {
-    "speed_demon": {"name": "Speed Demon", "description": "Achieve 50 clicks in one game.", "unlocked": False, "target": 50},
-    "focused": {"name": "Focused Tapper", "description": "Win a game without hitting the 'DON'T TAP' button.", "unlocked": False},
-    "veteran": {"name": "Game Veteran", "description": "Play 10 games.", "unlocked": False, "count_key": "total_games", "target": 10}
-}
+# قواعد تعريفية في ملف بيانات مرفق؛ المحرك يفهرسها حسب الحدث (achievements.py)
+ACHIEVEMENT_RULES_FILE = 'data/achievements.json'
+with startup_trace.phase('achievement_rules'):
+    ACHIEVEMENT_RULES = load_rules(ACHIEVEMENT_RULES_FILE)
 
 # --- تعريف عناصر المتجر والتخصيص والترقيات ---
-SHOP_ITEMS = [
-    # الثيمات (Themes)
-    {"id": "default", "name": "Default Theme", "price": 0, "type": "theme", "color": [0.0, 0.0, 0.0, 1]},
-    {"id": "bg_blue", "name": "Blue Theme", "price": 50, "type": "theme", "color": [0.1, 0.1, 0.5, 1]},
-    {"id": "bg_red", "name": "Red Theme", "price": 75, "type": "theme", "color": [0.5, 0.1, 0.1, 1]},
-    {"id": "bg_green", "name": "Green Theme", "price": 100, "type": "theme", "color": [0.1, 0.5, 0.1, 1]},
-    # سيتم فتح هذا الثيم كمكافأة يوم 7 (إن لم يكن موجودًا)
-    {"id": "bg_premium", "name": "Premium Theme", "price": 0, "type": "theme", "color": [0.6, 0.2, 0.8, 1]}, 
-
-    # الترقيات (Upgrades)
-    {"id": "up_click1", "name": "Click Multiplier +0.1", "price": 150, "type": "upgrade", "effect": {"multiplier_increase": 0.1}, "level": 1, "max_level": 5},
-    {"id": "up_penalty1", "name": "Penalty Time -0.1s", "price": 200, "type": "upgrade", "effect": {"penalty_reduction": 0.1}, "level": 1, "max_level": 3},
-]
+# الثيمات والترقيات معرّفة في ملف بيانات مرفق، ويُبنى منه كتالوج مفهرس مرة واحدة عند الاستيراد.
+# ثيم bg_premium سعره 0 ويُفتح كمكافأة يوم 7 (إن لم يكن موجودًا)
+CATALOG_FILE = 'data/shop_catalog.json'
+with startup_trace.phase('catalog'):
+    CATALOG = load_catalog(CATALOG_FILE)
+
+# --- الواجهة ---
+# ملف KV يحوي قواعد الشاشات فقط؛ مدير الشاشات يُنشأ في build() ويبني كل شاشة عند أول حاجة إليها
+KV_FILE = 'game_design.kv'
+# لوحة الأداء: تظهر عند التشغيل إن ضُبط CLICKER_PERF_HUD، وتُبدَّل بـ F8 أو من شاشة الإحصائيات
+PERF_HUD_AT_START = bool(os.environ.get('CLICKER_PERF_HUD'))
+PERF_HUD_REFRESH = 0.25          # ثوانٍ بين تحديثات نص اللوحة وخطها المصغر
+PERF_HUD_TOGGLE_KEY = 289        # F8
+PERF_HUD_DUMP_KEY = 290          # F9
+# نصوص ثابتة (بادئة أو لاحقة GlyphLabel) تُرسم مرة وتُحفظ؛ تُفرَّغ كلها إن زادت
+GLYPH_STATIC_CACHE = 32
+# المؤثرات الصوتية: kivy (SoundLoader)، null (بلا جهاز صوت، للأدوات)، off (صامت)
+AUDIO_BACKEND = os.environ.get('CLICKER_AUDIO', 'kivy')
+PREWARM_DELAY = 0.5   # ثوانٍ بعد ظهور القائمة قبل تجهيز بقية الشاشات (شاشة في كل إطار)
 
 # --- مكافآت سلسلة الأيام (Streak 7 أيام) ---
 # ترتيب المكافآت لليوم 1..7
 DAILY_STREAK_REWARDS = [20, 30, 40, 60, 80, 100, 150]  # اليوم السابع مكافأة كبيرة + ثيم
 
-# --- دوال حفظ وتحميل البيانات ---
-
-def load_data(filename, default_data):
-    """تحميل البيانات من ملف JSON أو إرجاع البيانات الافتراضي."""
-    if os.path.exists(filename):
-        with open(filename, 'r') as f:
-            try:
-                if os.path.getsize(filename) == 0:
-                    return default_data.copy() if isinstance(default_data, dict) else default_data
-                data = json.load(f)
-                return data
-            except (json.JSONDecodeError):
-                return default_data.copy() if isinstance(default_data, dict) else default_data
-    return default_data.copy() if isinstance(default_data, dict) else default_data
-
-def save_data(filename, data):
-    """حفظ البيانات إلى ملف JSON."""
-    with open(filename, 'w') as f:
-        json.dump(data, f, indent=4)
+# --- ألوان زر النقر أثناء اللعب ---
+TAP_BUTTON_COLOR = (0.3, 0.8, 0.3, 1)
+TAP_PULSE_COLOR = (0.5, 1, 0.5, 1)
+
+def touch_timestamp(touch, clock=time.perf_counter):
+    """
+    وقت اللمسة كما سجّله مزود المدخلات (MotionEvent.time_start بساعة time.time)
+    محوّلًا إلى الساعة الرتيبة clock، أو الوقت الحالي إن لم تتوفر لمسة.
+
+    الدقة محدودة بالإطار: time_start يُضبط عند إنشاء MotionEvent، ومزود SDL2 (وهو
+    مزود أندرويد أيضًا) يفرّغ طابور أحداثه مرة واحدة في كل إطار داخل EventLoop.idle.
+    فالوقت هو لحظة سحب الحدث لا لحظة اللمس، وقد يتأخر عنها حتى إطار كامل (~16ms
+    عند 60Hz). طابع SDL (event.timestamp) و MotionEvent.getEventTime على أندرويد لا
+    يصلان إلى Python في Kivy 2.3، فلا مصدر أدق هنا. الفائدة الباقية: لمسات الإطار
+    الواحد تُرتَّب بأوقاتها وتُقاس من لحظة سحبها لا من لحظة معالجة دفعتها.
+    """
+    time_start = getattr(touch, 'time_start', None)
+    if not time_start:
+        return clock()
+    return time_start + (clock() - time.time())
+
+def audio_loader(backend=AUDIO_BACKEND):
+    """محمِّل أصوات AudioEngine حسب AUDIO_BACKEND."""
+    if backend != 'kivy':
+        return NullLoader()
+
+    def load(path):
+        # مزود الصوت يُختار عند أول تحميل (في الخمول بعد الإقلاع) لا عند الاستيراد
+        from kivy.core.audio import SoundLoader
+        return SoundLoader.load(resource_find(path) or path)
+    return load
 
 # --- عنصر المتجر المخصص ---
-class ShopItem(BoxLayout):
-    """عنصر مخصص لعرض عناصر المتجر في قائمة التمرير."""
+class ShopItem(RecycleDataViewBehavior, BoxLayout):
+    """
+    صف واحد في قائمة المتجر. الصفوف يُعاد استخدامها أثناء التمرير (RecycleView)،
+    فخصائصها تأتي من قاموس بيانات الصف ولا يُحفظ فيها أي حالة أخرى.
+    """
     item_id = StringProperty('')
     item_name = StringProperty('Item Name')
     item_price = NumericProperty(0)
     item_type = StringProperty('')
     item_color = ListProperty([0, 0, 0, 1]) # لون الثيم
     display_status = StringProperty('Buy') # حالة العرض (Buy/Equip/Max)
-    
+    shop_list = ObjectProperty(None, allownone=True)
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.shop_list = rv
+        return super(ShopItem, self).refresh_view_attrs(rv, index, data)
+
     def on_press_action(self):
-        """يستدعي دالة الشراء أو التفعيل في الشاشة الأصلية (ShopScreen)."""
-        # الوصول إلى ShopScreen: ShopItem -> GridLayout -> ScrollView -> BoxLayout -> ShopScreen
-        # نحتاج إلى السفر 4 مستويات للأعلى
-        shop_screen = self.parent.parent.parent.parent
-        
-        # التأكد من أن الشاشة موجودة وأن لديها الدالة المطلوبة
-        if shop_screen and hasattr(shop_screen, 'purchase_or_activate'):
-            # يرسل الـ ID، السعر، والنوع إلى دالة المعالجة الرئيسية
-            shop_screen.purchase_or_activate(self.item_id, self.item_price, self.item_type)
+        """يرسل الـ ID، السعر، والنوع إلى الشاشة المالكة للقائمة (ShopScreen)."""
+        if self.shop_list is not None and self.shop_list.screen is not None:
+            self.shop_list.screen.purchase_or_activate(self.item_id, self.item_price, self.item_type)
+
+
+class ShopList(RecycleView):
+    """قائمة المتجر الافتراضية: عدد الصفوف المنشأة ثابت مهما كبر الكتالوج."""
+    screen = ObjectProperty(None, allownone=True)
 
 Factory.register('ShopItem', cls=ShopItem)
+Factory.register('ShopList', cls=ShopList)
 
 # --- شاشات التطبيق ---
 
@@ -123,31 +160,51 @@ class MenuScreen(Screen):
     display_achievements = StringProperty("Loading Achievements...")
     display_coins = StringProperty("Coins: 0")
     daily_indicator = StringProperty("")  # نص يظهر إن لم يتم جمع المكافأة اليوم
-    
-    def on_enter(self, *args):
+
+    def on_kv_post(self, base_widget):
+        # لا إعادة تحميل عند كل دخول: الشاشة تشترك في تغييرات المستودع وتُحدَّث عند حدوثها
         app = App.get_running_app()
-        
-        # إعادة تحميل البيانات
-        app.game_data = load_data(ACHIEVEMENTS_FILE, {"total_games": 0, "achievements": {}})
-        app.high_score = load_data(SCORE_FILE, {"high_score": 0}).get("high_score", 0)
-        app.currency_data = load_data(CURRENCY_FILE, {"coins": 0, "unlocked_themes": ["default"], "upgrades": {}, "daily_reward": {"last_claim": "", "streak_day": 0, "last_claim_date": ""}})
-        app.stats_data = load_data(STATS_FILE, DEFAULT_STATS)
-
-        # إذا لم يكن هناك مفتاح daily_reward، أنشئه
-        if "daily_reward" not in app.currency_data:
-            app.currency_data["daily_reward"] = {"last_claim": "", "streak_day": 0, "last_claim_date": ""}
-
-        # تحديث الواجهة
-        self.display_high_score = f"BEST SCORE: {app.high_score}"
+        app.profile.subscribe((SECTION_COINS, SECTION_DAILY), lambda section: self.check_daily_status())
+        app.profile.subscribe((SECTION_SCORES,), lambda section: self.update_high_score())
+        # سطر لكل إنجاز يُبنى مرة؛ الفتح يستبدل سطره فقط
+        app.achievements.add_listener(self.achievement_unlocked)
+        self.update_high_score()
+        self.update_achievements()
+
+    def on_enter(self, *args):
+        # التاريخ قد يتغير أثناء عمل التطبيق، لذا نعيد فحص حالة المكافأة (بدون أي I/O)
         self.check_daily_status()  # تحقق من حالة المكافأة اليومية (ولا تعطيها هنا إنما تعرض حالة)
-        
-        # تحديث قائمة الإنجازات
-        achievements_text = "--- ACHIEVEMENTS ---\n"
-        for key, data in ACHIEVEMENTS_DATA.items():
-            is_unlocked = app.game_data.get('achievements', {}).get(key, {}).get('unlocked', False)
-            status = "[color=33FF33]UNLOCKED[/color]" if is_unlocked else "[color=FF3333]LOCKED[/color]"
-            achievements_text += f"{status}: {data['name']}\n"
-        self.display_achievements = achievements_text
+        if App.get_running_app().achievements.progress_version != self._achievements_version:
+            # أرقام التقدم تغيرت منذ آخر عرض (الفتح نفسه يُحدَّث فورًا)
+            self.update_achievements()
+
+    def update_high_score(self):
+        self.display_high_score = f"BEST SCORE: {App.get_running_app().profile.best('classic')}"
+
+    def update_achievements(self):
+        """بناء قائمة الإنجازات كاملة (مرة عند التحميل، وعند الدخول لتحديث التقدم)."""
+        app = App.get_running_app()
+        self._achievements_version = app.achievements.progress_version
+        self._achievement_rows = {}
+        self._achievement_lines = ["--- ACHIEVEMENTS ---"]
+        for rule in app.achievements.rules:
+            self._achievement_rows[rule['id']] = len(self._achievement_lines)
+            self._achievement_lines.append(self.achievement_line(rule))
+        self.display_achievements = "\n".join(self._achievement_lines)
+
+    def achievement_line(self, rule):
+        app = App.get_running_app()
+        if app.profile.is_achievement_unlocked(rule['id']):
+            return f"[color=33FF33]UNLOCKED[/color]: {rule['name']}"
+        progress = app.achievements.progress(rule['id'])
+        suffix = f" ({progress[0]:g}/{progress[1]:g})" if progress and progress[0] else ""
+        return f"[color=FF3333]LOCKED[/color]: {rule['name']}{suffix}"
+
+    def achievement_unlocked(self, rule):
+        row = self._achievement_rows.get(rule['id'])
+        if row is not None:
+            self._achievement_lines[row] = self.achievement_line(rule)
+            self.display_achievements = "\n".join(self._achievement_lines)
 
     def check_daily_status(self):
         """
@@ -155,14 +212,13 @@ class MenuScreen(Screen):
         ويحدّث display_coins و daily_indicator.
         لا تقوم بجمع المكافأة هنا — فقط تعرض الحالة.
         """
-        app = App.get_running_app()
+        profile = App.get_running_app().profile
         today_iso = date.today().isoformat()
-        daily = app.currency_data.get("daily_reward", {"last_claim": "", "streak_day": 0, "last_claim_date": ""})
-        last_claim_date = daily.get("last_claim_date", "")
-        streak_day = daily.get("streak_day", 0)
+        last_claim_date = profile.last_claim_date
+        streak_day = profile.daily_streak_day
 
         # تحديث عرض العملات بشكل افتراضي
-        self.display_coins = f"Coins: {app.currency_data.get('coins', 0)}"
+        self.display_coins = f"Coins: {profile.coins}"
 
         if last_claim_date != today_iso:
             # المستخدم لم يجمع مكافأة اليوم بعد
@@ -175,7 +231,139 @@ class MenuScreen(Screen):
         if self.manager.has_screen('daily_rewards'):
             self.manager.current = 'daily_rewards'
 
+class TapButton(Button):
+    """
+    زر النقر الرئيسي. أثناء اللعب (batcher ليس None) كل إصبع يلمسه، ولو كان إصبع
+    آخر ما زال ضاغطًا، يُدفع إلى الطابور بوقته وموضعه فقط ويُعالج مع الإطار؛ لا
+    on_press ولا تبديل حالة الزر (النبضة اللونية من FeedbackLayer). خارج اللعب زر عادي.
+    """
+    batcher = None
+
+    def on_touch_down(self, touch):
+        batcher = self.batcher
+        if batcher is None or touch.is_mouse_scrolling or not self.collide_point(*touch.pos):
+            return super(TapButton, self).on_touch_down(touch)
+        batcher.push(touch_timestamp(touch), event_log.TAP, touch.sx, touch.sy, touch.uid)
+        return True
+
+
+class GlyphLabel(Widget):
+    """
+    نص عداد يتغير كثيرًا (النتيجة، الوقت): الأرقام تُركَّب من أطلس حروف مرسوم
+    مرة لكل خط وحجم (glyph_label.py) بدل إعادة رسم نسيج Label عند كل تغيير.
+    prefix و suffix نصان ثابتان نسبيًا ("Score: "، تنبيه العقوبة) يُرسم كل منهما
+    نسيجًا عاديًا مرة ويُحفظ. تعيين text أي عدد من المرات في الإطار يؤدي إلى تحديث
+    واحد للرؤوس قبل الرسم، ولا تحديث إن لم يتغير النص المعروض.
+    """
+    text = StringProperty('')
+    prefix = StringProperty('')
+    suffix = StringProperty('')
+    font_size = NumericProperty('15sp')
+    bold = BooleanProperty(False)
+    color = ListProperty([1, 1, 1, 1])
+    charset = StringProperty(GLYPH_CHARSET)
+
+    _atlases = {}      # (font_size, bold, charset) -> (texture, GlyphAtlas)
+    _static = {}       # (text, font_size, bold) -> texture
+    rasterized = 0     # نصوص رُسمت بالخط (أطلس أو نص ثابت) منذ بدء التطبيق
+
+    def __init__(self, **kwargs):
+        self._vertices = []
+        self._indices = []
+        self._atlas = None
+        self._atlas_key = None
+        self._digits_width = 0
+        self._shown = (None, None, None)
+        self._refresh_trigger = Clock.create_trigger(self.refresh, -1)
+        super(GlyphLabel, self).__init__(**kwargs)
+        with self.canvas:
+            self._color = Color(*self.color)
+            PushMatrix()
+            self._origin = Translate(0, 0)
+            self._prefix_rect = Rectangle(size=(0, 0))
+            self._digits_origin = Translate(0, 0)
+            self._mesh = Mesh(mode='triangles')
+            self._suffix_origin = Translate(0, 0)
+            self._suffix_rect = Rectangle(size=(0, 0))
+            PopMatrix()
+        for name in ('text', 'prefix', 'suffix', 'font_size', 'bold', 'charset', 'pos', 'size'):
+            self.fbind(name, self._refresh_trigger)
+        self.fbind('color', self._update_color)
+        self._refresh_trigger()
+
+    def _update_color(self, instance, color):
+        self._color.rgba = color
+
+    @classmethod
+    def _render(cls, text, font_size, bold):
+        label = CoreLabel(text=text, font_size=font_size, bold=bold)
+        label.refresh()
+        cls.rasterized += 1
+        return label
+
+    def atlas(self):
+        key = (self.font_size, self.bold, self.charset)
+        cached = self._atlases.get(key)
+        if cached is None:
+            label = self._render(atlas_text(self.charset), *key[:2])
+            texture = label.texture
+            coords = texture.tex_coords
+            atlas = GlyphAtlas(self.charset, lambda text: label.get_extents(text)[0],
+                               texture.width, texture.height, v_bottom=coords[1], v_top=coords[5])
+            cached = self._atlases[key] = (texture, atlas)
+        return cached
+
+    def static_texture(self, text):
+        if not text:
+            return None
+        key = (text, self.font_size, self.bold)
+        texture = self._static.get(key)
+        if texture is None:
+            if len(self._static) >= GLYPH_STATIC_CACHE:
+                self._static.clear()
+            texture = self._static[key] = self._render(text, self.font_size, self.bold).texture
+        return texture
+
+    def refresh(self, *args):
+        """مرة في الإطار على الأكثر: النسيج والرؤوس لما تغير فقط، ثم التوسيط."""
+        key = (self.font_size, self.bold, self.charset)
+        if key != self._atlas_key:
+            texture, self._atlas = self.atlas()
+            self._atlas_key = key
+            self._mesh.texture = texture
+            self._shown = (None, None, None)
+        atlas = self._atlas
+        text, prefix, suffix = self.text, self.prefix, self.suffix
+        shown_text, shown_prefix, shown_suffix = self._shown
+        if prefix != shown_prefix:
+            self._set_static(self._prefix_rect, prefix)
+        if suffix != shown_suffix:
+            self._set_static(self._suffix_rect, suffix)
+        if text != shown_text:
+            width = atlas.layout(text, self._vertices, self._indices)
+            self._mesh.vertices = self._vertices
+            self._mesh.indices = self._indices
+            self._digits_width = width
+        self._shown = (text, prefix, suffix)
+
+        prefix_width = self._prefix_rect.size[0]
+        total = prefix_width + self._digits_width + self._suffix_rect.size[0]
+        height = max(atlas.height, self._prefix_rect.size[1], self._suffix_rect.size[1])
+        self._origin.xy = (int(self.center_x - total / 2.0), int(self.center_y - height / 2.0))
+        self._digits_origin.xy = (prefix_width, 0)
+        self._suffix_origin.xy = (self._digits_width, 0)
+
+    def _set_static(self, rect, text):
+        texture = self.static_texture(text)
+        rect.texture = texture
+        rect.size = texture.size if texture is not None else (0, 0)
+
+
 class GameScreen(Screen):
+    """
+    واجهة اللعب فقط: قواعد الأوضاع كلها في GameCore (game_core.py)،
+    والشاشة تمرّر له المدخلات وتعرض التغييرات (deltas) التي يُرجعها.
+    """
     display_clicks = NumericProperty(0)
     display_time = NumericProperty(TIME_LIMIT)
     display_best = NumericProperty(0)
@@ -186,7 +374,39 @@ class GameScreen(Screen):
     def __init__(self, **kwargs):
         super(GameScreen, self).__init__(**kwargs)
         self.game_mode = 'classic'
+        # مواعيد التنبيهات المؤقتة تُقدَّم من نفس استدعاء الإطار
+        self.effect_timers = DeadlineScheduler()
+        self._notice_timer = None
+        # الوميض ونبضة الزر: حالة مدمجة تُكتب في الواجهة مرة واحدة قبل رسم الإطار
+        self.feedback = FeedbackLayer(self.apply_screen_color, self.apply_tap_color,
+                                      Clock.create_trigger(self.apply_feedback, -1))
+        self.feedback.tap.set_rest_color(TAP_BUTTON_COLOR)
+        self.tick_event = None
+        # اللمسات تُدفع إلى الطابور على مسار الحدث وتُعالج دفعة واحدة في tick_core
+        self.touches = TouchBatcher()
+        self._input_floor = 0.0
+        self._core_inputs = {}
+        # سجل أحداث اللعبة الحالية: مخزن ثابت يُعاد استخدامه لكل لعبة
+        self.event_log = EventLog()
+        self.replayer = None
+        self.pending_replay = None
         self.reset_game_vars()
+        # جدول العرض: نوع التغيير -> دالة العرض
+        self._renderers = {
+            game_core.SCORE: self.render_score,
+            game_core.TIME: self.render_time,
+            game_core.FOE: self.render_foe,
+            game_core.POWERUP: self.render_powerup,
+            game_core.REACTION: self.render_reaction,
+            game_core.REACTION_TIME: self.render_reaction_time,
+            game_core.FLASH: self.render_flash,
+            game_core.SHAKE: self.render_shake,
+            game_core.TAP_PULSE: self.render_tap_pulse,
+            game_core.PENALTY: self.render_penalty,
+            game_core.WRONG: self.render_wrong,
+            game_core.BONUS: self.render_bonus,
+            game_core.GAME_OVER: self.end_game,
+        }
         
     def on_kv_post(self, base_widget):
         # ربط ids بعد تحميل KV
@@ -204,70 +424,55 @@ class GameScreen(Screen):
             self.display_mode_title = "REACTION MODE"
             
     def reset_game_vars(self):
-        self.clicks = 0
-        self.time_left = TIME_LIMIT
-        self.game_running = False
-        self.timer_event = None
-        self.foe_event = None
-        self.powerup_event = None
-        self.reaction_event = None
-        self.wrong_taps_count = 0
-        self.click_multiplier = 1.0
-        self.penalty_time = BASE_PENALTY_TIME
-        self.current_reaction_color = ""
-        self.reaction_time_start = 0
+        self.core = None
+        self.replayer = None
+        self.time_left = MODE_RULES[self.game_mode].start_time
+        self.timer_notice = ""
+        self.effects = base_effects(penalty_time=BASE_PENALTY_TIME)
 
     def apply_upgrades(self):
-        """تطبيق تأثير الترقيات المشتراة."""
-        app = App.get_running_app()
-        
-        self.click_multiplier = 1.0
-        self.penalty_time = BASE_PENALTY_TIME
-        
-        for item_data in SHOP_ITEMS:
-            if item_data['type'] == 'upgrade':
-                level = app.currency_data.get('upgrades', {}).get(item_data['id'], 0)
-                if level > 0:
-                    if 'multiplier_increase' in item_data['effect']:
-                        self.click_multiplier += item_data['effect']['multiplier_increase'] * level
-                    if 'penalty_reduction' in item_data['effect']:
-                        self.penalty_time -= item_data['effect']['penalty_reduction'] * level
-                        self.penalty_time = max(0.1, self.penalty_time) 
+        """تطبيق تأثير الترقيات المشتراة (متجه محسوب مسبقًا من EffectsEngine)."""
+        self.effects = App.get_running_app().effects.current()
+
+    @property
+    def game_running(self):
+        return self.core is not None and self.core.running
+
+    @property
+    def accepting_taps(self):
+        """لعبة حية جارية (نقرات اللاعب تُتجاهل أثناء إعادة التشغيل)."""
+        return self.replayer is None and self.game_running
                         
     def on_enter(self, *args):
         app = App.get_running_app()
-        self.apply_upgrades()
         
-        current_theme = next((item for item in SHOP_ITEMS if item['id'] == app.current_theme), None)
-        self.background_color = current_theme['color'] if current_theme else [0, 0, 0, 1]
+        self.latency = app.latency
+        self.audio = app.audio
+        self.achievements = app.achievements
+        self.background_color = CATALOG.theme_color(app.current_theme)
         Window.clearcolor = self.background_color 
+        self.feedback.screen.set_rest_color(self.background_color)
         self.reset_game()
+        if self.pending_replay is not None:
+            log, speed = self.pending_replay
+            self.pending_replay = None
+            self.start_replay(log, speed)
+
+    def on_leave(self, *args):
+        # مغادرة الشاشة أثناء اللعب تلغي اللعبة دون تسجيلها
+        self.stop_ticking()
+        self.core = None
+        self.replayer = None
         
     def reset_game(self):
+        self.stop_ticking()
         self.reset_game_vars()
         self.apply_upgrades()
 
-        app = App.get_running_app()
-        if self.game_mode == 'classic':
-            self.display_time = TIME_LIMIT
-            self.display_best = app.high_score
-        elif self.game_mode == 'survival':
-            self.display_time = SURVIVAL_START_TIME
-            self.display_best = app.stats_data.get('survival_high_time', 0.0)
-        elif self.game_mode == 'accuracy':
-            self.display_time = 999 
-            self.display_best = app.stats_data.get('accuracy_high_score', 0)
-        elif self.game_mode == 'reaction':
-            self.display_time = 999 
-            self.display_best = app.stats_data.get('reaction_high_score', 0)
+        self.display_time = self.time_left
+        self.display_best = App.get_running_app().profile.best(self.game_mode)
 
         self.display_clicks = 0
-        
-        # إلغاء أي جدول زمني سابق للتأكد من نظافة اللعبة
-        if self.timer_event: self.timer_event.cancel()
-        if self.foe_event: self.foe_event.cancel()
-        if self.powerup_event: self.powerup_event.cancel()
-        if self.reaction_event: self.reaction_event.cancel()
 
         self.ids.tap_button.text = "START GAME"
         self.ids.tap_button.background_color = (0.2, 0.6, 1, 1)
@@ -276,161 +481,274 @@ class GameScreen(Screen):
         self.ids.power_button.opacity = 0 
         self.ids.power_button.disabled = True
         
-        # إلغاء ربط جميع الدوال قبل إعادة الربط للتأكد من عدم تكرار الاستدعاء
+        # START GAME ضغطة عادية؛ بعدها تذهب لمسات الزر إلى الطابور (TapButton)
         self.ids.tap_button.unbind(on_press=self.start_game_on_tap)
-        self.ids.tap_button.unbind(on_press=self.on_correct_tap)
-        self.ids.tap_button.unbind(on_press=self.on_reaction_tap)
-
         self.ids.tap_button.bind(on_press=self.start_game_on_tap)
 
     def start_game_on_tap(self, instance):
         self.ids.tap_button.unbind(on_press=self.start_game_on_tap)
-        
-        if self.game_mode == 'reaction':
-            self.ids.tap_button.bind(on_press=self.on_reaction_tap)
-        else:
-            self.ids.tap_button.bind(on_press=self.on_correct_tap)
-            
         self.start_game()
 
     def start_game(self):
-        self.game_running = True
+        # ساعة رتيبة عالية الدقة: أوقات اللمسات والإطارات تُحوَّل إليها
+        self.core = GameCore(self.game_mode, effects=self.effects, clock=time.perf_counter,
+                             present_reactions=True)
+        now = time.perf_counter()
+        self.event_log.reset(self.core, now)
+        self._core_inputs = {event_log.TAP: self.core.tap, event_log.WRONG_TAP: self.core.wrong_tap,
+                             event_log.POWERUP_TAP: self.core.powerup}
+        self.touches.clear()
+        self._input_floor = now
+        self.ids.tap_button.batcher = self.touches
         self.ids.tap_button.text = "TAP!"
-        self.ids.tap_button.background_color = (0.3, 0.8, 0.3, 1)
-        
+        self.ids.tap_button.background_color = TAP_BUTTON_COLOR
         if self.game_mode == 'reaction':
-            self.ids.foe_button.opacity = 0
-            self.ids.power_button.opacity = 0
-            self.schedule_reaction_cycle()
+            Window.bind(on_flip=self.on_frame_presented)
+        self.render(self.core.start(now))
+        # مؤقت واحد لكل الإطارات: القلب يحدد ما يستحق من مواعيد
+        self.tick_event = Clock.schedule_interval(self.tick_core, 0)
+
+    def start_replay(self, log, speed=1.0):
+        """
+        إعادة لعبة مسجلة (event_log.py) عبر نفس مسار العرض، بسرعتها الأصلية أو
+        مسرّعة: القلب يُنشأ بنفس البذرة والتأثيرات ويتلقى الأحداث بأوقاتها المسجلة.
+        """
+        self.ids.tap_button.unbind(on_press=self.start_game_on_tap)
+        self.set_mode(log.mode)
+        self.replayer = Replayer(log, speed)
+        self.core = log.new_core(clock=time.perf_counter)
+        self.ids.tap_button.text = f"REPLAY x{speed:g}"
+        self.ids.tap_button.background_color = TAP_BUTTON_COLOR
+        self.render(self.core.start(self.replayer.begin()))
+        self.tick_event = Clock.schedule_interval(self.tick_replay, 0)
+
+    def stop_ticking(self):
+        if self.tick_event:
+            self.tick_event.cancel()
+            self.tick_event = None
+        self.ids.tap_button.batcher = None
+        self.touches.clear()
+        Window.unbind(on_flip=self.on_frame_presented)
+        if self.feedback.active:
+            # وميض لم يكتمل: لا نترك لون الشاشة عالقًا
+            self.feedback.reset()
+        self.effect_timers.clear()
+
+    def pause_game(self):
+        """تجميد اللعبة الجارية (مثلاً عند إيقاف التطبيق مؤقتًا على أندرويد)."""
+        if self.game_running:
+            now = time.perf_counter()
+            if self.replayer is not None:
+                # الإيقاف أثناء إعادة التشغيل يجمّد ساعتها فقط؛ القلب يتبع الأحداث المسجلة
+                self.replayer.pause()
+            else:
+                # اللمسات التي سبقت الإيقاف تُحتسب بأوقاتها قبل تجميد القلب
+                self.process_input(now)
+                self.core.pause(now)
+                self.event_log.record(now, event_log.PAUSE)
+            self.effect_timers.pause(now)
+
+    def resume_game(self):
+        if self.game_running and self.replayer is not None:
+            self.replayer.resume()
+            self.effect_timers.resume(time.perf_counter())
+        elif self.game_running and self.core.paused:
+            now = time.perf_counter()
+            self.core.resume(now)
+            self.event_log.record(now, event_log.RESUME)
+            self._input_floor = now
+            self.effect_timers.resume(now)
+
+    def on_frame_presented(self, *args):
+        """أول إطار يُعرض بعد تغيير لون رد الفعل: من هنا يبدأ قياس رد الفعل."""
+        if self.core is not None and self.core.awaiting_presentation:
+            now = time.perf_counter()
+            self.core.reaction_presented(now)
+            self.event_log.record(now, event_log.REACTION_PRESENTED)
+
+    def tick_core(self, dt):
+        """استدعاء الإطار الوحيد: مواعيد التأثيرات ثم مواعيد قواعد اللعب."""
+        if not self.game_running:
+            return False
+        now = time.perf_counter()
+        self.effect_timers.run_due(now)
+        # لمسات هذا الإطار أولًا: كل منها يقدّم القلب حتى وقتها قبل مواعيد ما بعدها
+        self.process_input(now)
+        if not self.game_running:
+            return False
+        deltas = self.core.tick(now)
+        self._input_floor = now
+        # التقدم الذي نفّذ مواعيد فقط يُسجَّل (ظهور الأزرار، اللون التالي، النهاية)
+        self.event_log.record_deltas(now, deltas)
+        self.render(deltas)
+        self.feedback.apply(now)
+
+    def tick_replay(self, dt):
+        """استدعاء الإطار أثناء إعادة التشغيل: الأحداث المسجلة التي حان وقتها فقط."""
+        if not self.game_running:
+            return False
+        now = time.perf_counter()
+        self.effect_timers.run_due(now)
+        replayer = self.replayer
+        core = self.core
+        for t, kind, _x, _y in replayer.due():
+            self.render(event_log.feed(core, kind, t))
+            if not core.running:
+                return False
+        if replayer.done:
+            # سجل مقتطع: لا أحداث بعد، فتنتهي إعادة التشغيل عند آخرها
+            self.render(core.end(replayer.now()))
+            return False
+        if core.rules.timed:
+            self.render_time(core.time_left_at(replayer.now()))
+        self.feedback.apply(now)
+
+    # --- معالجة الأزرار (تمرير المدخلات إلى القلب) ---
+
+    def queue_input(self, kind, instance=None, now=None):
+        """
+        دفع مدخل إلى طابور الإطار. الوقت والموضع من آخر لمسة للزر (ButtonBehavior.last_touch)
+        إن وُجدت، فيُقاس مدخل DON'T TAP و +TIME من لحظة اللمسة كالنقرة الرئيسية.
+        """
+        if not self.accepting_taps:
             return
+        touch = getattr(instance, 'last_touch', None)
+        if now is None:
+            now = touch_timestamp(touch)
+        if touch is not None:
+            self.touches.push(now, kind, touch.sx, touch.sy)
+        else:
+            self.touches.push(now, kind)
 
-        if self.game_mode != 'accuracy':
-            self.timer_event = Clock.schedule_interval(self.update_timer, 0.1)
-        
-        foe_delay = random.uniform(1, 3) 
-        powerup_delay = random.uniform(8, 15)
-        
-        if self.game_mode in ['classic', 'survival']:
-            self.foe_event = Clock.schedule_once(self.show_foe_button, foe_delay)
-            
-        if self.game_mode in ['classic', 'survival']: 
-            self.powerup_event = Clock.schedule_once(self.show_powerup_button, powerup_delay)
+    def process_input(self, now):
+        """
+        معالجة كل اللمسات المتراكمة منذ الإطار السابق دفعة واحدة بترتيب أوقاتها:
+        كل لمسة تمر على القلب بوقتها (زمن رد الفعل من لحظة اللمسة لا المعالجة)
+        وتُسجَّل في سجل الأحداث، ثم تُعرض تغييرات الدفعة كلها مرة واحدة.
+        """
+        batch = self.touches.drain(self._input_floor, now)
+        if not batch:
+            return
+        started = time.perf_counter()
+        core = self.core
+        log = self.event_log
+        inputs = self._core_inputs
+        count_taps = self.game_mode != 'reaction'
+        deltas = []
+        handled = 0
+        for t, kind, sx, sy in batch:
+            if not core.running:
+                break
+            step = inputs[kind](t)
+            log.record(t, kind, sx, sy)
+            log.record_deltas(t, step)
+            deltas.extend(step)
+            handled += 1
+            if count_taps and kind == event_log.TAP:
+                self.achievements.dispatch(EVENT_TAP, self.game_mode, clicks=core.clicks)
+        self._input_floor = batch[handled - 1][0] if handled else self._input_floor
+        self.render(deltas)
+        # زمن معالجة الدفعة نفسها، ولكل لمسة: من لحظتها حتى عرض دفعتها
+        self.latency.taps_handled(self.game_mode, started, [item[0] for item in batch[:handled]])
 
-    # --- منطق وضع رد الفعل ---
-    
-    def schedule_reaction_cycle(self):
-        if not self.game_running: return
-        
-        color_name = random.choice(list(REACTION_COLORS.keys()))
-        self.current_reaction_color = color_name
-        
+    def on_wrong_tap(self, instance):
+        self.queue_input(event_log.WRONG_TAP, instance)
+
+    def on_powerup_tap(self, instance):
+        self.queue_input(event_log.POWERUP_TAP, instance)
+
+    # --- عرض التغييرات ---
+
+    def render(self, deltas):
+        renderers = self._renderers
+        for kind, value in deltas:
+            renderer = renderers.get(kind)
+            if renderer is not None:
+                renderer(value)
+
+    def render_score(self, clicks):
+        self.display_clicks = clicks
+
+    def render_time(self, time_left):
+        self.time_left = time_left
+        self.display_time = time_left
+        self.update_labels()
+
+    def render_foe(self, change):
+        visible, pos_hint = change
+        if pos_hint is not None:
+            self.ids.foe_button.pos_hint = pos_hint
+        self.ids.foe_button.opacity = 1 if visible else 0
+        self.ids.foe_button.disabled = not visible
+
+    def render_powerup(self, change):
+        visible, pos_hint = change
+        if pos_hint is not None:
+            self.ids.power_button.pos_hint = pos_hint
+        self.ids.power_button.opacity = 1 if visible else 0
+        self.ids.power_button.disabled = not visible
+
+    def render_reaction(self, color_name):
         self.ids.tap_button.background_color = REACTION_COLORS[color_name]
         self.ids.tap_button.text = f"TAP {color_name}"
-        
-        self.reaction_time_start = Clock.get_time()
-        
-        self.reaction_event = Clock.schedule_once(self.reaction_timeout, REACTION_TIME_WINDOW)
+        self.play_sound(SFX_REACTION)
 
-    def reaction_timeout(self):
-        if self.game_running:
-            self.end_game()
-            
-    def on_reaction_tap(self, instance):
-        if not self.game_running: return
-        
-        tap_time = Clock.get_time()
-        reaction_time = tap_time - self.reaction_time_start
-        
-        if self.reaction_event: self.reaction_event.cancel()
+    def render_reaction_time(self, seconds):
+        if self.replayer is not None:
+            return
+        self.latency.record(METRIC_REACTION, self.game_mode, seconds * 1000.0)
 
-        if reaction_time <= REACTION_TIME_WINDOW and self.current_reaction_color:
-            
-            app = App.get_running_app()
-            app.stats_data['total_clicks'] = app.stats_data.get('total_clicks', 0) + 1
-            save_data(STATS_FILE, app.stats_data)
-            
-            self.clicks += 1
-            self.display_clicks = self.clicks
-            
-            self.flash_screen(color=REACTION_COLORS[self.current_reaction_color], duration=0.05)
-            
-            Clock.schedule_once(lambda dt: self.schedule_reaction_cycle(), 0.1)
-            
-        else:
-            app = App.get_running_app()
-            app.stats_data['total_wrong_taps'] = app.stats_data.get('total_wrong_taps', 0) + 1
-            save_data(STATS_FILE, app.stats_data)
-            self.wrong_taps_count += 1
-            self.end_game()
+    def render_flash(self, change):
+        color, duration = change
+        self.feedback.flash(color, duration, time.perf_counter())
 
+    def render_shake(self, change):
+        duration, intensity = change
+        self.shake_screen(duration=duration, intensity=intensity)
 
-    # --- معالجة الأزرار (كلاسيك/بقاء/دقة) ---
-    
-    def on_correct_tap(self, instance):
-        if not self.game_running: return
-        
-        app = App.get_running_app()
-        app.stats_data['total_clicks'] = app.stats_data.get('total_clicks', 0) + 1
-        save_data(STATS_FILE, app.stats_data)
-        
-        self.clicks += (1 * self.click_multiplier) 
-        self.display_clicks = self.clicks
-        
-        self.flash_screen(color=[1, 1, 1, 1], duration=0.05)
-        
-        if self.game_mode == 'survival':
-            self.time_left += SURVIVAL_TIME_BONUS
-            self.update_labels()
-            
-        self.ids.tap_button.background_color = (0.5, 1, 0.5, 1)
-        Clock.schedule_once(lambda dt: setattr(self.ids.tap_button, 'background_color', (0.3, 0.8, 0.3, 1)), 0.1)
+    def render_tap_pulse(self, _):
+        self.feedback.pulse(TAP_PULSE_COLOR, 0.1, time.perf_counter())
+        self.play_sound(SFX_TAP)
 
-    def on_wrong_tap(self, instance):
-        if not self.game_running: return
-        
-        app = App.get_running_app()
-        app.stats_data['total_wrong_taps'] = app.stats_data.get('total_wrong_taps', 0) + 1
-        save_data(STATS_FILE, app.stats_data)
-        
-        self.shake_screen(duration=0.2, intensity=5) 
-        self.flash_screen(color=[1, 0, 0, 1], duration=0.2)
-        
-        if self.game_mode == 'accuracy':
-            self.end_game()
-            return
+    def render_penalty(self, seconds):
+        self.show_timer_notice(f" (-{seconds:.1f}s Penalty!)")
 
-        self.wrong_taps_count += 1
-        self.time_left -= self.penalty_time
-        self.update_timer(0)
-        
-        self.ids.timer_label.text += f" (-{self.penalty_time:.1f}s Penalty!)"
-        Clock.schedule_once(lambda dt: self.update_labels(), 0.5)
+    def render_wrong(self, _):
+        # كل نقرة خاطئة، ورد الفعل الذي فات وقته (ينهي اللعبة بلا عقوبة وقت)
+        self.play_sound(SFX_WRONG)
 
-        self.hide_foe_button()
-        Clock.schedule_once(self.show_foe_button, random.uniform(1, 3))
+    def render_bonus(self, seconds):
+        self.show_timer_notice(f" (+{seconds:g}s TIME BONUS!)")
+        self.play_sound(SFX_POWERUP)
 
-    def on_powerup_tap(self, instance):
-        if not self.game_running: return
-        
-        self.time_left += 2.0 
-        self.update_timer(0)
-        self.ids.timer_label.text += " (+2s TIME BONUS!)"
-        Clock.schedule_once(lambda dt: self.update_labels(), 0.5)
+    def play_sound(self, name):
+        """مؤثر محمّل مسبقًا فقط (audio.py)؛ زمن بدء تشغيله يُقاس للعب الحي."""
+        elapsed_ms = self.audio.trigger(name)
+        if elapsed_ms is not None and self.replayer is None:
+            self.latency.record(METRIC_AUDIO, self.game_mode, elapsed_ms)
 
-        self.hide_powerup_button() 
-        self.powerup_event = Clock.schedule_once(self.show_powerup_button, random.uniform(8, 15))
+    def show_timer_notice(self, notice):
+        """إلحاق تنبيه مؤقت بنص المؤقت لمدة نصف ثانية (التنبيه الأحدث يحل محل السابق)."""
+        self.timer_notice = notice
+        self.update_labels()
+        self._notice_timer = self.effect_timers.reschedule(
+            self._notice_timer, time.perf_counter() + 0.5, self.clear_timer_notice)
+
+    def clear_timer_notice(self, due):
+        self.timer_notice = ""
+        self.update_labels()
 
     # --- التأثيرات البصرية والاهتزاز ---
     
-    def flash_screen(self, color, duration):
+    def apply_feedback(self, *args):
+        self.feedback.apply(time.perf_counter())
+
+    def apply_screen_color(self, color):
         Window.clearcolor = color
-        Clock.schedule_once(lambda dt: self.restore_color(self.background_color), duration)
 
-    def restore_color(self, original_color):
-        app = App.get_running_app()
-        current_theme = next((item for item in SHOP_ITEMS if item['id'] == app.current_theme), None)
-        Window.clearcolor = current_theme['color'] if current_theme else (0, 0, 0, 1)
-        
+    def apply_tap_color(self, color):
+        self.ids.tap_button.background_color = color
+
     def shake_screen(self, duration=0.1, intensity=5):
         original_x = Window.left
         original_y = Window.top
@@ -443,217 +761,205 @@ class GameScreen(Screen):
                
         anim.start(Window)
 
-    # --- إدارة الأزرار والحركة العشوائية ---
-    
-    def show_foe_button(self, dt):
-        if not self.game_running: return
-        
-        self.ids.foe_button.pos_hint = {'x': random.uniform(0.05, 0.65), 'y': random.uniform(0.05, 0.55)}
-        
-        self.ids.foe_button.opacity = 1
-        self.ids.foe_button.disabled = False
-        
-        delay = random.uniform(0.5, 1.5)
-
-        self.foe_event = Clock.schedule_once(self.hide_foe_button, delay)
-    
-    def hide_foe_button(self, dt=None):
-        self.ids.foe_button.opacity = 0
-        self.ids.foe_button.disabled = True
-        if self.game_running and self.game_mode in ['classic', 'survival']:
-            delay = random.uniform(1, 4)
-            self.foe_event = Clock.schedule_once(self.show_foe_button, delay)
-            
-    def show_powerup_button(self, dt):
-        if not self.game_running: return
-        self.ids.power_button.pos_hint = {'x': random.uniform(0.1, 0.7), 'y': random.uniform(0.1, 0.5)}
-        
-        self.ids.power_button.opacity = 1
-        self.ids.power_button.disabled = False
-        self.powerup_event = Clock.schedule_once(self.hide_powerup_button, 1.5)
-    
-    def hide_powerup_button(self, dt=None):
-        self.ids.power_button.opacity = 0
-        self.ids.power_button.disabled = True
-        if self.game_running and self.game_mode not in ['accuracy', 'reaction']:
-            self.powerup_event = Clock.schedule_once(self.show_powerup_button, random.uniform(8, 15))
-
-
     # --- إدارة المؤقت والإنهاء ---
 
     def update_labels(self):
-        if self.game_mode == 'survival':
-             self.ids.timer_label.text = f"Time: {max(0, self.time_left):.2f}s"
-        elif self.game_mode == 'reaction':
-             self.ids.timer_label.text = f"Reaction Clicks"
+        # GlyphLabel: الأرقام من الأطلس، والبادئة والتنبيه نصان ثابتان يُرسمان مرة
+        label = self.ids.timer_label
+        if self.game_mode == 'reaction':
+            label.prefix = "Reaction Clicks"
+            label.text = ""
         else:
-             self.ids.timer_label.text = f"Time: {max(0, self.time_left):.1f}s"
-
-    def update_timer(self, dt):
-        if not self.game_running or self.game_mode in ['accuracy', 'reaction']: return
-
-        self.time_left -= dt
-        self.display_time = self.time_left
-        
-        if self.time_left <= 0:
-            self.time_left = 0
-            self.end_game()
-        
-        self.update_labels()
+            label.prefix = "Time: "
+            digits = 2 if self.game_mode == 'survival' else 1
+            label.text = f"{max(0, self.time_left):.{digits}f}s"
+        label.suffix = self.timer_notice
 
-    def end_game(self):
+    def end_game(self, result):
         app = App.get_running_app()
 
-        # تحديث إجمالي الألعاب قبل إنهاء اللعبة
-        app.stats_data['total_games_played'] = app.stats_data.get('total_games_played', 0) + 1 
-
-        self.game_running = False
-        if self.timer_event: self.timer_event.cancel()
-        if self.foe_event: self.foe_event.cancel()
-        if self.powerup_event: self.powerup_event.cancel()
-        if self.reaction_event: self.reaction_event.cancel()
+        self.stop_ticking()
         
         self.ids.tap_button.text = "Game Over"
         self.ids.tap_button.background_color = (0.5, 0.5, 0.5, 1)
         self.ids.foe_button.opacity = 0
         self.ids.power_button.opacity = 0 
-        
-        coins_gained = 0
-        if self.game_mode in ['classic', 'survival', 'reaction']:
-            coins_gained = int(self.clicks * COINS_PER_CLICK * self.click_multiplier)
-            app.currency_data['coins'] += coins_gained
-            save_data(CURRENCY_FILE, app.currency_data)
-        
-        is_new_high_score = self.process_stats_and_achievements()
+
+        if self.replayer is not None:
+            self.finish_replay(result)
+            return
+        if self.core is not None and self.core.early_taps:
+            Logger.info(f"Game: {self.core.early_taps} tap(s) before the reaction color was presented")
+
+        if result.coins_gained:
+            app.profile.add_coins(result.coins_gained)
+
+        is_new_high_score, ranks = self.process_stats_and_achievements(result)
+        app.profile.save_latency(self.latency.snapshot())
+        app.save_achievement_progress()
+        self.event_log.finish(result)
+        app.profile.save_game_log(result.mode, self.event_log.to_record())
+        # كل تغييرات هذه اللعبة (الجلسة + العملات + الإنجازات + سجل الأحداث) تُكتب في معاملة واحدة
+        app.flush_persistence()
+        app.submit_result(result)
         
         results_screen = self.manager.get_screen('results')
-        
-        if self.game_mode == 'survival':
-            final_score_display = self.time_left
-        elif self.game_mode == 'reaction':
-            final_score_display = self.clicks
-        else:
-            final_score_display = self.clicks
-            
-        results_screen.display_results(final_score_display, coins_gained, is_new_high_score, self.game_mode)
+        results_screen.display_results(result.score, result.coins_gained, is_new_high_score, self.game_mode, ranks)
         self.manager.current = 'results'
 
-    def process_stats_and_achievements(self):
-        app = App.get_running_app()
-        app.game_data["total_games"] = app.game_data.get("total_games", 0) + 1
-        ach = app.game_data.get("achievements", {})
-        
-        # تحديث الإنجازات
-        if self.clicks >= ACHIEVEMENTS_DATA["speed_demon"]["target"] and not ach.get("speed_demon", {}).get("unlocked", False):
-            ach["speed_demon"] = {"unlocked": True}
-            
-        if self.wrong_taps_count == 0 and self.clicks > 0 and not ach.get("focused", {}).get("unlocked", False):
-            ach["focused"] = {"unlocked": True}
-            
-        if app.game_data["total_games"] >= ACHIEVEMENTS_DATA["veteran"]["target"] and not ach.get("veteran", {}).get("unlocked", False):
-            ach["veteran"] = {"unlocked": True}
-            
-        app.game_data["achievements"] = ach
-        save_data(ACHIEVEMENTS_FILE, app.game_data)
+    def finish_replay(self, result):
+        """نهاية إعادة التشغيل: لا تسجيل ولا عملات، فقط مقارنة النتيجة بالمسجلة."""
+        replayer = self.replayer
+        replayer.result = result
+        matched = replayer.log.matches(result)
+        status = "" if matched is None else (" (matches)" if matched else " (DIFFERS)")
+        self.ids.tap_button.text = f"Replay Over{status}"
+        if matched is False:
+            Logger.warning(f"Replay: {result.mode} seed {result.seed} ended with score {result.score}, "
+                           f"recorded {replayer.log.result}")
+
+    def process_stats_and_achievements(self, result):
+        """تسجيل الجلسة ولوحات الصدارة والإنجازات؛ تُرجع (رقم قياسي جديد؟، (الترتيب العام، ترتيب التشكيلة))."""
+        profile = App.get_running_app().profile
+        survived = game_core.time_survived(result)
+
+        # تسجيل الجلسة يحدّث الإجماليات وأفضل نتيجة للوضع في الذاكرة
+        is_new_high_score = profile.record_session(Session(
+            mode=result.mode,
+            score=result.score,
+            taps=result.taps,
+            wrong_taps=result.wrong_taps,
+            time_survived=survived,
+            coins_gained=result.coins_gained,
+        ))
+        # أفضل K للوضع ولتشكيلة الترقيات التي لُعبت بها
+        ranks = profile.record_leaderboard(result.mode, loadout_key(profile.upgrade_levels),
+                                           result.score, survived)
         
-        # تحديث أفضل النتائج والإحصائيات
-        is_new_high_score = False
-        if self.game_mode == 'classic' and self.clicks > app.high_score:
-            app.high_score = self.clicks
-            save_data(SCORE_FILE, {"high_score": app.high_score})
-            is_new_high_score = True
-        elif self.game_mode == 'survival' and self.time_left > app.stats_data.get('survival_high_time', 0.0):
-             app.stats_data['survival_high_time'] = self.time_left
-             is_new_high_score = True
-        elif self.game_mode == 'accuracy' and self.clicks > app.stats_data.get('accuracy_high_score', 0):
-             app.stats_data['accuracy_high_score'] = self.clicks
-             is_new_high_score = True
-        elif self.game_mode == 'reaction' and self.clicks > app.stats_data.get('reaction_high_score', 0):
-             app.stats_data['reaction_high_score'] = self.clicks
-             is_new_high_score = True
-             
-        save_data(STATS_FILE, app.stats_data)
+        # تقييم قواعد الإنجازات المشتركة في نهاية اللعبة (ولهذا الوضع) فقط
+        App.get_running_app().achievements.dispatch(
+            EVENT_GAME_END, result.mode,
+            score=result.score, clicks=result.clicks, taps=result.taps, wrong_taps=result.wrong_taps,
+            penalties=result.penalties, coins_gained=result.coins_gained,
+            time_survived=survived,
+            total_games=profile.total_games, total_clicks=profile.total_clicks)
         
-        return is_new_high_score
+        return is_new_high_score, ranks
 
 
 class ResultsScreen(Screen):
     display_message = StringProperty("Game Over!")
     display_final_score = StringProperty("Score: 0")
     display_coins_gained = StringProperty("Coins Earned: 0")
+    display_rank = StringProperty("")
     
-    def display_results(self, final_score, coins_gained, is_new_high_score, mode):
+    def display_results(self, final_score, coins_gained, is_new_high_score, mode, ranks=(None, None)):
         # تم التأكد من عدم استدعاء أي دالة صوتية هنا
-        app = App.get_running_app()
+        profile = App.get_running_app().profile
+        best = profile.best(mode)
         
-        self.display_coins_gained = f"Coins Earned: {coins_gained} | Total: {app.currency_data['coins']}"
+        self.display_coins_gained = f"Coins Earned: {coins_gained} | Total: {profile.coins}"
+        rank, loadout_rank = ranks
+        if rank is not None:
+            self.display_rank = f"Leaderboard: #{rank}" + (f" | This loadout: #{loadout_rank}" if loadout_rank else "")
+        elif loadout_rank is not None:
+            self.display_rank = f"This loadout: #{loadout_rank}"
+        else:
+            self.display_rank = f"Not in the top {LEADERBOARD_SIZE}"
         
         if mode == 'classic':
-            self.display_final_score = f"Your Score: {final_score}\nClassic Best: {app.high_score}"
+            self.display_final_score = f"Your Score: {final_score}\nClassic Best: {best}"
             self.display_message = "NEW HIGH SCORE!" if is_new_high_score else "Time's Up!"
         elif mode == 'survival':
-            self.display_final_score = f"Time Survived: {final_score:.2f}s\nSurvival Best: {app.stats_data['survival_high_time']:.2f}s"
+            self.display_final_score = f"Time Survived: {final_score:.2f}s\nSurvival Best: {best:.2f}s"
             self.display_message = "New Survival Record!" if is_new_high_score else "Time's Up!"
         elif mode == 'accuracy':
-            self.display_final_score = f"Clicks: {final_score}\nAccuracy Best: {app.stats_data['accuracy_high_score']}"
+            self.display_final_score = f"Clicks: {final_score}\nAccuracy Best: {best}"
             self.display_message = "New Accuracy Record!" if is_new_high_score else "FAILED!"
         elif mode == 'reaction':
-            self.display_final_score = f"Clicks: {final_score}\nReaction Best: {app.stats_data['reaction_high_score']}"
+            self.display_final_score = f"Clicks: {final_score}\nReaction Best: {best}"
             self.display_message = "New Reaction Record!" if is_new_high_score else "FAILED!"
 
 
 class ShopScreen(Screen):
-    
+    """
+    المتجر مبني على نموذج بيانات: صف (قاموس) لكل عنصر في الكتالوج يُبنى مرة واحدة،
+    والشراء أو التفعيل يحدّث فقط حالة وسعر الصفوف المتأثرة.
+    """
+
+    def __init__(self, **kwargs):
+        super(ShopScreen, self).__init__(**kwargs)
+        self._catalog = None
+        self._row_index = {}    # item_id -> موضع الصف في shop_list.data
+
+    def on_kv_post(self, base_widget):
+        App.get_running_app().profile.subscribe((SECTION_COINS,), lambda section: self.update_coins())
+
     def on_enter(self, *args):
-        app = App.get_running_app()
-        self.ids.coins_label.text = f"Your Coins: {app.currency_data['coins']}"
-        self.ids.shop_container.clear_widgets()
-        
-        shop_container = self.ids.shop_container
-        
-        for item in SHOP_ITEMS:
-            # حساب الحالة والسعر والمستوى للعرض
-            status = ""
-            current_level = app.currency_data.get('upgrades', {}).get(item['id'], 0)
-            
-            if item['type'] == 'upgrade':
-                max_level = item.get('max_level', 1)
-                actual_price = item['price'] * (current_level + 1)
-                
-                if current_level >= max_level:
-                    status = "MAX"
-                    display_price = 0
-                else:
-                    status = f"LV {current_level} -> {current_level + 1}"
-                    display_price = actual_price
-            
-            elif item['type'] == 'theme':
-                is_unlocked = item['id'] in app.currency_data.get('unlocked_themes', [])
-                if is_unlocked:
-                    status = "EQUIP" if item['id'] != app.current_theme else "ACTIVE"
-                    display_price = 0
-                else:
-                    status = "UNLOCK"
-                    display_price = item['price']
-
-            # استخدام Factory.ShopItem لإنشاء العنصر المخصص
-            shop_container.add_widget(Factory.ShopItem(
-                item_id=item['id'],
-                item_name=item['name'],
-                item_price=display_price, 
-                item_color=item.get('color', [0.2, 0.2, 0.2, 1]),
-                item_type=item['type'],
-                display_status=status
-            ))
+        self.update_coins()
+        if self._catalog is not CATALOG:
+            self.build_rows()
+        else:
+            # قد تتغير الحالة خارج المتجر (مثل فتح ثيم المكافأة اليومية)
+            self.update_rows(self._row_index)
 
+    def update_coins(self):
+        self.ids.coins_label.text = f"Your Coins: {App.get_running_app().profile.coins}"
+
+    def row_state(self, item):
+        """حساب الحالة والسعر المعروضين لعنصر: (display_status, item_price)."""
+        app = App.get_running_app()
+        profile = app.profile
+        if item['type'] == 'upgrade':
+            current_level = profile.upgrade_level(item['id'])
+            if current_level >= item.get('max_level', 1):
+                return "MAX", 0
+            return f"LV {current_level} -> {current_level + 1}", item['price'] * (current_level + 1)
+        if profile.is_theme_unlocked(item['id']):
+            return ("EQUIP" if item['id'] != app.current_theme else "ACTIVE"), 0
+        return "UNLOCK", item['price']
+
+    def build_rows(self):
+        """بناء نموذج البيانات كاملًا (مرة واحدة، أو عند تغيّر الكتالوج)."""
+        rows = []
+        self._row_index = {}
+        for item in CATALOG.items:
+            status, price = self.row_state(item)
+            self._row_index[item['id']] = len(rows)
+            rows.append({
+                'item_id': item['id'],
+                'item_name': item['name'],
+                'item_price': price,
+                'item_color': CATALOG.item_color(item['id']),
+                'item_type': item['type'],
+                'display_status': status,
+            })
+        self._catalog = CATALOG
+        self.ids.shop_list.data = rows
+
+    def update_rows(self, item_ids):
+        """
+        إعادة حساب صفوف محددة؛ الصف الذي تغيّر فقط يُستبدل في data، فيُحدّث
+        RecycleView عرضه وحده دون إعادة بناء القائمة.
+        """
+        data = self.ids.shop_list.data
+        for item_id in item_ids:
+            index = self._row_index.get(item_id)
+            if index is None:
+                continue
+            row = data[index]
+            status, price = self.row_state(CATALOG[item_id])
+            if row['display_status'] != status or row['item_price'] != price:
+                data[index] = dict(row, display_status=status, item_price=price)
 
     def purchase_or_activate(self, item_id, price, item_type):
         app = App.get_running_app()
+        profile = app.profile
         
-        item = next(item for item in SHOP_ITEMS if item['id'] == item_id)
+        item = CATALOG[item_id]
         
         if item_type == 'upgrade':
-            current_level = app.currency_data.get('upgrades', {}).get(item_id, 0)
+            current_level = profile.upgrade_level(item_id)
             max_level = item.get('max_level', 1)
             
             if current_level >= max_level:
@@ -662,44 +968,38 @@ class ShopScreen(Screen):
             
             actual_price = item['price'] * (current_level + 1)
             
-            if actual_price > app.currency_data['coins']:
+            if not profile.spend_coins(actual_price):
                 self.ids.status_label.text = "Not enough coins!"
                 return
             
-            app.currency_data['coins'] -= actual_price
-            app.currency_data['upgrades'][item_id] = current_level + 1
-            save_data(CURRENCY_FILE, app.currency_data)
+            profile.set_upgrade_level(item_id, current_level + 1)
+            app.flush_persistence()
             self.ids.status_label.text = f"{item['name']} Upgraded to Lv. {current_level + 1}!"
+            self.update_rows((item_id,))
         
         elif item_type == 'theme':
-            is_unlocked = item_id in app.currency_data.get('unlocked_themes', [])
-            
-            if is_unlocked:
+            if profile.is_theme_unlocked(item_id):
                 self.select_theme(item_id)
                 return
                 
-            if price > app.currency_data['coins']:
+            if not profile.spend_coins(price):
                 self.ids.status_label.text = "Not enough coins!"
                 return
                 
-            app.currency_data['coins'] -= price
-            # التأكد من وجود القائمة قبل الإضافة
-            if 'unlocked_themes' not in app.currency_data:
-                 app.currency_data['unlocked_themes'] = []
-            app.currency_data['unlocked_themes'].append(item_id)
-            save_data(CURRENCY_FILE, app.currency_data)
+            profile.unlock_theme(item_id)
+            app.flush_persistence()
             self.ids.status_label.text = f"{item['name']} Unlocked!"
             self.select_theme(item_id)
-            
-        self.on_enter()
 
 
     def select_theme(self, theme_id):
         app = App.get_running_app()
+        previous_theme = app.current_theme
         app.current_theme = theme_id
-        current_theme_data = next((item for item in SHOP_ITEMS if item['id'] == theme_id), None)
-        if current_theme_data:
-             Window.clearcolor = current_theme_data['color']
+        if theme_id in CATALOG.theme_colors:
+             Window.clearcolor = CATALOG.theme_color(theme_id)
+        # صفا الثيم السابق (ACTIVE -> EQUIP) والجديد فقط
+        self.update_rows((previous_theme, theme_id))
         
         self.ids.status_label.text = f"{theme_id.replace('bg_', '').capitalize()} Theme Activated!"
 
@@ -713,17 +1013,84 @@ class StatsScreen(Screen):
     survival_high_time = StringProperty("0.00s")
     accuracy_high_score = NumericProperty(0)
     reaction_high_score = NumericProperty(0)
+    recent_trends = StringProperty("")
+    latency_diagnostics = StringProperty("")
     
     def on_enter(self, *args):
-        app = App.get_running_app()
-        stats = app.stats_data
+        # التجميعات حُمّلت مرة واحدة من جدول sessions المفهرس ويحدّثها المستودع في الذاكرة
+        profile = App.get_running_app().profile
         
-        self.total_clicks = stats.get('total_clicks', 0)
-        self.total_wrong_taps = stats.get('total_wrong_taps', 0)
-        self.total_games_played = stats.get('total_games_played', 0)
-        self.survival_high_time = f"{stats.get('survival_high_time', 0.0):.2f}s"
-        self.accuracy_high_score = stats.get('accuracy_high_score', 0)
-        self.reaction_high_score = stats.get('reaction_high_score', 0)
+        self.total_clicks = profile.total_clicks
+        self.total_wrong_taps = profile.total_wrong_taps
+        self.total_games_played = profile.total_games
+        self.survival_high_time = f"{profile.best('survival'):.2f}s"
+        self.accuracy_high_score = profile.best('accuracy')
+        self.reaction_high_score = profile.best('reaction')
+
+        # متوسط آخر الألعاب لكل وضع
+        trend_lines = []
+        for mode in GAME_MODES:
+            recent = profile.recent_scores(mode)
+            if recent:
+                trend_lines.append(f"{mode.capitalize()}: avg {sum(recent) / len(recent):.1f} (last {len(recent)})")
+        self.recent_trends = "\n".join(trend_lines) if trend_lines else "No games played yet."
+
+        # تشخيص زمن الاستجابة (p50 / p90 / p99 بالملي ثانية، كل الأوضاع)
+        latency = App.get_running_app().latency
+        diag_lines = []
+        for label, metric in (("Tap handling", METRIC_TAP_HANDLER), ("Touch to handled", METRIC_TOUCH_TO_HANDLED),
+                              ("Tap to frame", METRIC_TAP_TO_FRAME), ("Reaction", METRIC_REACTION),
+                              ("Audio trigger", METRIC_AUDIO)):
+            q = latency.quantiles(metric)
+            if q:
+                diag_lines.append(f"{label}: p50 {q[0]:.1f} | p90 {q[1]:.1f} | p99 {q[2]:.1f} ms")
+        self.latency_diagnostics = "\n".join(diag_lines)
+
+# --- شاشة لوحات الصدارة (Leaderboards) ---
+class LeaderboardScreen(Screen):
+    """صفحة واحدة من لوحة محمّلة (أفضل K فقط)؛ الزر الأوسط يبدّل بين كل التشكيلات والتشكيلة الحالية."""
+    board_title = StringProperty("")
+    board_rows = StringProperty("")
+    page_label = StringProperty("")
+
+    def __init__(self, **kwargs):
+        super(LeaderboardScreen, self).__init__(**kwargs)
+        self.mode = 'classic'
+        self.loadout = ALL_LOADOUTS
+        self.page = 0
+
+    def on_enter(self, *args):
+        self.page = 0
+        self.refresh()
+
+    def select_mode(self, mode):
+        self.mode = mode
+        self.page = 0
+        self.refresh()
+
+    def toggle_loadout(self):
+        if self.loadout == ALL_LOADOUTS:
+            self.loadout = loadout_key(App.get_running_app().profile.upgrade_levels)
+        else:
+            self.loadout = ALL_LOADOUTS
+        self.page = 0
+        self.refresh()
+
+    def change_page(self, step):
+        board = App.get_running_app().profile.leaderboard(self.mode, self.loadout)
+        self.page = max(0, min(self.page + step, board.page_count() - 1))
+        self.refresh()
+
+    def refresh(self):
+        board = App.get_running_app().profile.leaderboard(self.mode, self.loadout)
+        scope = "All loadouts" if self.loadout == ALL_LOADOUTS else "Current loadout"
+        self.board_title = f"{self.mode.capitalize()} | {scope}"
+        lines = []
+        for rank, entry in enumerate(board.page(self.page), self.page * PAGE_SIZE + 1):
+            score = f"{entry.score:.2f}s" if self.mode == 'survival' else f"{entry.score:g}"
+            lines.append(f"{rank}. {score}   {entry.played_at[:10]}")
+        self.board_rows = "\n".join(lines) if lines else "No scores yet."
+        self.page_label = f"Page {self.page + 1}/{board.page_count()}"
 
 # --- شاشة المكافآت اليومية (Daily Rewards) ---
 class DailyRewardsScreen(Screen):
@@ -736,20 +1103,14 @@ class DailyRewardsScreen(Screen):
     today_reward_text = StringProperty("")  # يعرض قيمة مكافأة اليوم
     
     def on_enter(self, *args):
-        # تحميل بيانات الحالة وتحديث الواجهة
-        app = App.get_running_app()
-        if "daily_reward" not in app.currency_data:
-            app.currency_data["daily_reward"] = {"last_claim": "", "streak_day": 0, "last_claim_date": ""}
-            save_data(CURRENCY_FILE, app.currency_data)
-
+        # تحديث الواجهة من المستودع (بدون أي I/O)
         self.refresh_view()
 
     def refresh_view(self):
         """تحديث بيانات الشاشة (حالة الستريك، مكافآت الأيام، تمكين زر الجمع)."""
-        app = App.get_running_app()
-        daily = app.currency_data.get("daily_reward", {"last_claim": "", "streak_day": 0, "last_claim_date": ""})
-        last_claim_date = daily.get("last_claim_date", "")
-        streak_day = daily.get("streak_day", 0)
+        profile = App.get_running_app().profile
+        last_claim_date = profile.last_claim_date
+        streak_day = profile.daily_streak_day
 
         today_iso = date.today().isoformat()
         yesterday_iso = (date.today() - timedelta(days=1)).isoformat()
@@ -784,9 +1145,9 @@ class DailyRewardsScreen(Screen):
     def collect_reward(self):
         """تنفيذ عملية جمع المكافأة عند الضغط على زر Collect"""
         app = App.get_running_app()
-        daily = app.currency_data.get("daily_reward", {"last_claim": "", "streak_day": 0, "last_claim_date": ""})
-        last_claim_date = daily.get("last_claim_date", "")
-        streak_day = daily.get("streak_day", 0)
+        profile = app.profile
+        last_claim_date = profile.last_claim_date
+        streak_day = profile.daily_streak_day
 
         today_iso = date.today().isoformat()
         yesterday_iso = (date.today() - timedelta(days=1)).isoformat()
@@ -807,55 +1168,358 @@ class DailyRewardsScreen(Screen):
         reward_amount = DAILY_STREAK_REWARDS[reward_idx]
 
         # منح العملات
-        app.currency_data['coins'] = app.currency_data.get('coins', 0) + reward_amount
+        profile.add_coins(reward_amount)
         # تحديث بيانات الستريك وتاريخ آخر جمع
-        app.currency_data['daily_reward']['streak_day'] = new_streak
-        app.currency_data['daily_reward']['last_claim_date'] = today_iso
+        profile.claim_daily(new_streak, today_iso)
+        app.achievements.dispatch(EVENT_STREAK, streak_day=new_streak)
 
         # إذا كان اليوم السابع: فتح ثيم بريميوم إن لم يكن مفتوحًا
         if new_streak >= 7:
-            if 'unlocked_themes' not in app.currency_data:
-                app.currency_data['unlocked_themes'] = []
-            if 'bg_premium' not in app.currency_data['unlocked_themes']:
-                app.currency_data['unlocked_themes'].append('bg_premium')
+            if profile.unlock_theme('bg_premium'):
                 # اجعل الثيم مفعلًا بشكل افتراضي بعد فتحه (اختياري)
                 app.current_theme = 'bg_premium'
                 # تحديث نافذة الحالة (إن وجدت)
                 # (لا نعرض رسالة مودال هنا — نكتفي بتحديث status)
         
-        save_data(CURRENCY_FILE, app.currency_data)
+        app.save_achievement_progress()
+        app.flush_persistence()
 
         # تحديث واجهة الشاشة والعودة إلى القائمة أو إبقاء المستخدم هنا
         self.collect_message = f"Collected {reward_amount} Coins! (Streak: {new_streak}/7)"
         self.collect_enabled = False
         self.streak_text = f"Current Streak Day: {new_streak} / 7"
-        # تحديث عرض العملات على شاشة القائمة إن كانت ظاهرة
-        if self.manager.has_screen('menu'):
-            menu = self.manager.get_screen('menu')
-            menu.display_coins = f"Coins: {app.currency_data.get('coins', 0)}"
-            menu.check_daily_status()
+        # شاشة القائمة مشتركة في قسمي coins و daily وتُحدَّث تلقائيًا
+
+# --- لوحة الأداء (Performance HUD) ---
+class PerfHud(BoxLayout):
+    """
+    طبقة فوق النافذة نفسها (لا فوق شاشة بعينها) فتظهر فوق أي شاشة بما فيها اللعب،
+    ولا تلتقط إلا لمسات زريها. القياس في PerfMonitor (perf_hud.py): كل دورة Clock
+    تُغلق صفًا، وإرسالات الخصائص تُعد بمراقب على خصائص ودجات الشاشة الحالية
+    (يُعاد الربط عند تبديل الشاشة). النص والخط المصغر يُحدَّثان كل PERF_HUD_REFRESH فقط.
+    """
+    stats_text = StringProperty("")
+    spark_points = ListProperty([])
+    status_text = StringProperty("")
+
+    def __init__(self, monitor, **kwargs):
+        self.monitor = monitor
+        self.manager = None
+        self._watched = []
+        self._frame_event = None
+        self._refresh_event = None
+        super(PerfHud, self).__init__(**kwargs)
+
+    def attach(self, manager):
+        self.manager = manager
+        self.monitor.clear()
+        self.monitor.start()
+        Window.add_widget(self)
+        manager.bind(current_screen=self.watch_screen)
+        self.watch_screen(manager, manager.current_screen)
+        self._frame_event = Clock.schedule_interval(self.on_frame, 0)
+        self._refresh_event = Clock.schedule_interval(self.refresh, PERF_HUD_REFRESH)
+
+    def detach(self):
+        for event in (self._frame_event, self._refresh_event):
+            if event is not None:
+                event.cancel()
+        self._frame_event = self._refresh_event = None
+        if self.manager is not None:
+            self.manager.unbind(current_screen=self.watch_screen)
+        self.unwatch()
+        if self.parent is not None:
+            Window.remove_widget(self)
+        self.monitor.stop()
+
+    def on_frame(self, dt):
+        self.monitor.frame(len(Clock.get_events()))
+
+    def watch_screen(self, manager, screen):
+        """ربط عدّاد الإرسال بكل خاصية في مدير الشاشات والشاشة الحالية وودجاتها."""
+        self.unwatch()
+        if screen is None:
+            return
+        count = self.monitor.count_dispatch
+        for widget in [manager] + list(screen.walk()):
+            for name in widget.properties():
+                uid = widget.fbind(name, count)
+                if uid:
+                    self._watched.append((widget, name, uid))
+
+    def unwatch(self):
+        for widget, name, uid in self._watched:
+            widget.unbind_uid(name, uid)
+        self._watched = []
+
+    def refresh(self, dt):
+        s = self.monitor.summary()
+        if s is None:
+            return
+        self.stats_text = (
+            f"FPS {s['fps']:.0f}  frame avg {s['frame_avg']:.1f} p99 {s['frame_p99']:.1f} "
+            f"max {s['frame_max']:.1f} ms  jank {s['janks']}\n"
+            f"Clock events {s['clock_events']:.0f}  dispatch/frame {s['dispatches_avg']:.0f}  "
+            f"props {len(self._watched)}\n"
+            f"GC {s['gc_collections']} pauses {s['gc_ms']:.1f} ms (max {s['gc_max']:.1f} ms)")
+        spark = self.ids.spark
+        self.spark_points = self.monitor.sparkline(spark.x, spark.y, spark.width, spark.height)
+
+    def dump(self):
+        """كتابة آخر الإطارات في ملف JSON (بجانب profile.db) لإرفاقه بتقرير المشكلة."""
+        screen = self.manager.current if self.manager is not None else ''
+        game = self.manager.built_screen('game') if self.manager is not None else None
+        try:
+            path = self.monitor.dump(dump_path(), screen=screen,
+                                     mode=game.game_mode if game is not None else '',
+                                     window=list(Window.size), kivy=kivy.__version__)
+        except OSError as e:
+            Logger.error(f"PerfHud: dump failed: {e}")
+            self.status_text = "Dump failed"
+            return None
+        self.status_text = f"Saved {os.path.basename(path)}"
+        return path
+
+
+class LazyScreenManager(ScreenManager):
+    """
+    مدير شاشات يبني الشاشة عند أول طلب لها (current أو get_screen) بدل إنشاء كل
+    الشاشات عند التشغيل. prewarm() تبني ما تبقى لاحقًا، شاشة واحدة في كل إطار.
+    """
+
+    def __init__(self, **kwargs):
+        self._factories = {}
+        self._prewarm_queue = []
+        super(LazyScreenManager, self).__init__(**kwargs)
+
+    def register(self, name, factory):
+        """factory(name=...) تُرجع الشاشة؛ لا تُستدعى قبل أول حاجة إليها."""
+        self._factories[name] = factory
+
+    def built_screen(self, name):
+        """الشاشة إن كانت قد بُنيت، وإلا None (دون بنائها)."""
+        for screen in self.screens:
+            if screen.name == name:
+                return screen
+        return None
+
+    def get_screen(self, name):
+        factory = self._factories.pop(name, None)
+        if factory is not None:
+            with startup_trace.phase(f"screen:{name}", startup_trace.CAT_SCREEN):
+                self.add_widget(factory(name=name))
+        return super(LazyScreenManager, self).get_screen(name)
+
+    def has_screen(self, name):
+        return name in self._factories or super(LazyScreenManager, self).has_screen(name)
+
+    def prewarm(self, names=None):
+        """بناء الشاشات المسجلة (أو names) في الإطارات التالية، واحدة لكل إطار."""
+        self._prewarm_queue = [name for name in (names or list(self._factories)) if name in self._factories]
+        if self._prewarm_queue:
+            Clock.schedule_once(self._prewarm_next, 0)
+
+    def _prewarm_next(self, dt):
+        while self._prewarm_queue:
+            name = self._prewarm_queue.pop(0)
+            if name in self._factories:
+                self.get_screen(name)
+                break
+        if self._prewarm_queue:
+            Clock.schedule_once(self._prewarm_next, 0)
+        else:
+            # الإقلاع يكتمل بتجهيز كل الشاشات
+            startup_trace.finish()
+
+
+# الشاشات بترتيب التجهيز المسبق (الأقرب استخدامًا بعد القائمة أولًا)
+SCREENS = (
+    ('menu', MenuScreen),
+    ('mode_select', ModeSelectScreen),
+    ('game', GameScreen),
+    ('results', ResultsScreen),
+    ('shop', ShopScreen),
+    ('daily_rewards', DailyRewardsScreen),
+    ('stats', StatsScreen),
+    ('leaderboard', LeaderboardScreen),
+)
+
+
+def load_kv_rules():
+    """تحليل قواعد KV مرة واحدة لكل عملية؛ تُطبَّق على كل شاشة عند بنائها."""
+    path = resource_find(KV_FILE) or KV_FILE
+    if path not in Builder.files:
+        Builder.load_file(path, rulesonly=True)
+
 
 class ClickerApp(App):
-    high_score = NumericProperty(0)
-    game_data = DictProperty({})
-    currency_data = DictProperty({})
-    stats_data = DictProperty({})
     current_theme = StringProperty("default")
 
     def build(self):
-        self.high_score = load_data(SCORE_FILE, {"high_score": 0}).get("high_score", 0)
-        self.game_data = load_data(ACHIEVEMENTS_FILE, {"total_games": 0, "achievements": {}})
-        self.currency_data = load_data(CURRENCY_FILE, {"coins": 0, "unlocked_themes": ["default"], "upgrades": {}, "daily_reward": {"last_claim": "", "streak_day": 0, "last_claim_date": ""}})
-        self.stats_data = load_data(STATS_FILE, DEFAULT_STATS)
+        with startup_trace.phase('build'):
+            return self._build()
+
+    def _build(self):
+        # مخزن SQLite واحد (مع استيراد ملفات JSON القديمة مرة واحدة)
+        with startup_trace.phase('profile_store'):
+            self.store = ProfileStore(PROFILE_DB_FILE)
+            self.store.import_json_files(SCORE_FILE, ACHIEVEMENTS_FILE, CURRENCY_FILE, STATS_FILE)
+            self.store.seed_leaderboard(LEADERBOARD_SIZE)
+        # كاتب خلفي: التغييرات تُجمع في الذاكرة وتُكتب بعد PERSIST_DEBOUNCE أو عند الحاجة
+        self.persistence = PersistenceWriter(self.store.save)
+        self._persist_trigger = Clock.create_trigger(lambda dt: self.flush_persistence(), self.persistence.debounce)
+
+        # المستودع يُحمَّل مرة واحدة هنا؛ الشاشات تقرأ منه وتشترك في تغييراته
+        self.profile = ProfileRepository(self.store, self.persistence, on_dirty=self.schedule_flush)
+        with startup_trace.phase('profile_load'):
+            self.profile.load()
+        # متجه تأثيرات الترقيات يُحسب مرة ويُلغى تخزينه فقط عند تغيّر مستوى ترقية (الشراء)
+        self.effects = EffectsEngine(CATALOG, lambda: self.profile.upgrade_levels,
+                                     base=base_effects(penalty_time=BASE_PENALTY_TIME))
+        self.profile.subscribe((SECTION_UPGRADES,), self.effects.invalidate)
+        # الإنجازات المقفلة فقط مفهرسة حسب الحدث؛ الفتح يُسجَّل في المستودع
+        self.achievements = AchievementEngine(
+            ACHIEVEMENT_RULES, unlocked=self.profile.unlocked_achievements,
+            progress=self.profile.achievement_progress,
+            on_unlock=lambda rule: self.profile.unlock_achievement(rule['id']))
+        self.profile.subscribe((SECTION_COINS,), lambda section: self.achievements.dispatch(
+            EVENT_COINS, coins=self.profile.coins))
+        # إرسال النتائج من خيط خلفي وطابور دائم في نفس قاعدة البيانات
+        self.submitter = Submitter(self.store, SUBMIT_URL or None)
+        # مخططات زمن الاستجابة (تُحفظ مع نهاية كل لعبة)؛ زمن النقرة حتى الإطار يُغلق عند كل عرض
+        self.latency = LatencyMonitor(self.profile.latency_sketches)
+        Window.bind(on_flip=self.latency.frame_presented)
+        # المؤثرات الصوتية تُحمَّل في الخمول بعد ظهور القائمة (on_start)، لا هنا
+        self.audio = AudioEngine(audio_loader())
+        self.audio.enabled = AUDIO_BACKEND != 'off'
         
-        if not self.current_theme or self.current_theme not in self.currency_data.get('unlocked_themes', []):
+        if not self.current_theme or not self.profile.is_theme_unlocked(self.current_theme):
              self.current_theme = "default"
         
-        current_theme_data = next((item for item in SHOP_ITEMS if item['id'] == self.current_theme), None)
-        Window.clearcolor = current_theme_data['color'] if current_theme_data else (0, 0, 0, 1)
+        Window.clearcolor = CATALOG.theme_color(self.current_theme)
         
-        # تحميل ملف الواجهة (game_design.kv) - تأكد أن الـ KV يحتوي شاشة 'daily_rewards'
-        return Builder.load_file('game_design.kv')
+        # قواعد الواجهة (game_design.kv) تُحلَّل مرة، والقائمة وحدها تُبنى للإطار الأول
+        with startup_trace.phase('kv_rules'):
+            load_kv_rules()
+        if startup_trace.enabled():
+            Window.bind(on_flip=self._first_frame_presented)
+        root = LazyScreenManager()
+        for name, screen_class in SCREENS:
+            root.register(name, screen_class)
+        root.current = 'menu'
+        # لوحة الأداء تُنشأ عند أول إظهار فقط
+        self.perf_hud = None
+        Window.bind(on_key_down=self._on_key_down)
+        return root
+
+    def _first_frame_presented(self, *args):
+        Window.unbind(on_flip=self._first_frame_presented)
+        startup_trace.instant('first_frame')
+
+    def on_start(self):
+        # بقية الشاشات تُجهَّز في إطارات الخمول بعد ظهور القائمة
+        Clock.schedule_once(lambda dt: self.root.prewarm(), PREWARM_DELAY)
+        if self.audio.enabled:
+            Clock.schedule_once(self._preload_audio, PREWARM_DELAY)
+        if PERF_HUD_AT_START:
+            self.toggle_perf_hud()
+        # نتائج بقيت في الطابور من تشغيل سابق تُرسل في الخلفية
+        self.submitter.wake()
+
+    def _preload_audio(self, dt):
+        """صوت واحد لكل إطار حتى تكتمل مجموعة الأصوات."""
+        if self.audio.preload_step():
+            Clock.schedule_once(self._preload_audio, 0)
+
+    def _on_key_down(self, window, key, *args):
+        if key == PERF_HUD_TOGGLE_KEY:
+            self.toggle_perf_hud()
+            return True
+        if key == PERF_HUD_DUMP_KEY and self.perf_hud is not None and self.perf_hud.parent is not None:
+            self.perf_hud.dump()
+            return True
+        return False
+
+    def toggle_perf_hud(self):
+        """إظهار لوحة الأداء أو إخفاؤها؛ تُرجع True إن أصبحت ظاهرة."""
+        if self.perf_hud is not None and self.perf_hud.parent is not None:
+            self.perf_hud.detach()
+            return False
+        if self.perf_hud is None:
+            self.perf_hud = PerfHud(PerfMonitor())
+        self.perf_hud.attach(self.root)
+        return True
+
+    def schedule_flush(self):
+        """يُستدعى بعد كل تعديل في المستودع: كتابة فورية إن حان وقتها، وإلا بعد التأخير."""
+        if self.persistence.due():
+            self.flush_persistence()
+        else:
+            self._persist_trigger()
+
+    def save_achievement_progress(self):
+        """تسليم التقدم نحو الإنجازات للمستودع إن تغيّر (يُكتب مع الدفعة التالية)."""
+        if self.achievements.progress_dirty:
+            self.profile.save_achievement_progress(self.achievements.progress_snapshot())
+
+    def flush_persistence(self, wait=False):
+        """تسليم التغييرات المعلقة للكاتب الخلفي (مع الانتظار اختياريًا)."""
+        self._persist_trigger.cancel()
+        self.persistence.flush(wait=wait, timeout=2.0 if wait else None)
+
+    def replay_last_game(self, speed=1.0):
+        """إعادة تشغيل آخر لعبة مسجلة على شاشة اللعب؛ تُرجع False إن لم يوجد سجل."""
+        record = self.profile.last_game_log()
+        if record is None:
+            return False
+        log = EventLog.from_record(record['header'], record['events'])
+        game = self.root.get_screen('game')
+        game.set_mode(log.mode)
+        game.pending_replay = (log, speed)
+        self.root.current = 'game'
+        return True
+
+    def submit_result(self, result):
+        """تسليم نتيجة لعبة منتهية لطابور الإرسال (لا ينتظر القرص ولا الشبكة)."""
+        self.submitter.submit({
+            "mode": result.mode,
+            "score": result.score,
+            "taps": result.taps,
+            "wrong_taps": result.wrong_taps,
+            "penalties": result.penalties,
+            "time_survived": game_core.time_survived(result),
+            "seed": result.seed,
+            "loadout": loadout_key(self.profile.upgrade_levels),
+            "played_at": datetime.now().isoformat(timespec='seconds'),
+        })
+
+    def on_pause(self):
+        # اللعبة الجارية تتجمد (الوقت والمواعيد) حتى العودة
+        game = self.root.built_screen('game')
+        if game is not None:
+            game.pause_game()
+        self.audio.stop_all()
+        # قد يُقتل التطبيق بعد الإيقاف المؤقت على أندرويد، لذا نكتب كل شيء الآن
+        self.save_achievement_progress()
+        self.flush_persistence(wait=True)
+        self.submitter.persist(timeout=2.0)
+        return True
+
+    def on_resume(self):
+        game = self.root.built_screen('game')
+        if game is not None:
+            game.resume_game()
+        # الشبكة قد تكون عادت: لا داعي لانتظار بقية مهلة التراجع
+        self.submitter.wake()
+
+    def on_stop(self):
+        startup_trace.finish()
+        if self.perf_hud is not None:
+            self.perf_hud.detach()
+        self.audio.stop_all()
+        self.persistence.close(timeout=2.0)
+        self.submitter.close(timeout=2.0)
+        self.store.close()
 
 if __name__ == '__main__':
     ClickerApp().run()
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""
+سجلات ملف اللاعب (Profile Records).
+
+أصناف صغيرة بـ __slots__ بدل القواميس المتداخلة: الحقول معروفة مسبقًا وقيمها
+الافتراضية في مكان واحد (DEFAULTS)، فلا .get(..., default) عند كل قراءة، والسجل
+بلا __dict__ أصغر في الذاكرة وأسرع في الوصول إلى حقوله.
+
+التسلسل المضغوط: compact() تُرجع قائمة القيم بترتيب __slots__ (تمر عبر JSON في
+لقطات الكاتب الخلفي دون تكرار أسماء المفاتيح)، و from_compact() تعكسها؛ القائمة
+الأقصر من الحقول (صيغة أقدم) تُكمل بالقيم الافتراضية.
+
+SCHEMA_VERSION رقم صيغة قاعدة ملف اللاعب؛ ترحيلات profile_store.py ترفع القاعدة
+إليه مرة واحدة عند فتحها، فالقراءات بعد ذلك لا تصلح أي قيمة.
+الوحدة لا تعتمد على Kivy ولا على SQLite.
+"""
+
+SCHEMA_VERSION = 2
+MAX_STREAK_DAY = 7
+# أوضاع اللعب بترتيب العرض (مفاتيح best وجدول sessions والمقاييس لكل وضع)
+GAME_MODES = ('classic', 'survival', 'accuracy', 'reaction')
+
+
+class Record:
+    """أساس السجلات: DEFAULTS بنفس ترتيب __slots__."""
+    __slots__ = ()
+    DEFAULTS = ()
+
+    def __init__(self, *values, **fields):
+        defaults = self.DEFAULTS
+        for i, name in enumerate(self.__slots__):
+            if i < len(values):
+                value = values[i]
+            elif name in fields:
+                value = fields.pop(name)
+            else:
+                value = defaults[i]
+                if isinstance(value, (dict, list, set)):
+                    value = type(value)(value)
+            setattr(self, name, value)
+        if fields:
+            raise TypeError(f"{type(self).__name__}: unknown fields {sorted(fields)}")
+
+    def compact(self):
+        return [getattr(self, name) for name in self.__slots__]
+
+    @classmethod
+    def from_compact(cls, values):
+        return cls(*values[:len(cls.__slots__)])
+
+    def __eq__(self, other):
+        return type(other) is type(self) and self.compact() == other.compact()
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class DailyStreak(Record):
+    """حالة المكافأة اليومية: يوم السلسلة (0..7) وتاريخ آخر جمع (ISO أو '')."""
+    __slots__ = ('streak_day', 'last_claim_date')
+    DEFAULTS = (0, '')
+
+    @classmethod
+    def from_legacy(cls, data):
+        """daily_reward من currency.json القديم (مفاتيح ناقصة أو قيم null)."""
+        streak_day = data.get('streak_day') or 0
+        return cls(max(0, min(int(streak_day), MAX_STREAK_DAY)), data.get('last_claim_date') or '')
+
+
+class Stats(Record):
+    """الإجماليات عبر كل الألعاب."""
+    __slots__ = ('total_clicks', 'total_wrong_taps', 'total_games_played')
+    DEFAULTS = (0, 0, 0)
+
+    def add(self, session):
+        self.total_clicks += session.taps
+        self.total_wrong_taps += session.wrong_taps
+        self.total_games_played += 1
+
+
+class Session(Record):
+    """لعبة منتهية كما تُكتب في جدول sessions (played_at فارغ: وقت الكتابة)."""
+    __slots__ = ('mode', 'score', 'taps', 'wrong_taps', 'time_survived', 'coins_gained', 'played_at')
+    DEFAULTS = ('classic', 0, 0, 0, 0.0, 0, '')
+
+
+class Profile(Record):
+    """
+    حالة اللاعب المحمّلة مرة واحدة (ProfileStore.load_profile): version صيغة القاعدة،
+    upgrades {id: مستوى}، themes قائمة بترتيب الفتح، achievements مجموعة، best {وضع: نتيجة}.
+    """
+    __slots__ = ('version', 'coins', 'daily', 'upgrades', 'themes', 'achievements', 'best', 'stats')
+    DEFAULTS = (SCHEMA_VERSION, 0, None, {}, ['default'], set(), {}, None)
+
+    def __init__(self, *values, **fields):
+        super(Profile, self).__init__(*values, **fields)
+        if self.daily is None:
+            self.daily = DailyStreak()
+        if self.stats is None:
+            self.stats = Stats()
@@ -0,0 +1,195 @@
+"""
+قياسات لوحة الأداء على الجهاز (Performance HUD).
+
+PerfMonitor يسجّل لكل إطار (دورة Clock واحدة) صفًا في حلقة ثابتة الحجم
+(array مخصص مسبقًا، لا تخصيص لكل إطار):
+- زمن الإطار: الفرق بين دورتين متتاليتين (ms). Kivy لا يعيد الرسم إلا عند تغيّر
+  شيء، فأزمنة Window.on_flip تقيس الخمول لا التقطع؛ طول الدورة هو ما يراه اللاعب.
+- عدد أحداث Clock المجدولة في تلك الدورة.
+- عدد إرسالات الخصائص (property dispatch) منذ الإطار السابق: الواجهة تربط
+  count_dispatch بخصائص ودجات الشاشة الحالية.
+- توقفات جامع القمامة (gc) منذ الإطار السابق: مجموعها بالملي ثانية وعددها،
+  عبر gc.callbacks طوال التفعيل فقط.
+
+summary() تلخّص الحلقة (FPS لآخر ثانية، المتوسط و p99 والأقصى، الإطارات المتقطعة)
+و dump() تكتبها ملف JSON يرفقه المختبر بتقرير المشكلة.
+الوحدة لا تعتمد على Kivy: الرسم وقراءة Clock في main.py.
+"""
+import gc
+import json
+import logging
+import time
+from array import array
+
+Logger = logging.getLogger('kivy')
+
+RING_FRAMES = 600          # ~10 ثوانٍ عند 60 إطارًا
+SPARK_FRAMES = 120         # الإطارات المرسومة في الخط المصغر
+SPARK_CAP_MS = 50.0        # سقف محور الخط المصغر (الأطول يُقص)
+TARGET_FRAME_MS = 1000.0 / 60
+JANK_MS = 2 * TARGET_FRAME_MS  # إطار فاتته مزامنة عرض واحدة على الأقل
+DUMP_PREFIX = 'perf_dump_'
+
+FIELDS = ('t', 'frame_ms', 'clock_events', 'dispatches', 'gc_ms', 'gc_collections')
+_T, _FRAME_MS, _CLOCK_EVENTS, _DISPATCHES, _GC_MS, _GC_COUNT = range(len(FIELDS))
+_WIDTH = len(FIELDS)
+
+
+class PerfMonitor:
+    """حلقة آخر capacity إطار مع عدادات الإطار الجاري."""
+
+    def __init__(self, capacity=RING_FRAMES, clock=time.perf_counter):
+        self.capacity = capacity
+        self.clock = clock
+        self._rows = array('d', bytes(8 * _WIDTH * capacity))
+        self._next = 0
+        self.count = 0           # الإطارات المحفوظة (حتى capacity)
+        self.total_frames = 0
+        self.dispatches = 0
+        self._gc_ms = 0.0
+        self._gc_collections = 0
+        self._gc_started = None
+        self._last_frame = None
+        self.enabled = False
+
+    # --- التفعيل ---
+
+    def start(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        self._last_frame = None
+        gc.callbacks.append(self._gc_callback)
+
+    def stop(self):
+        if not self.enabled:
+            return
+        self.enabled = False
+        if self._gc_callback in gc.callbacks:
+            gc.callbacks.remove(self._gc_callback)
+        self._gc_started = None
+
+    def clear(self):
+        self._next = 0
+        self.count = 0
+        self._last_frame = None
+
+    # --- التسجيل ---
+
+    def _gc_callback(self, phase, info):
+        if phase == 'start':
+            self._gc_started = self.clock()
+        elif self._gc_started is not None:
+            self._gc_ms += (self.clock() - self._gc_started) * 1000.0
+            self._gc_collections += 1
+            self._gc_started = None
+
+    def count_dispatch(self, *args):
+        """مراقب يُربط بالخصائص المتابعة؛ يُعد كل إرسال."""
+        self.dispatches += 1
+
+    def frame(self, clock_events, now=None):
+        """إغلاق صف الإطار الجاري؛ أول إطار بعد التفعيل يضبط نقطة البداية فقط."""
+        now = self.clock() if now is None else now
+        last, self._last_frame = self._last_frame, now
+        if last is None:
+            self.dispatches = 0
+            self._gc_ms = 0.0
+            self._gc_collections = 0
+            return
+        rows = self._rows
+        base = self._next * _WIDTH
+        rows[base + _T] = now
+        rows[base + _FRAME_MS] = (now - last) * 1000.0
+        rows[base + _CLOCK_EVENTS] = clock_events
+        rows[base + _DISPATCHES] = self.dispatches
+        rows[base + _GC_MS] = self._gc_ms
+        rows[base + _GC_COUNT] = self._gc_collections
+        self.dispatches = 0
+        self._gc_ms = 0.0
+        self._gc_collections = 0
+        self._next = (self._next + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+        self.total_frames += 1
+
+    # --- القراءة ---
+
+    def _indices(self, last=None):
+        """فهارس الصفوف من الأقدم إلى الأحدث (آخر last صف فقط إن حُدد)."""
+        n = self.count if last is None else min(last, self.count)
+        start = (self._next - n) % self.capacity
+        return [(start + i) % self.capacity for i in range(n)]
+
+    def column(self, field, last=None):
+        offset = FIELDS.index(field)
+        rows = self._rows
+        return [rows[i * _WIDTH + offset] for i in self._indices(last)]
+
+    def rows(self):
+        rows = self._rows
+        return [list(rows[i * _WIDTH:(i + 1) * _WIDTH]) for i in self._indices()]
+
+    def latest(self, field):
+        if not self.count:
+            return 0.0
+        return self._rows[((self._next - 1) % self.capacity) * _WIDTH + FIELDS.index(field)]
+
+    def summary(self, window=1.0):
+        """
+        fps: الإطارات في آخر window ثانية. frame_*: على كل الحلقة (ms).
+        gc_*: مجموع زمن التوقفات وأطولها لإطار واحد. None إن لم يُسجَّل إطار بعد.
+        """
+        if not self.count:
+            return None
+        times = self.column('t')
+        frames = self.column('frame_ms')
+        gc_ms = self.column('gc_ms')
+        cutoff = times[-1] - window
+        recent = sum(1 for t in times if t > cutoff)
+        span = min(window, times[-1] - times[0] + frames[0] / 1000.0)
+        ordered = sorted(frames)
+        return {
+            'frames': self.count,
+            'fps': recent / span if span > 0 else 0.0,
+            'frame_avg': sum(frames) / len(frames),
+            'frame_p99': ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))],
+            'frame_max': ordered[-1],
+            'janks': sum(1 for ms in frames if ms > JANK_MS),
+            'clock_events': self.latest('clock_events'),
+            'dispatches_avg': sum(self.column('dispatches')) / self.count,
+            'gc_ms': sum(gc_ms),
+            'gc_max': max(gc_ms),
+            'gc_collections': int(sum(self.column('gc_collections'))),
+        }
+
+    def sparkline(self, x, y, width, height, frames=SPARK_FRAMES, cap=SPARK_CAP_MS):
+        """نقاط Line لأزمنة آخر frames إطار داخل المستطيل (الأحدث يمينًا)."""
+        values = self.column('frame_ms', frames)
+        if not values:
+            return []
+        step = width / max(1, frames - 1)
+        x0 = x + width - step * (len(values) - 1)
+        points = []
+        for i, ms in enumerate(values):
+            points.append(x0 + i * step)
+            points.append(y + height * min(ms, cap) / cap)
+        return points
+
+    def dump(self, path, **meta):
+        """كتابة الحلقة (من الأقدم) مع الملخص وأي بيانات وصفية (الشاشة، الوضع...)."""
+        document = {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'meta': meta,
+            'summary': self.summary(),
+            'fields': FIELDS,
+            'frames': [[round(v, 4) for v in row] for row in self.rows()],
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(document, f, separators=(',', ':'))
+        Logger.info(f"PerfHud: {self.count} frames written to {path}")
+        return path
+
+
+def dump_path(prefix=DUMP_PREFIX):
+    return f"{prefix}{time.strftime('%Y%m%d_%H%M%S')}.json"
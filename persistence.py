@@ -0,0 +1,199 @@
+"""
+نظام الحفظ في الخلفية (Persistence).
+
+تبقى البيانات في الذاكرة ويُعلَّم كل قسم تغيّر بأنه "متسخ" (dirty)، ثم تُسلَّم
+الأقسام المتسخة دفعة واحدة إلى خيط خلفي وفق سياسة تأخير (debounce) أو عند
+تجاوز عدد معيّن من التغييرات. الخيط الخلفي يمرر الدفعة إلى دالة كتابة (sink)
+مثل ProfileStore.save التي تكتبها في معاملة واحدة. إن فشلت الكتابة تعود الدفعة
+إلى الطابور (اللقطات الأحدث لنفس القسم تغلب) وتُعاد بمهلة تتضاعف مع كل فشل.
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+Logger = logging.getLogger('kivy')
+
+# --- إعدادات الحفظ ---
+PERSIST_DEBOUNCE = 2.0      # أقصى تأخير (ثوانٍ) بين أول تغيير وكتابته
+PERSIST_MAX_PENDING = 50    # عدد التغييرات الذي يفرض الكتابة فورًا
+PERSIST_RETRY_BASE = 0.5    # مهلة أول إعادة بعد فشل الكتابة (ثوانٍ)، تتضاعف حتى PERSIST_RETRY_MAX
+PERSIST_RETRY_MAX = 30.0
+CORRUPT_SUFFIX = '.corrupt'
+
+
+def _compact(value):
+    """سجلات models.py تمر عبر JSON كقائمة قيمها (Record.compact)."""
+    compact = getattr(value, 'compact', None)
+    if compact is None:
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    return compact()
+
+
+def _default_copy(default_data):
+    return default_data.copy() if isinstance(default_data, dict) else default_data
+
+
+def load_data(filename, default_data):
+    """
+    تحميل البيانات من ملف JSON أو إرجاع البيانات الافتراضية.
+    الملف التالف لا يُستبدل بصمت: يُنقل جانبًا إلى <filename>.corrupt ويُسجَّل تحذير.
+    """
+    if not os.path.exists(filename) or os.path.getsize(filename) == 0:
+        return _default_copy(default_data)
+    try:
+        with open(filename, 'r') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        quarantine = filename + CORRUPT_SUFFIX
+        os.replace(filename, quarantine)
+        Logger.warning(f"Persistence: {filename} is corrupt ({e}); moved to {quarantine}, using defaults")
+        return _default_copy(default_data)
+
+
+class PersistenceWriter:
+    """
+    كاتب خلفي يدمج التغييرات (coalescing).
+
+    - mark_dirty() و append() تُستدعيان من خيط الواجهة وتكلفتهما O(1) دون أي I/O.
+    - flush() تأخذ لقطة (نسخة JSON) من الأقسام المتسخة على خيط الواجهة، حتى لا
+      يقرأ الخيط الخلفي قاموسًا يتغير، ثم تسلّمها للخيط الخلفي.
+    - إذا وصلت لقطة جديدة لنفس القسم قبل كتابة السابقة، تُكتب الأحدث فقط.
+    - sink(sections, records) تُستدعى على الخيط الخلفي بكل الدفعة مرة واحدة.
+    - إن رفعت sink استثناءً تُدمج الدفعة في الطابور من جديد: الأقسام التي وصلت لها
+      لقطة أحدث أثناء الكتابة تبقى على الأحدث، والسجلات تعود قبل ما أُضيف بعدها،
+      ثم تُعاد المحاولة بعد مهلة تتضاعف. عند الإغلاق تُحاول مرة أخيرة فقط.
+    """
+
+    def __init__(self, sink, debounce=PERSIST_DEBOUNCE, max_pending=PERSIST_MAX_PENDING, clock=time.monotonic):
+        self.sink = sink
+        self.debounce = debounce
+        self.max_pending = max_pending
+        self._clock = clock
+        self._dirty = {}            # section -> البيانات الحية (مرجع)
+        self._records = []          # سجلات تُضاف مرة واحدة (مثل جلسات اللعب)
+        self._marks = 0
+        self._first_dirty_at = None
+        self._queue = {}            # section -> لقطة بانتظار الكتابة
+        self._queued_records = []
+        self._busy = False
+        self._closed = False
+        self._failures = 0
+        self._retry_at = 0.0
+        self._cond = threading.Condition()
+        self._thread = None
+
+    @property
+    def pending(self):
+        """عدد التغييرات المعلّمة منذ آخر flush."""
+        return self._marks
+
+    def mark_dirty(self, section, data):
+        self._dirty[section] = data
+        self._touch()
+
+    def append(self, record):
+        """إضافة سجل يُكتب مع الدفعة التالية (لا يُدمج مع غيره)."""
+        self._records.append(record)
+        self._touch()
+
+    def _touch(self):
+        self._marks += 1
+        if self._first_dirty_at is None:
+            self._first_dirty_at = self._clock()
+
+    def due(self):
+        """هل حان وقت الكتابة حسب سياسة التأخير أو الحجم؟"""
+        if not self._marks:
+            return False
+        return (self._marks >= self.max_pending
+                or self._clock() - self._first_dirty_at >= self.debounce)
+
+    def flush(self, wait=False, timeout=None):
+        """تسليم كل التغييرات المعلقة للخيط الخلفي (وانتظار الكتابة إن طُلب)."""
+        if self._marks:
+            # json يتعامل مع ObservableDict/ObservableList الخاصة بـ Kivy بخلاف copy.deepcopy،
+            # والسجلات (models.py) تُنسخ قوائم قيم مضغوطة
+            snapshots = {section: json.loads(json.dumps(data, default=_compact))
+                         for section, data in self._dirty.items()}
+            records, self._records = self._records, []
+            self._dirty.clear()
+            self._marks = 0
+            self._first_dirty_at = None
+            with self._cond:
+                self._queue.update(snapshots)
+                self._queued_records.extend(records)
+                self._cond.notify_all()
+            self._ensure_thread()
+        if wait:
+            return self.wait_idle(timeout)
+        return True
+
+    def wait_idle(self, timeout=None):
+        """انتظار انتهاء كل الكتابات المعلقة. تُرجع False عند انتهاء المهلة."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._queue and not self._queued_records and not self._busy, timeout)
+
+    def close(self, timeout=None):
+        """كتابة ما تبقى وإيقاف الخيط الخلفي."""
+        self.flush(wait=True, timeout=timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._closed = False
+            self._thread = threading.Thread(target=self._run, name='persistence-writer', daemon=True)
+            self._thread.start()
+
+    def _write_due(self):
+        if not self._queue and not self._queued_records:
+            return False
+        return self._closed or self._clock() >= self._retry_at
+
+    def _run(self):
+        while True:
+            with self._cond:
+                timeout = max(0.0, self._retry_at - self._clock()) if self._failures else None
+                self._cond.wait_for(lambda: self._write_due() or self._closed, timeout)
+                if not self._queue and not self._queued_records and self._closed:
+                    return
+                if not self._write_due():
+                    continue
+                closing = self._closed
+                sections, self._queue = self._queue, {}
+                records, self._queued_records = self._queued_records, []
+                self._busy = True
+            try:
+                self.sink(sections, records)
+            except Exception as e:
+                self._failed(sections, records, closing, e)
+                if closing:
+                    return
+            else:
+                self._failures = 0
+                self._retry_at = 0.0
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _failed(self, sections, records, closing, error):
+        """إعادة دفعة فشلت كتابتها إلى الطابور وتحديد موعد المحاولة التالية."""
+        what = f"{sorted(sections)} (+{len(records)} records)"
+        if closing:
+            Logger.error(f"Persistence: failed to write {what} while closing; changes lost: {error}")
+            return
+        with self._cond:
+            sections.update(self._queue)
+            self._queue = sections
+            self._queued_records[:0] = records
+        self._failures += 1
+        delay = min(PERSIST_RETRY_MAX, PERSIST_RETRY_BASE * 2 ** (self._failures - 1))
+        self._retry_at = self._clock() + delay
+        Logger.error(f"Persistence: failed to write {what}: {error}; retry in {delay:.1f}s")
@@ -0,0 +1,268 @@
+"""
+مستودع ملف اللاعب (Profile Repository).
+
+نسخة واحدة في الذاكرة يملكها ClickerApp: تُحمَّل من المخزن مرة واحدة عند
+البدء سجلَّ Profile (models.py) من قاعدة مرحّلة، وتوفر دوال وصول واضحة بدل القواميس المتداخلة. كل تعديل يعلّم القسم
+المتغير فقط كمتسخ لدى الكاتب الخلفي، ثم يُبلغ المشتركين في ذلك القسم حتى
+تحدّث الشاشات نفسها دون إعادة القراءة من القرص.
+"""
+import base64
+from collections import deque
+from datetime import datetime
+
+from leaderboard import ALL_LOADOUTS, LEADERBOARD_SIZE, Leaderboards, board_key
+from models import GAME_MODES, DailyStreak
+
+# --- أقسام الإشعارات ---
+SECTION_COINS = 'coins'
+SECTION_DAILY = 'daily'
+SECTION_UPGRADES = 'upgrades'
+SECTION_THEMES = 'themes'
+SECTION_ACHIEVEMENTS = 'achievements'
+SECTION_ACHIEVEMENT_PROGRESS = 'achievement_progress'   # التقدم نحو إنجازات بهدف (achievements.py)
+SECTION_SCORES = 'scores'       # أفضل النتائج والإجماليات (تُشتق من جدول sessions)
+SECTION_LATENCY = 'latency'     # مخططات زمن الاستجابة (instrumentation.py)
+SECTION_LEADERBOARD = 'leaderboard'   # لوحات الصدارة التي تغيرت ({مفتاح اللوحة: نتائجها})
+SECTION_GAME_LOG = 'game_log'   # سجل أحداث آخر لعبة (event_log.py)، يُضاف صفًا جديدًا عند كل كتابة
+
+TREND_GAMES = 10
+
+
+class ProfileRepository:
+    def __init__(self, store, writer, on_dirty=None, trend_games=TREND_GAMES,
+                 leaderboard_size=LEADERBOARD_SIZE):
+        self.store = store
+        self.writer = writer
+        self.on_dirty = on_dirty      # يُستدعى بعد كل تعليم (مثلاً لجدولة flush)
+        self.trend_games = trend_games
+        self.leaderboard_size = leaderboard_size
+        self._subscribers = {}
+        self._last_game_log = None
+        self.loaded = False
+
+    def load(self):
+        """القراءة الوحيدة من القرص؛ الاستدعاءات اللاحقة لا تفعل شيئًا."""
+        if self.loaded:
+            return
+        store = self.store
+        self._state = state = store.load_profile()
+        # مراجع مباشرة للحقول المتغيرة في مكانها (لا بحث عن الحقل في كل وصول)
+        self._upgrades = state.upgrades
+        self._themes = state.themes
+        self._achievements = state.achievements
+        self._best = state.best
+        self._stats = state.stats
+        self._achievement_progress = store.load_achievement_progress()
+        self._latency = store.load_latency()
+        self._recent = {
+            mode: deque(reversed(store.recent_scores(mode, self.trend_games)), maxlen=self.trend_games)
+            for mode in GAME_MODES
+        }
+        # اللوحات نفسها تُقرأ كلٌّ عند أول عرض أو إدراج
+        self.leaderboards = Leaderboards(store.load_leaderboard, self.leaderboard_size,
+                                         next_seq=store.leaderboard_next_seq())
+        self._leaderboard_changes = {}
+        self.loaded = True
+
+    # --- الإشعارات ---
+
+    def subscribe(self, sections, callback):
+        """الاشتراك في قسم أو أكثر؛ callback(section) تُستدعى بعد كل تغيير."""
+        for section in sections:
+            self._subscribers.setdefault(section, []).append(callback)
+
+    def unsubscribe(self, sections, callback):
+        for section in sections:
+            callbacks = self._subscribers.get(section, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def _notify(self, section):
+        for callback in tuple(self._subscribers.get(section, ())):
+            callback(section)
+
+    def _changed(self, section, data):
+        self.writer.mark_dirty(section, data)
+        if self.on_dirty:
+            self.on_dirty()
+        self._notify(section)
+
+    def flush(self, wait=False, timeout=None):
+        """تسليم الأقسام المتسخة للكاتب الخلفي."""
+        return self.writer.flush(wait=wait, timeout=timeout)
+
+    # --- العملات ---
+
+    @property
+    def schema_version(self):
+        return self._state.version
+
+    @property
+    def coins(self):
+        return self._state.coins
+
+    def add_coins(self, amount):
+        if amount:
+            self._state.coins += amount
+            self._changed(SECTION_COINS, self._state.coins)
+
+    def spend_coins(self, amount):
+        """خصم العملات إن كانت كافية؛ تُرجع False دون تغيير إن لم تكفِ."""
+        if amount > self._state.coins:
+            return False
+        self.add_coins(-amount)
+        return True
+
+    # --- المكافأة اليومية ---
+
+    @property
+    def daily_streak_day(self):
+        return self._state.daily.streak_day
+
+    @property
+    def last_claim_date(self):
+        return self._state.daily.last_claim_date
+
+    def claim_daily(self, streak_day, claim_date):
+        self._state.daily = DailyStreak(streak_day, claim_date)
+        self._changed(SECTION_DAILY, self._state.daily)
+
+    # --- الترقيات والثيمات ---
+
+    def upgrade_level(self, item_id):
+        return self._upgrades.get(item_id, 0)
+
+    @property
+    def upgrade_levels(self):
+        """نسخة للقراءة فقط من مستويات الترقيات."""
+        return dict(self._upgrades)
+
+    def set_upgrade_level(self, item_id, level):
+        self._upgrades[item_id] = level
+        self._changed(SECTION_UPGRADES, self._upgrades)
+
+    @property
+    def unlocked_themes(self):
+        return tuple(self._themes)
+
+    def is_theme_unlocked(self, theme_id):
+        return theme_id in self._themes
+
+    def unlock_theme(self, theme_id):
+        """فتح ثيم؛ تُرجع False إن كان مفتوحًا مسبقًا."""
+        if theme_id in self._themes:
+            return False
+        self._themes.append(theme_id)
+        self._changed(SECTION_THEMES, self._themes)
+        return True
+
+    # --- الإنجازات ---
+
+    def is_achievement_unlocked(self, achievement_id):
+        return achievement_id in self._achievements
+
+    def unlock_achievement(self, achievement_id):
+        """فتح إنجاز؛ تُرجع False إن كان مفتوحًا مسبقًا."""
+        if achievement_id in self._achievements:
+            return False
+        self._achievements.add(achievement_id)
+        self._changed(SECTION_ACHIEVEMENTS, sorted(self._achievements))
+        return True
+
+    @property
+    def unlocked_achievements(self):
+        return frozenset(self._achievements)
+
+    @property
+    def achievement_progress(self):
+        return dict(self._achievement_progress)
+
+    def save_achievement_progress(self, progress):
+        """استبدال التقدم المحفوظ بلقطة AchievementEngine.progress_snapshot()."""
+        self._achievement_progress = progress
+        self._changed(SECTION_ACHIEVEMENT_PROGRESS, self._achievement_progress)
+
+    # --- قياسات زمن الاستجابة ---
+
+    @property
+    def latency_sketches(self):
+        return dict(self._latency)
+
+    def save_latency(self, sketches):
+        """استبدال المخططات المحفوظة بلقطة LatencyMonitor.snapshot()."""
+        self._latency = sketches
+        self._changed(SECTION_LATENCY, self._latency)
+
+    # --- لوحات الصدارة ---
+
+    def leaderboard(self, mode, loadout=ALL_LOADOUTS):
+        return self.leaderboards.board(mode, loadout)
+
+    def record_leaderboard(self, mode, loadout, score, time_survived=0.0):
+        """
+        إدراج نتيجة لعبة منتهية في لوحة الوضع ولوحة تشكيلتها؛ تُرجع (الترتيب العام،
+        ترتيب التشكيلة) أو None لكل لوحة لم تدخلها.
+        """
+        played_at = datetime.now().isoformat(timespec='seconds')
+        ranks = self.leaderboards.record(mode, loadout, score, played_at, time_survived)
+        for board_loadout, rank in zip((ALL_LOADOUTS, loadout), ranks):
+            if rank is not None:
+                self._leaderboard_changes[board_key(mode, board_loadout)] = \
+                    self.leaderboards.board(mode, board_loadout).snapshot()
+        if ranks != (None, None):
+            self._changed(SECTION_LEADERBOARD, self._leaderboard_changes)
+        return ranks
+
+    # --- سجلات أحداث الألعاب ---
+
+    def save_game_log(self, mode, record):
+        """حفظ سجل لعبة منتهية (EventLog.to_record()) مرة واحدة."""
+        self._last_game_log = {'mode': mode, 'header': record['header'],
+                               'events': base64.b64encode(record['events']).decode('ascii')}
+        self._changed(SECTION_GAME_LOG, self._last_game_log)
+
+    def last_game_log(self):
+        """آخر سجل (header، events كبايتات)، من الذاكرة أو من المخزن؛ أو None."""
+        record = self._last_game_log
+        if record is not None:
+            return {'header': record['header'], 'events': base64.b64decode(record['events'])}
+        logs = self.store.load_game_logs(limit=1)
+        return logs[0] if logs else None
+
+    # --- النتائج والإحصائيات ---
+
+    def best(self, mode):
+        return self._best.get(mode, 0)
+
+    @property
+    def total_games(self):
+        return self._stats.total_games_played
+
+    @property
+    def total_clicks(self):
+        return self._stats.total_clicks
+
+    @property
+    def total_wrong_taps(self):
+        return self._stats.total_wrong_taps
+
+    def recent_scores(self, mode):
+        """آخر النتائج في وضع معيّن (الأقدم أولًا)."""
+        return tuple(self._recent[mode])
+
+    def record_session(self, session):
+        """
+        تسجيل لعبة منتهية (سجل Session): تحديث الإجماليات وأفضل نتيجة في الذاكرة
+        وإضافة صف الجلسة للدفعة التالية. تُرجع True إذا كانت النتيجة رقمًا قياسيًا جديدًا.
+        """
+        mode, score = session.mode, session.score
+        self._stats.add(session)
+        self._recent[mode].append(score)
+        is_new_best = score > self._best.get(mode, 0)
+        if is_new_best:
+            self._best[mode] = score
+        self.writer.append(session)
+        if self.on_dirty:
+            self.on_dirty()
+        self._notify(SECTION_SCORES)
+        return is_new_best
@@ -0,0 +1,421 @@
+"""
+مخزن ملف اللاعب (SQLite).
+
+قاعدة بيانات واحدة بوضع WAL تحل محل ملفات JSON الأربعة:
+- profile: مفاتيح عامة (قيم مستوردة من الإصدارات القديمة وعلامات الترحيل).
+- currency / upgrades / unlocked_themes: العملات والترقيات والثيمات.
+- achievements: حالة الإنجازات.
+- achievement_progress: التقدم غير المكتمل نحو إنجازات بهدف (achievements.py).
+- sessions: صف لكل لعبة؛ أفضل النتائج والإجماليات تُحسب منه بفهارس.
+- latency_sketches: مخططات كمّيات زمن الاستجابة (JSON مضغوط لكل مقياس/وضع).
+- leaderboard: أفضل K نتيجة لكل لوحة (وضع + تشكيلة ترقيات، leaderboard.py).
+- outbox: نتائج بانتظار الإرسال إلى الخادم (submission.py)، بمفتاح تكرار فريد لكل نتيجة.
+- game_logs: سجلات أحداث آخر الألعاب (event_log.py) لإعادة تشغيلها؛ يُحتفظ بآخر GAME_LOG_KEEP.
+
+صيغة القاعدة في PRAGMA user_version: عند الفتح تُطبَّق الترحيلات الناقصة حتى
+models.SCHEMA_VERSION، كل منها في معاملة مع رفع الرقم، فتُقرأ القيم بعدها كما هي.
+
+كل خيط يملك اتصاله الخاص (WAL يسمح بالقراءة من خيط الواجهة أثناء الكتابة
+من الخيط الخلفي).
+"""
+import base64
+import json
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+
+from leaderboard import ALL_LOADOUTS, Entry, split_board_key
+from models import GAME_MODES, MAX_STREAK_DAY, SCHEMA_VERSION, DailyStreak, Profile, Stats
+from persistence import load_data
+
+GAME_LOG_KEEP = 20
+OUTBOX_LIMIT = 1000   # أقدم النتائج غير المرسلة تُحذف بعد هذا العدد
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profile (
+    key TEXT PRIMARY KEY,
+    value
+);
+CREATE TABLE IF NOT EXISTS currency (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    coins INTEGER NOT NULL DEFAULT 0,
+    streak_day INTEGER NOT NULL DEFAULT 0,
+    last_claim_date TEXT NOT NULL DEFAULT ''
+);
+INSERT OR IGNORE INTO currency (id) VALUES (1);
+CREATE TABLE IF NOT EXISTS upgrades (
+    item_id TEXT PRIMARY KEY,
+    level INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS unlocked_themes (
+    item_id TEXT PRIMARY KEY
+);
+INSERT OR IGNORE INTO unlocked_themes (item_id) VALUES ('default');
+CREATE TABLE IF NOT EXISTS achievements (
+    achievement_id TEXT PRIMARY KEY,
+    unlocked INTEGER NOT NULL DEFAULT 0,
+    unlocked_at TEXT
+);
+CREATE TABLE IF NOT EXISTS achievement_progress (
+    achievement_id TEXT PRIMARY KEY,
+    progress REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    mode TEXT NOT NULL,
+    score NUMERIC NOT NULL,
+    taps INTEGER NOT NULL,
+    wrong_taps INTEGER NOT NULL,
+    time_survived REAL NOT NULL,
+    coins_gained INTEGER NOT NULL,
+    played_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_mode_score ON sessions (mode, score);
+CREATE INDEX IF NOT EXISTS idx_sessions_mode_id ON sessions (mode, id);
+CREATE TABLE IF NOT EXISTS latency_sketches (
+    key TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leaderboard (
+    mode TEXT NOT NULL,
+    loadout TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    score NUMERIC NOT NULL,
+    time_survived REAL NOT NULL,
+    played_at TEXT NOT NULL,
+    PRIMARY KEY (mode, loadout, seq)
+);
+CREATE INDEX IF NOT EXISTS idx_leaderboard_rank ON leaderboard (mode, loadout, score DESC, seq);
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS game_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    mode TEXT NOT NULL,
+    header TEXT NOT NULL,
+    events BLOB NOT NULL,
+    played_at TEXT NOT NULL
+);
+"""
+
+# مفاتيح القيم المستوردة من stats.json / high_score.json (تُضاف إلى تجميعات sessions)
+LEGACY_TOTAL_KEYS = {
+    'total_clicks': 'legacy_total_clicks',
+    'total_wrong_taps': 'legacy_total_wrong_taps',
+    'total_games_played': 'legacy_total_games',
+}
+LEGACY_BEST_KEYS = {mode: f'legacy_best_{mode}' for mode in GAME_MODES}
+LEGACY_KEYS = tuple(LEGACY_TOTAL_KEYS.values()) + tuple(LEGACY_BEST_KEYS.values())
+
+
+class ProfileSchemaError(ValueError):
+    """القاعدة بصيغة أحدث مما يفهمه هذا الإصدار (لا يُكتب فيها)."""
+
+
+def _migrate_baseline(conn):
+    # الإصدار 1: الجداول كما ينشئها SCHEMA (قواعد ما قبل الترقيم مطابقة لها)
+    pass
+
+
+def _migrate_normalize(conn):
+    # الإصدار 2: قيم كانت تُصلح عند كل قراءة تُصلح مرة هنا
+    conn.executemany('INSERT OR IGNORE INTO profile (key, value) VALUES (?, 0)', [(k,) for k in LEGACY_KEYS])
+    conn.executemany('UPDATE profile SET value = 0 WHERE key = ? AND value IS NULL', [(k,) for k in LEGACY_KEYS])
+    conn.execute('UPDATE currency SET streak_day = MAX(0, MIN(streak_day, ?))', (MAX_STREAK_DAY,))
+    conn.execute('DELETE FROM upgrades WHERE level <= 0')
+
+
+# الإصدار -> ترحيل يرفع القاعدة من الإصدار السابق إليه
+MIGRATIONS = {
+    1: _migrate_baseline,
+    2: _migrate_normalize,
+}
+
+
+class ProfileStore:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+        self.version = self.migrate()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        """إغلاق اتصال الخيط الحالي."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # --- الترحيل ---
+
+    def migrate(self, target=SCHEMA_VERSION):
+        """تطبيق الترحيلات الناقصة بالترتيب؛ تُرجع رقم الصيغة بعدها."""
+        conn = self._conn()
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        if version > target:
+            raise ProfileSchemaError(f"{self.path} has schema version {version}, newer than {target}")
+        for number in range(version + 1, target + 1):
+            with conn:
+                MIGRATIONS[number](conn)
+                conn.execute(f'PRAGMA user_version = {number:d}')
+        return target
+
+    # --- القراءة ---
+
+    def get_value(self, key, default=None):
+        row = self._conn().execute('SELECT value FROM profile WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+
+    def load_profile(self):
+        """حالة اللاعب كاملة كسجل Profile (models.py) من قاعدة مرحّلة."""
+        coins, streak_day, last_claim_date = self._conn().execute(
+            'SELECT coins, streak_day, last_claim_date FROM currency WHERE id = 1').fetchone()
+        return Profile(
+            version=self.version,
+            coins=coins,
+            daily=DailyStreak(streak_day, last_claim_date),
+            upgrades=self.load_upgrades(),
+            themes=self.load_themes(),
+            achievements=set(self.load_achievements()),
+            best=self.best_by_mode(),
+            stats=self.totals(),
+        )
+
+    def _legacy_values(self):
+        keys = ', '.join('?' * len(LEGACY_KEYS))
+        return dict(self._conn().execute(f'SELECT key, value FROM profile WHERE key IN ({keys})', LEGACY_KEYS))
+
+    def load_upgrades(self):
+        return dict(self._conn().execute('SELECT item_id, level FROM upgrades'))
+
+    def load_themes(self):
+        return [r[0] for r in self._conn().execute('SELECT item_id FROM unlocked_themes ORDER BY rowid')]
+
+    def load_achievements(self):
+        """معرّفات الإنجازات المفتوحة."""
+        rows = self._conn().execute('SELECT achievement_id FROM achievements WHERE unlocked = 1')
+        return [r[0] for r in rows]
+
+    def load_achievement_progress(self):
+        """التقدم المحفوظ: {achievement_id: قيمة}."""
+        return dict(self._conn().execute('SELECT achievement_id, progress FROM achievement_progress'))
+
+    def best_by_mode(self):
+        """أفضل نتيجة لكل وضع (يستخدم الفهرس mode, score)."""
+        conn = self._conn()
+        legacy = self._legacy_values()
+        best = {}
+        for mode in GAME_MODES:
+            row = conn.execute('SELECT MAX(score) FROM sessions WHERE mode = ?', (mode,)).fetchone()
+            best[mode] = max(legacy[LEGACY_BEST_KEYS[mode]], row[0] if row[0] is not None else 0)
+        return best
+
+    def totals(self):
+        """الإجماليات (Stats): النقرات، النقرات الخاطئة، وعدد الألعاب."""
+        taps, wrong, games = self._conn().execute(
+            'SELECT COALESCE(SUM(taps), 0), COALESCE(SUM(wrong_taps), 0), COUNT(*) FROM sessions').fetchone()
+        legacy = self._legacy_values()
+        return Stats(taps + legacy[LEGACY_TOTAL_KEYS['total_clicks']],
+                     wrong + legacy[LEGACY_TOTAL_KEYS['total_wrong_taps']],
+                     games + legacy[LEGACY_TOTAL_KEYS['total_games_played']])
+
+    def load_latency(self):
+        """مخططات زمن الاستجابة المحفوظة: {key: dict}."""
+        rows = self._conn().execute('SELECT key, data FROM latency_sketches')
+        sketches = {}
+        for key, data in rows:
+            try:
+                sketches[key] = json.loads(data)
+            except ValueError:
+                continue
+        return sketches
+
+    def recent_scores(self, mode, limit=10):
+        """آخر N نتيجة في وضع معيّن (الأحدث أولًا)."""
+        rows = self._conn().execute(
+            'SELECT score FROM sessions WHERE mode = ? ORDER BY id DESC LIMIT ?', (mode, limit))
+        return [r[0] for r in rows]
+
+    def load_leaderboard(self, mode, loadout, limit):
+        """أفضل limit نتيجة للوحة واحدة (عبر الفهرس، دون قراءة سجل الجلسات)."""
+        rows = self._conn().execute(
+            'SELECT score, seq, played_at, time_survived FROM leaderboard '
+            'WHERE mode = ? AND loadout = ? ORDER BY score DESC, seq LIMIT ?', (mode, loadout, limit))
+        return [Entry(*row) for row in rows]
+
+    def leaderboard_next_seq(self):
+        return self._conn().execute('SELECT COALESCE(MAX(seq), 0) + 1 FROM leaderboard').fetchone()[0]
+
+    def load_game_logs(self, limit=GAME_LOG_KEEP, mode=None):
+        """آخر سجلات الأحداث (الأحدث أولًا): [{"id", "mode", "header", "events", "played_at"}]."""
+        query = 'SELECT id, mode, header, events, played_at FROM game_logs'
+        params = ()
+        if mode is not None:
+            query += ' WHERE mode = ?'
+            params = (mode,)
+        rows = self._conn().execute(query + ' ORDER BY id DESC LIMIT ?', params + (limit,))
+        return [{'id': r[0], 'mode': r[1], 'header': r[2], 'events': bytes(r[3]), 'played_at': r[4]}
+                for r in rows]
+
+    def install_id(self):
+        """معرّف ثابت لهذا التثبيت (يُنشأ عند أول طلب)."""
+        value = self.get_value('install_id')
+        if value is None:
+            value = uuid.uuid4().hex
+            with self._conn() as conn:
+                conn.execute("INSERT OR IGNORE INTO profile (key, value) VALUES ('install_id', ?)", (value,))
+            value = self.get_value('install_id')
+        return value
+
+    # --- طابور الإرسال (يستخدمه خيط Submitter وحده) ---
+
+    def outbox_add(self, items):
+        """إضافة نتائج ({"key", ...}) للطابور؛ المفتاح المكرر يُتجاهل."""
+        with self._conn() as conn:
+            conn.executemany('INSERT OR IGNORE INTO outbox (key, payload) VALUES (?, ?)',
+                             [(item['key'], json.dumps({k: v for k, v in item.items() if k != 'key'},
+                                                       separators=(',', ':')))
+                              for item in items])
+            conn.execute('DELETE FROM outbox WHERE id <= (SELECT MAX(id) FROM outbox) - ?', (OUTBOX_LIMIT,))
+
+    def outbox_batch(self, limit):
+        """أقدم limit نتيجة: [(key, payload JSON), ...]."""
+        return self._conn().execute('SELECT key, payload FROM outbox ORDER BY id LIMIT ?', (limit,)).fetchall()
+
+    def outbox_remove(self, keys):
+        with self._conn() as conn:
+            conn.executemany('DELETE FROM outbox WHERE key = ?', [(key,) for key in keys])
+
+    def outbox_count(self):
+        return self._conn().execute('SELECT COUNT(*) FROM outbox').fetchone()[0]
+
+    # --- الكتابة ---
+
+    def save(self, sections, sessions):
+        """
+        كتابة الأقسام المتسخة فقط وجلسات اللعب (سجلات Session) في معاملة واحدة.
+        الأقسام الممكنة: coins, daily (DailyStreak مضغوط), upgrades, themes, achievements,
+        achievement_progress, latency, leaderboard, game_log.
+        """
+        conn = self._conn()
+        with conn:
+            self._write_sections(conn, sections)
+            now = datetime.now().isoformat(timespec='seconds')
+            conn.executemany(
+                'INSERT INTO sessions (mode, score, taps, wrong_taps, time_survived, coins_gained, played_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(s.mode, s.score, s.taps, s.wrong_taps, s.time_survived, s.coins_gained, s.played_at or now)
+                 for s in sessions])
+
+    def _write_sections(self, conn, sections):
+        if 'coins' in sections:
+            conn.execute('UPDATE currency SET coins = ? WHERE id = 1', (int(sections['coins']),))
+        if 'daily' in sections:
+            daily = DailyStreak.from_compact(sections['daily'])
+            conn.execute('UPDATE currency SET streak_day = ?, last_claim_date = ? WHERE id = 1',
+                         (daily.streak_day, daily.last_claim_date))
+        if 'upgrades' in sections:
+            conn.executemany('INSERT OR REPLACE INTO upgrades (item_id, level) VALUES (?, ?)',
+                             sections['upgrades'].items())
+        if 'themes' in sections:
+            conn.executemany('INSERT OR IGNORE INTO unlocked_themes (item_id) VALUES (?)',
+                             [(t,) for t in sections['themes']])
+        if 'achievements' in sections:
+            self._write_achievements(conn, sections['achievements'])
+        if 'achievement_progress' in sections:
+            # لقطة كاملة: الإنجاز المفتوح يخرج منها فيُحذف صفه
+            progress = sections['achievement_progress']
+            conn.execute('DELETE FROM achievement_progress')
+            conn.executemany('INSERT INTO achievement_progress (achievement_id, progress) VALUES (?, ?)',
+                             progress.items())
+        if 'latency' in sections:
+            conn.executemany('INSERT OR REPLACE INTO latency_sketches (key, data) VALUES (?, ?)',
+                             [(key, json.dumps(data, separators=(',', ':')))
+                              for key, data in sections['latency'].items()])
+        if 'leaderboard' in sections:
+            # كل لوحة متغيرة تُستبدل كاملة (K صفًا على الأكثر)
+            for key, entries in sections['leaderboard'].items():
+                mode, loadout = split_board_key(key)
+                conn.execute('DELETE FROM leaderboard WHERE mode = ? AND loadout = ?', (mode, loadout))
+                conn.executemany(
+                    'INSERT INTO leaderboard (mode, loadout, seq, score, time_survived, played_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?)', [(mode, loadout, *entry) for entry in entries])
+        if 'game_log' in sections:
+            self._write_game_log(conn, sections['game_log'])
+
+    def _write_game_log(self, conn, record):
+        # الأحداث تصل base64 لأن لقطات الكاتب الخلفي تمر عبر JSON؛ تُخزَّن BLOB خامًا
+        conn.execute('INSERT INTO game_logs (mode, header, events, played_at) VALUES (?, ?, ?, ?)',
+                     (record['mode'], record['header'], base64.b64decode(record['events']),
+                      record.get('played_at') or datetime.now().isoformat(timespec='seconds')))
+        conn.execute('DELETE FROM game_logs WHERE id <= (SELECT MAX(id) FROM game_logs) - ?', (GAME_LOG_KEEP,))
+
+    def _write_achievements(self, conn, achievement_ids):
+        now = datetime.now().isoformat(timespec='seconds')
+        conn.executemany(
+            'INSERT OR IGNORE INTO achievements (achievement_id, unlocked, unlocked_at) VALUES (?, 1, ?)',
+            [(key, now) for key in achievement_ids])
+
+    # --- الترحيل من ملفات JSON ---
+
+    def import_json_files(self, score_file, achievements_file, currency_file, stats_file):
+        """
+        استيراد ملفات JSON القديمة مرة واحدة فقط (تُسجَّل العلامة json_imported).
+        الملفات نفسها لا تُحذف.
+        """
+        if self.get_value('json_imported'):
+            return False
+        high_score = load_data(score_file, {"high_score": 0}).get("high_score", 0)
+        game_data = load_data(achievements_file, {"total_games": 0, "achievements": {}})
+        currency = load_data(currency_file, {})
+        stats = load_data(stats_file, {})
+
+        legacy = {LEGACY_TOTAL_KEYS[k]: stats.get(k, 0) for k in LEGACY_TOTAL_KEYS}
+        legacy[LEGACY_TOTAL_KEYS['total_games_played']] = max(
+            stats.get('total_games_played', 0), game_data.get('total_games', 0))
+        legacy[LEGACY_BEST_KEYS['classic']] = high_score
+        legacy[LEGACY_BEST_KEYS['survival']] = stats.get('survival_high_time', 0.0)
+        legacy[LEGACY_BEST_KEYS['accuracy']] = stats.get('accuracy_high_score', 0)
+        legacy[LEGACY_BEST_KEYS['reaction']] = stats.get('reaction_high_score', 0)
+        # نفس قاعدة الترحيل 2: لا قيم null، فالقراءة لا تصلح شيئًا
+        legacy = {key: value or 0 for key, value in legacy.items()}
+        legacy['json_imported'] = 1
+
+        sections = {'achievements': [k for k, v in game_data.get('achievements', {}).items() if v.get('unlocked')]}
+        if currency:
+            sections['coins'] = currency.get('coins', 0)
+            sections['daily'] = DailyStreak.from_legacy(currency.get('daily_reward') or {}).compact()
+            sections['upgrades'] = currency.get('upgrades', {})
+            sections['themes'] = currency.get('unlocked_themes', [])
+        with self._conn() as conn:
+            self._write_sections(conn, sections)
+            conn.executemany('INSERT OR REPLACE INTO profile (key, value) VALUES (?, ?)', legacy.items())
+        return True
+
+    def seed_leaderboard(self, size):
+        """
+        ملء اللوحات العامة مرة واحدة من جدول sessions (تُسجَّل العلامة leaderboard_seeded).
+        الجلسات القديمة بلا تشكيلة معروفة، فلا تدخل لوحات التشكيلات.
+        """
+        if self.get_value('leaderboard_seeded'):
+            return False
+        with self._conn() as conn:
+            for mode in GAME_MODES:
+                conn.execute(
+                    'INSERT OR IGNORE INTO leaderboard (mode, loadout, seq, score, time_survived, played_at) '
+                    'SELECT mode, ?, id, score, time_survived, played_at FROM sessions '
+                    'WHERE mode = ? ORDER BY score DESC, id LIMIT ?', (ALL_LOADOUTS, mode, size))
+            conn.execute("INSERT OR REPLACE INTO profile (key, value) VALUES ('leaderboard_seeded', 1)")
+        return True
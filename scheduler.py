@@ -0,0 +1,110 @@
+"""
+جدولة المواعيد داخل اللعبة (Deadline Scheduler).
+
+طابور أولويات (heap) لمواعيد مطلقة على ساعة رتيبة واحدة، يُقدَّم من استدعاء
+إطار واحد عبر run_due(now). كل موعد يُرجع مقبضًا (Deadline) يمكن إلغاؤه، ويمكن
+إيقاف الجدول كله مؤقتًا واستئنافه (تُزاح كل المواعيد بمدة الإيقاف).
+
+الاستدعاء يستقبل وقت الموعد نفسه لا وقت الإطار، فالمواعيد المتسلسلة (مثل ظهور
+زر ثم إخفائه بعد مدة) تُحسب من اللحظة الدقيقة دون تراكم انحراف الإطارات.
+الوحدة لا تعتمد على Kivy.
+"""
+import heapq
+import itertools
+
+
+class Deadline:
+    """مقبض موعد واحد؛ cancel() تلغيه دون البحث عنه في الطابور."""
+    __slots__ = ('due', 'seq', 'callback', 'args', 'cancelled')
+
+    def __init__(self, due, seq, callback, args):
+        self.due = due
+        self.seq = seq
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def __lt__(self, other):
+        return (self.due, self.seq) < (other.due, other.seq)
+
+    def cancel(self):
+        self.cancelled = True
+
+    @property
+    def active(self):
+        return not self.cancelled
+
+
+class DeadlineScheduler:
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+        self._paused_at = None
+
+    def __len__(self):
+        return sum(1 for entry in self._heap if not entry.cancelled)
+
+    @property
+    def paused(self):
+        return self._paused_at is not None
+
+    @property
+    def next_due(self):
+        """أقرب موعد غير ملغى (أو None)."""
+        heap = self._heap
+        while heap and heap[0].cancelled:
+            heapq.heappop(heap)
+        return heap[0].due if heap else None
+
+    def schedule_at(self, due, callback, *args):
+        """جدولة callback(due, *context, *args) عند الوقت المطلق due."""
+        entry = Deadline(due, next(self._seq), callback, args)
+        heapq.heappush(self._heap, entry)
+        return entry
+
+    def reschedule(self, handle, due, callback=None, *args):
+        """إلغاء مقبض (إن وُجد) وجدولة بديل؛ يُرجع المقبض الجديد."""
+        if handle is not None:
+            handle.cancel()
+            if callback is None:
+                callback, args = handle.callback, handle.args
+        return self.schedule_at(due, callback, *args)
+
+    def run_due(self, now, *context):
+        """
+        تنفيذ كل المواعيد المستحقة حتى now بترتيب أوقاتها. الاستدعاءات قد تجدول
+        مواعيد جديدة، وتُنفَّذ في نفس الدورة إن استحقت هي أيضًا. تُرجع عدد المنفَّذ.
+        """
+        if self._paused_at is not None:
+            return 0
+        heap = self._heap
+        ran = 0
+        while heap and heap[0].due <= now:
+            entry = heapq.heappop(heap)
+            if entry.cancelled:
+                continue
+            entry.cancelled = True      # المقبض لم يعد نشطًا بعد التنفيذ
+            entry.callback(entry.due, *context, *entry.args)
+            ran += 1
+        return ran
+
+    def pause(self, now):
+        if self._paused_at is None:
+            self._paused_at = now
+
+    def resume(self, now):
+        """استئناف مع إزاحة كل المواعيد بمدة الإيقاف؛ تُرجع هذه المدة."""
+        if self._paused_at is None:
+            return 0.0
+        offset = max(0.0, now - self._paused_at)
+        self._paused_at = None
+        # إضافة نفس الإزاحة لكل العناصر تحافظ على ترتيب الـ heap
+        for entry in self._heap:
+            entry.due += offset
+        return offset
+
+    def clear(self):
+        for entry in self._heap:
+            entry.cancelled = True
+        self._heap.clear()
+        self._paused_at = None
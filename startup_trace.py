@@ -0,0 +1,274 @@
+"""
+متتبع زمن الإقلاع (Startup Trace).
+
+يُفعَّل بمتغير البيئة CLICKER_STARTUP_TRACE (القيمة 1 للمسار الافتراضي، أو مسار
+ملف الإخراج) أو بجعل TRACE_BY_DEFAULT = True في بناء خاص. يجب أن يُستورد قبل
+Kivy (أول سطر في main.py) حتى يلتقط زمن استيراد كل وحدة.
+
+يسجّل على خط زمني واحد يبدأ من لحظة بدء العملية (حين تتوفر /proc، كما على
+أندرويد ولينكس):
+- زمن تنفيذ كل وحدة مستوردة (متداخلًا: الوحدة تشمل ما تستورده).
+- المراحل المسماة عبر phase() (الكتالوج، المخزن، قواعد KV، ...).
+- زمن بناء كل شاشة، وأحداث لحظية عبر instant() مثل أول إطار معروض.
+
+finish() تكتب ملف Chrome trace (يُفتح في chrome://tracing أو Perfetto) وملخصًا
+نصيًا بجانبه (.log) وتُسجّله في سجل Kivy، ثم يتوقف التتبع. بدون تفعيل تكون كل
+الدوال بلا أثر تقريبًا. الوحدة لا تعتمد على Kivy.
+"""
+import importlib.abc
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+Logger = logging.getLogger('kivy')
+
+TRACE_ENV = 'CLICKER_STARTUP_TRACE'
+TRACE_BY_DEFAULT = False
+DEFAULT_TRACE_FILE = 'startup_trace.json'
+SUMMARY_TOP_IMPORTS = 10
+
+CAT_IMPORT = 'import'
+CAT_PHASE = 'phase'
+CAT_SCREEN = 'screen'
+
+
+def process_age():
+    """الثواني منذ بدء العملية (من /proc)، أو None إن لم تتوفر."""
+    try:
+        with open('/proc/self/stat') as f:
+            stat = f.read()
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        # اسم العملية بين قوسين قد يحوي مسافات؛ الحقول تُعد بعد آخر قوس
+        fields = stat[stat.rindex(')') + 2:].split()
+        started = int(fields[19]) / os.sysconf('SC_CLK_TCK')
+        return max(0.0, uptime - started)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class _TimedLoader:
+    """غلاف مؤقت لمحمّل وحدة يقيس exec_module ثم يُرجع المحمّل الأصلي للوحدة."""
+
+    def __init__(self, loader, name, tracer):
+        self._loader = loader
+        self._name = name
+        self._tracer = tracer
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        start = self._tracer.clock()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._tracer.complete(self._name, CAT_IMPORT, start)
+            module.__loader__ = self._loader
+            if getattr(module, '__spec__', None) is not None:
+                module.__spec__.loader = self._loader
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    """أول باحث في sys.meta_path: يسأل بقية الباحثين ويغلّف المحمّل الناتج."""
+
+    def __init__(self, tracer):
+        self.tracer = tracer
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                spec.loader = _TimedLoader(spec.loader, fullname, self.tracer)
+            return spec
+        return None
+
+
+class StartupTracer:
+    """أحداث بصيغة Chrome trace (ts و dur بالميكروثانية منذ بدء العملية)."""
+    enabled = True
+
+    def __init__(self, path, clock=time.perf_counter):
+        self.path = path
+        self.clock = clock
+        now = clock()
+        age = process_age()
+        self.from_process_start = age is not None
+        self.origin = now - (age or 0.0)
+        self.events = []
+        self.finished = False
+        if self.from_process_start:
+            self.complete('interpreter', CAT_PHASE, self.origin, now)
+        self._pid = os.getpid()
+        self._import_timer = _ImportTimer(self)
+        sys.meta_path.insert(0, self._import_timer)
+
+    def _us(self, t):
+        return round((t - self.origin) * 1e6, 1)
+
+    def complete(self, name, cat, start, end=None):
+        end = self.clock() if end is None else end
+        self.events.append({'name': name, 'cat': cat, 'ph': 'X', 'ts': self._us(start),
+                            'dur': round((end - start) * 1e6, 1), 'pid': 1, 'tid': 1})
+
+    @contextmanager
+    def phase(self, name, cat=CAT_PHASE):
+        if self.finished:
+            yield
+            return
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.complete(name, cat, start)
+
+    def instant(self, name):
+        if self.finished:
+            return
+        self.events.append({'name': name, 'cat': CAT_PHASE, 'ph': 'i', 's': 'g',
+                            'ts': self._us(self.clock()), 'pid': 1, 'tid': 1})
+
+    def stop(self):
+        if self._import_timer in sys.meta_path:
+            sys.meta_path.remove(self._import_timer)
+
+    def finish(self):
+        """إيقاف التتبع وكتابة الملفين؛ تُرجع نص الملخص."""
+        if self.finished:
+            return None
+        self.stop()
+        self.instant('trace_end')
+        self.finished = True
+        summary = summarize(self.events, self.from_process_start)
+        trace = {'traceEvents': self.events, 'displayTimeUnit': 'ms',
+                 'otherData': {'pid': self._pid, 'python': sys.version.split()[0],
+                               'platform': sys.platform, 'from_process_start': self.from_process_start}}
+        try:
+            with open(self.path, 'w') as f:
+                json.dump(trace, f)
+            with open(os.path.splitext(self.path)[0] + '.log', 'w') as f:
+                f.write(summary + '\n')
+        except OSError as e:
+            Logger.warning(f"StartupTrace: cannot write {self.path} ({e})")
+        for line in summary.splitlines():
+            Logger.info(f"StartupTrace: {line}")
+        return summary
+
+
+class _NullTracer:
+    enabled = False
+    finished = True
+
+    @contextmanager
+    def phase(self, name, cat=CAT_PHASE):
+        yield
+
+    def instant(self, name):
+        pass
+
+    def finish(self):
+        return None
+
+
+def _self_times(events):
+    """الزمن الذاتي لكل حدث import (مدته ناقص مدد الواردات المتداخلة فيه مباشرة)."""
+    imports = sorted((e for e in events if e['cat'] == CAT_IMPORT), key=lambda e: (e['ts'], -e['dur']))
+    result = {}
+    stack = []
+    for event in imports:
+        end = event['ts'] + event['dur']
+        while stack and stack[-1][1] < end:
+            stack.pop()
+        if stack:
+            result[stack[-1][0]['name']] -= event['dur']
+        result[event['name']] = event['dur']
+        stack.append((event, end))
+    return result
+
+
+def _import_total(events):
+    """مجموع مدد الواردات الخارجية فقط (الداخلية محسوبة ضمنها)."""
+    total, covered_until = 0.0, -1.0
+    for event in sorted((e for e in events if e['cat'] == CAT_IMPORT), key=lambda e: e['ts']):
+        if event['ts'] >= covered_until:
+            total += event['dur']
+            covered_until = event['ts'] + event['dur']
+    return total
+
+
+def totals(events):
+    """
+    الأرقام القابلة للمقارنة بين إصدارين (بالملي ثانية): first_frame و imports
+    ومدة كل مرحلة وكل شاشة بأسمائها.
+    """
+    result = {}
+    for event in events:
+        if event['ph'] == 'i' and event['name'] == 'first_frame':
+            result['first_frame'] = event['ts'] / 1000.0
+        elif event['ph'] == 'X' and event['cat'] in (CAT_PHASE, CAT_SCREEN):
+            result[event['name']] = result.get(event['name'], 0.0) + event['dur'] / 1000.0
+    result['imports'] = _import_total(events) / 1000.0
+    return result
+
+
+def summarize(events, from_process_start=True):
+    """ملخص نصي: أول إطار، إجمالي الاستيراد وأبطأ الوحدات، المراحل، والشاشات."""
+    def ms(us):
+        return f"{us / 1000.0:.1f} ms"
+
+    lines = []
+    origin = "process start" if from_process_start else "trace start"
+    first_frame = next((e for e in events if e['ph'] == 'i' and e['name'] == 'first_frame'), None)
+    if first_frame is not None:
+        lines.append(f"first frame at {ms(first_frame['ts'])} after {origin}")
+
+    self_times = _self_times(events)
+    if self_times:
+        lines.append(f"imports: {ms(_import_total(events))} across {len(self_times)} modules")
+        slowest = sorted(self_times.items(), key=lambda item: -item[1])[:SUMMARY_TOP_IMPORTS]
+        lines.append("  slowest (self): " + ", ".join(f"{name} {ms(us)}" for name, us in slowest))
+
+    for label, cat in (("phases", CAT_PHASE), ("screens", CAT_SCREEN)):
+        items = [e for e in events if e['cat'] == cat and e['ph'] == 'X']
+        if items:
+            lines.append(f"{label}: " + ", ".join(f"{e['name']} {ms(e['dur'])}" for e in items))
+    return "\n".join(lines)
+
+
+def _from_env():
+    value = os.environ.get(TRACE_ENV, '')
+    if value.lower() in ('', '0', 'false', 'no'):
+        if not TRACE_BY_DEFAULT:
+            return _NullTracer()
+        value = '1'
+    path = DEFAULT_TRACE_FILE if value.lower() in ('1', 'true', 'yes') else value
+    return StartupTracer(path)
+
+
+TRACER = _from_env()
+
+
+def enabled():
+    return TRACER.enabled and not TRACER.finished
+
+
+def phase(name, cat=CAT_PHASE):
+    return TRACER.phase(name, cat)
+
+
+def instant(name):
+    TRACER.instant(name)
+
+
+def finish():
+    return TRACER.finish()
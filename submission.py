@@ -0,0 +1,304 @@
+"""
+طابور إرسال النتائج إلى الخادم (Score Submission Outbox).
+
+submit() على خيط الواجهة لا تفعل سوى إضافة النتيجة إلى قائمة في الذاكرة وإيقاظ
+خيط خلفي واحد، وهو وحده الذي:
+- يحفظ النتائج الجديدة فورًا في جدول outbox في profile.db (طابور دائم ينجو من
+  قتل التطبيق وانقطاع الشبكة)، لكل نتيجة مفتاح تكرار (idempotency key) ثابت.
+- يجمعها دفعات (حتى batch_size، أو بعد linger ثوانٍ من أقدم نتيجة) ويرسل كل دفعة
+  طلب POST واحدًا مضغوطًا gzip عبر اتصال HTTP واحد يبقى مفتوحًا (keep-alive).
+- يحذف من الطابور ما أكّد الخادم استلامه (جديدًا أو مكررًا)، وعند الفشل ينتظر
+  مهلة تتضاعف مع كل فشل متتالٍ (مع تذبذب عشوائي، ويحترم Retry-After).
+- إن فشلت كتابة النتائج الجديدة في outbox تبقى في الذاكرة أمام ما وصل بعدها،
+  وتُعاد الكتابة بنفس التراجع الأسّي (عداد فشل مستقل عن الإرسال).
+
+إعادة إرسال دفعة بعد انقطاع لا تكرر النتائج: الخادم يتجاهل المفاتيح التي رآها.
+الوحدة لا تعتمد على Kivy.
+"""
+import gzip
+import http.client
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+Logger = logging.getLogger('kivy')
+
+SUBMIT_PATH = '/v1/scores'
+BATCH_SIZE = 50
+LINGER = 2.0              # ثوانٍ لانتظار نتائج أخرى قبل إرسال دفعة غير ممتلئة
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 300.0
+REQUEST_TIMEOUT = 10.0
+# أخطاء الخادم المؤقتة؛ بقية أخطاء 4xx تعني دفعة مرفوضة لا يفيد إعادة إرسالها
+RETRY_STATUSES = frozenset((408, 429, 500, 502, 503, 504))
+
+
+def new_key():
+    """مفتاح تكرار فريد لنتيجة واحدة (يبقى معها في كل إعادة إرسال)."""
+    return uuid.uuid4().hex
+
+
+def backoff_delay(failures, base=BACKOFF_BASE, cap=BACKOFF_MAX, rng=random):
+    """مهلة المحاولة التالية بعد failures فشلًا متتاليًا: أسّية مع تذبذب بين النصف والكامل."""
+    delay = min(cap, base * (2 ** max(0, failures - 1)))
+    return delay * rng.uniform(0.5, 1.0)
+
+
+def encode_batch(client_id, items):
+    """جسم الطلب: JSON مضغوط gzip."""
+    body = json.dumps({'client': client_id, 'results': items}, separators=(',', ':')).encode('utf-8')
+    return gzip.compress(body, compresslevel=6)
+
+
+class SubmissionError(Exception):
+    """فشل إرسال دفعة. retry: هل يُعاد إرسالها لاحقًا؛ retry_after: مهلة يطلبها الخادم."""
+
+    def __init__(self, message, retry=True, retry_after=None):
+        super().__init__(message)
+        self.retry = retry
+        self.retry_after = retry_after
+
+
+class HttpTransport:
+    """اتصال HTTP واحد يُعاد استخدامه لكل الدفعات، ويُعاد فتحه فقط بعد خطأ."""
+
+    def __init__(self, url, timeout=REQUEST_TIMEOUT):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError(f"unsupported submission URL {url!r}")
+        self._scheme = parts.scheme
+        self._host = parts.hostname
+        self._port = parts.port
+        self._path = (parts.path.rstrip('/') or '') + SUBMIT_PATH
+        self.timeout = timeout
+        self._conn = None
+        self.connections_opened = 0
+
+    def _connection(self):
+        if self._conn is None:
+            conn_class = http.client.HTTPSConnection if self._scheme == 'https' else http.client.HTTPConnection
+            self._conn = conn_class(self._host, self._port, timeout=self.timeout)
+            self.connections_opened += 1
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def send(self, body, batch_key):
+        """إرسال دفعة؛ تُرجع رد الخادم (dict) أو ترفع SubmissionError."""
+        headers = {'Content-Type': 'application/json', 'Content-Encoding': 'gzip',
+                   'Idempotency-Key': batch_key, 'Connection': 'keep-alive'}
+        try:
+            conn = self._connection()
+            conn.request('POST', self._path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            self.close()
+            raise SubmissionError(f"connection failed: {e}") from e
+        if response.getheader('Connection', '').lower() == 'close':
+            self.close()
+        if response.status == 200:
+            try:
+                return json.loads(data or b'{}')
+            except ValueError as e:
+                raise SubmissionError(f"invalid response: {e}") from e
+        retry_after = response.getheader('Retry-After')
+        try:
+            retry_after = float(retry_after) if retry_after else None
+        except ValueError:
+            retry_after = None
+        raise SubmissionError(f"HTTP {response.status}", retry=response.status in RETRY_STATUSES,
+                              retry_after=retry_after)
+
+
+class Submitter:
+    """
+    store: ProfileStore (جدول outbox، اتصال لكل خيط). url: عنوان الخادم؛ بدونه
+    تُحفظ النتائج في الطابور فقط حتى يتوفر عنوان. transport: بديل اختياري لـ HttpTransport.
+    """
+
+    def __init__(self, store, url=None, transport=None, batch_size=BATCH_SIZE, linger=LINGER,
+                 backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX, clock=time.monotonic, rng=None):
+        self.store = store
+        self.transport = transport or (HttpTransport(url) if url else None)
+        self.batch_size = batch_size
+        self.linger = linger
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self._inbox = []
+        self._cond = threading.Condition()
+        self._thread = None
+        self._closed = False
+        self._busy = False
+        self._failures = 0
+        self._retry_at = 0.0
+        self._write_failures = 0
+        self._write_retry_at = 0.0
+        self._oldest_pending_at = None
+        self._client_id = None
+        self.stats = {'submitted': 0, 'batches': 0, 'sent': 0, 'duplicates': 0,
+                      'retries': 0, 'rejected': 0, 'write_retries': 0, 'last_error': ''}
+
+    # --- خيط الواجهة ---
+
+    def submit(self, result):
+        """إضافة نتيجة (dict قابل لـ JSON) للطابور؛ لا تلمس القرص ولا الشبكة."""
+        item = dict(result)
+        item.setdefault('key', new_key())
+        with self._cond:
+            self._inbox.append(item)
+            self.stats['submitted'] += 1
+            self._cond.notify_all()
+        self._ensure_thread()
+        return item['key']
+
+    def persist(self, timeout=None):
+        """انتظار حفظ كل ما أُرسل إلى submit() في الطابور الدائم (مثلاً قبل الإيقاف المؤقت)."""
+        self._ensure_thread()
+        with self._cond:
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: not self._inbox and not self._busy, timeout)
+
+    def wake(self):
+        """محاولة فورية (مثلاً عند عودة التطبيق) دون انتظار مهلة التراجع."""
+        with self._cond:
+            self._retry_at = 0.0
+            self._write_retry_at = 0.0
+            self._cond.notify_all()
+        self._ensure_thread()
+
+    def close(self, timeout=None):
+        self.persist(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self.transport is not None:
+            self.transport.close()
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._closed = False
+            self._thread = threading.Thread(target=self._run, name='score-submitter', daemon=True)
+            self._thread.start()
+
+    # --- الخيط الخلفي ---
+
+    def _run(self):
+        pending = self.store.outbox_count()
+        if pending:
+            self._oldest_pending_at = self.clock() - self.linger
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._write_due() or self._closed or self._send_due(pending),
+                                    self._wait_timeout(pending))
+                if self._closed and not self._inbox:
+                    return
+                closing = self._closed
+                inbox, self._inbox = self._inbox, []
+                self._busy = True
+            try:
+                if inbox and self._write_inbox(inbox, closing):
+                    pending += len(inbox)
+                    if self._oldest_pending_at is None:
+                        self._oldest_pending_at = self.clock()
+                elif closing:
+                    return
+                if self._send_due(pending):
+                    pending = self._send_batch(pending)
+            except Exception as e:
+                Logger.error(f"Submission: outbox failure: {e}")
+                self._failed(str(e), None)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _write_inbox(self, inbox, closing):
+        """حفظ النتائج الجديدة في outbox؛ عند الفشل تعود إلى أول _inbox (إلا عند الإغلاق)."""
+        try:
+            self.store.outbox_add(inbox)
+        except Exception as e:
+            self.stats['last_error'] = str(e)
+            if closing:
+                Logger.error(f"Submission: could not save {len(inbox)} result(s) before closing: {e}")
+                return False
+            with self._cond:
+                self._inbox[:0] = inbox
+            self._write_failures += 1
+            self.stats['write_retries'] += 1
+            delay = backoff_delay(self._write_failures, self.backoff_base, self.backoff_max, self.rng)
+            self._write_retry_at = self.clock() + delay
+            Logger.error(f"Submission: outbox write failed: {e}; retry in {delay:.1f}s")
+            return False
+        self._write_failures = 0
+        self._write_retry_at = 0.0
+        return True
+
+    def _write_due(self):
+        return bool(self._inbox) and self.clock() >= self._write_retry_at
+
+    def _send_due(self, pending):
+        if not pending or self.transport is None or self.clock() < self._retry_at:
+            return False
+        return pending >= self.batch_size or self.clock() - self._oldest_pending_at >= self.linger
+
+    def _wait_timeout(self, pending):
+        wake_at = self._write_retry_at if self._inbox else None
+        if pending and self.transport is not None:
+            send_at = max(self._retry_at, self._oldest_pending_at + self.linger)
+            wake_at = send_at if wake_at is None else min(wake_at, send_at)
+        return None if wake_at is None else max(0.0, wake_at - self.clock())
+
+    def _send_batch(self, pending):
+        rows = self.store.outbox_batch(self.batch_size)
+        if not rows:
+            self._oldest_pending_at = None
+            return 0
+        if self._client_id is None:
+            self._client_id = self.store.install_id()
+        keys = [key for key, _ in rows]
+        items = [dict(json.loads(payload), key=key) for key, payload in rows]
+        # نفس الدفعة تُعاد بنفس المفتاح؛ الخادم يزيل التكرار أيضًا لكل نتيجة بمفتاحها
+        batch_key = uuid.uuid5(uuid.NAMESPACE_OID, ','.join(keys)).hex
+        try:
+            reply = self.transport.send(encode_batch(self._client_id, items), batch_key)
+        except SubmissionError as e:
+            if e.retry:
+                self._failed(str(e), e.retry_after)
+                return pending
+            # دفعة مرفوضة نهائيًا: إبقاؤها يوقف كل ما بعدها
+            Logger.warning(f"Submission: server rejected {len(keys)} results ({e})")
+            self.stats['rejected'] += len(keys)
+            done = keys
+        else:
+            done = keys
+            self.stats['batches'] += 1
+            self.stats['sent'] += len(reply.get('accepted', keys))
+            self.stats['duplicates'] += len(reply.get('duplicates', ()))
+            self._failures = 0
+            self._retry_at = 0.0
+        self.store.outbox_remove(done)
+        pending = self.store.outbox_count()
+        self._oldest_pending_at = self.clock() - self.linger if pending else None
+        return pending
+
+    def _failed(self, message, retry_after):
+        self._failures += 1
+        self.stats['retries'] += 1
+        self.stats['last_error'] = message
+        delay = backoff_delay(self._failures, self.backoff_base, self.backoff_max, self.rng)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        self._retry_at = self.clock() + delay
+        Logger.info(f"Submission: {message}; retry in {delay:.1f}s")
@@ -0,0 +1,9 @@
+"""
+إعداد pytest: وحدات التطبيق في جذر المستودع (بلا حزمة)، فيُضاف الجذر إلى sys.path.
+
+    python -m pytest -q
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
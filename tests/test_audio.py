@@ -0,0 +1,138 @@
+"""
+اختبارات محرك المؤثرات الصوتية (audio.py) بمزود NullLoader بلا جهاز صوت:
+سرقة الأصوات، سقف الأصوات المتزامنة، وزمن بدء التشغيل. نسخة pytest من فحوص
+tools/audio_latency.py التي لا تحتاج نافذة.
+"""
+import random
+
+import pytest
+
+from audio import EFFECTS, MAX_VOICES, SFX_POWERUP, SFX_TAP, SFX_WRONG, AudioEngine, NullLoader
+
+LATENCY_BUDGET_MS = 2.0     # نفس --budget-ms الافتراضي في tools/audio_latency.py
+
+
+class VirtualClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_engine(length=0.1, clock=None, **kwargs):
+    loader = NullLoader(length=length, require_files=False)
+    engine = AudioEngine(loader, clock=clock or VirtualClock(), **kwargs)
+    engine.preload_all()
+    return engine, loader
+
+
+def test_preload_loads_every_voice_once():
+    engine, loader = make_engine()
+    assert engine.ready
+    assert engine.stats['loaded'] == len(loader.sounds) == sum(voices for _, voices in EFFECTS.values())
+
+
+def test_trigger_before_preload_is_skipped_not_loaded():
+    loader = NullLoader(require_files=False)
+    engine = AudioEngine(loader, clock=VirtualClock())
+    assert engine.trigger(SFX_TAP, 0.0) is None
+    assert engine.stats['not_loaded'] == 1
+    assert loader.sounds == []
+
+
+def test_retrigger_within_interval_coalesces():
+    engine, _ = make_engine()
+    assert engine.trigger(SFX_TAP, 1.0) is not None
+    assert engine.trigger(SFX_TAP, 1.0 + engine.retrigger / 2) is None
+    assert engine.stats['coalesced'] == 1
+
+
+def test_busy_pool_steals_oldest_voice():
+    engine, loader = make_engine(length=1.0)
+    voices = EFFECTS[SFX_TAP][1]
+    step = engine.retrigger * 2
+    for i in range(voices + 1):
+        assert engine.trigger(SFX_TAP, i * step) is not None
+    now = voices * step
+    assert engine.stats['stolen'] == 1
+    assert engine.active_voices(now) == voices
+    tap_sounds = [s for s in loader.sounds if s.source.endswith(EFFECTS[SFX_TAP][0])]
+    # الصوت الأول (الأقدم) أُعيد من أوله، وبقية الأصوات شُغّلت مرة واحدة
+    assert sorted(s.plays for s in tap_sounds) == [1] * (voices - 1) + [2]
+
+
+def test_simultaneous_voices_capped():
+    engine, _ = make_engine(length=1.0, max_voices=3)
+    now = 0.0
+    played = 0
+    for name in (SFX_TAP, SFX_TAP, SFX_WRONG, SFX_WRONG, SFX_POWERUP):
+        if engine.trigger(name, now) is not None:
+            played += 1
+        now += engine.retrigger * 2
+    assert played == 3
+    assert engine.stats['dropped'] == 2
+    assert engine.active_voices(now) == 3
+
+
+def test_storm_never_exceeds_max_voices():
+    engine, _ = make_engine(length=0.2)
+    clock = engine.clock
+    rng = random.Random(1)
+    names = list(EFFECTS)
+    peak = 0
+    while clock.now < 10.0:
+        clock.now += rng.expovariate(200.0)
+        engine.trigger(rng.choice(names))
+        peak = max(peak, engine.active_voices())
+    assert peak <= MAX_VOICES
+    stats = engine.stats
+    assert stats['triggered'] == stats['played'] + stats['coalesced'] + stats['dropped']
+    assert stats['stolen'] > 0
+
+
+def test_trigger_latency_within_budget():
+    loader = NullLoader(length=0.05, decode_cost=0.002, play_cost=0.0002, require_files=False)
+    engine = AudioEngine(loader)
+    engine.preload_all()
+    loaded = len(loader.sounds)
+    latencies = []
+    for i in range(200):
+        elapsed = engine.trigger(list(EFFECTS)[i % len(EFFECTS)])
+        if elapsed is not None:
+            latencies.append(elapsed)
+    assert latencies
+    # فك الترميز (2ms) لا يحدث على مسار التشغيل أبدًا
+    assert len(loader.sounds) == loaded
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    assert p99 < LATENCY_BUDGET_MS
+
+
+def test_disabled_engine_plays_nothing():
+    engine, loader = make_engine()
+    engine.enabled = False
+    assert engine.trigger(SFX_TAP, 0.0) is None
+    assert all(s.plays == 0 for s in loader.sounds)
+
+
+def test_stop_all_frees_voices():
+    engine, loader = make_engine(length=1.0)
+    engine.trigger(SFX_TAP, 0.0)
+    engine.trigger(SFX_WRONG, 0.0)
+    assert engine.active_voices(0.5) == 2
+    engine.stop_all()
+    assert engine.active_voices(0.5) == 0
+    assert all(s.state == 'stop' for s in loader.sounds)
+
+
+@pytest.mark.parametrize('missing', [SFX_WRONG])
+def test_missing_file_leaves_effect_silent(tmp_path, missing):
+    for name, (filename, _voices) in EFFECTS.items():
+        if name != missing:
+            (tmp_path / filename).write_bytes(b'')
+    loader = NullLoader()
+    engine = AudioEngine(loader, sound_dir=str(tmp_path), clock=VirtualClock())
+    engine.preload_all()
+    assert engine.trigger(missing, 0.0) is None
+    assert engine.trigger(SFX_TAP, 0.0) is not None
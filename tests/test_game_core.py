@@ -0,0 +1,79 @@
+"""اختبارات قلب اللعبة (game_core.py): تغييرات النقرة الخاطئة وزمن اللعب."""
+import game_core
+from game_core import GAME_OVER, PENALTY, REACTION_TIME_WINDOW, SCORE, WRONG, GameCore
+
+MAX_WAIT = 60.0     # ثوانٍ افتراضية؛ موعد لا يحين خلالها فشلٌ لا انتظار بلا نهاية
+
+
+def kinds(deltas):
+    return [kind for kind, _ in deltas]
+
+
+def show_foe(core, now):
+    """تقديم الوقت حتى يظهر زر DON'T TAP؛ تُرجع الوقت."""
+    limit = now + MAX_WAIT
+    while not core.foe_visible:
+        assert now < limit, "DON'T TAP never appeared"
+        now += 0.05
+        core.tick(now)
+    return now
+
+
+def test_wrong_tap_with_penalty_emits_wrong():
+    core = GameCore('classic', seed=1, clock=lambda: 0.0)
+    core.start(0.0)
+    now = show_foe(core, 0.0)
+    deltas = core.wrong_tap(now)
+    assert WRONG in kinds(deltas)
+    assert PENALTY in kinds(deltas)
+    assert core.running
+
+
+def test_wrong_tap_without_foe_ignored():
+    core = GameCore('classic', seed=1, clock=lambda: 0.0)
+    core.start(0.0)
+    assert core.wrong_tap(0.01) == []
+    assert core.wrong_taps == 0
+
+
+def test_reaction_tap_in_time_scores():
+    core = GameCore('reaction', seed=1, clock=lambda: 0.0)
+    core.start(0.0)
+    deltas = core.tap(REACTION_TIME_WINDOW / 2)
+    assert SCORE in kinds(deltas)
+    assert WRONG not in kinds(deltas)
+
+
+def test_late_reaction_tap_emits_wrong():
+    core = GameCore('reaction', seed=1, clock=lambda: 0.0)
+    core.start(0.0)
+    # النقرة المتأخرة تقدّم القلب إلى وقتها، فتنفذ مهلة رد الفعل أولًا وتنهي اللعبة
+    deltas = core.tap(REACTION_TIME_WINDOW + 0.2)
+    assert kinds(deltas).count(WRONG) == 1
+    assert GAME_OVER in kinds(deltas)
+    assert core.result.duration == REACTION_TIME_WINDOW
+
+
+def test_reaction_timeout_emits_wrong():
+    core = GameCore('reaction', seed=1, clock=lambda: 0.0)
+    core.start(0.0)
+    assert WRONG not in kinds(core.tick(REACTION_TIME_WINDOW / 2))
+    deltas = core.tick(REACTION_TIME_WINDOW + 0.01)
+    assert WRONG in kinds(deltas)
+    assert GAME_OVER in kinds(deltas)
+
+
+def test_survival_score_is_play_time_without_pauses():
+    core = GameCore('survival', seed=1, clock=lambda: 0.0)
+    core.start(0.0)
+    core.pause(1.0)
+    core.resume(11.0)
+    now = 11.0
+    while core.running:
+        assert now < 11.0 + MAX_WAIT, "survival never ran out of time"
+        now += 0.1
+        core.tick(now)
+    result = core.result
+    assert result.time_left == 0
+    assert result.duration == game_core.SURVIVAL_START_TIME
+    assert result.score == result.duration == game_core.time_survived(result)
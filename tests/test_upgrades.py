@@ -0,0 +1,120 @@
+"""اختبارات محرك تأثيرات الترقيات (upgrades.py): التراكم والحدود وإلغاء التخزين."""
+import pytest
+
+from catalog import Catalog, CatalogError
+from upgrades import EFFECT_MINIMUMS, EffectsEngine, base_effects, compute_effects, item_deltas
+
+ITEMS = [
+    {'id': 'click', 'name': 'Click', 'price': 10, 'type': 'upgrade',
+     'effect': {'multiplier_increase': 0.5}, 'max_level': 5},
+    {'id': 'click_coins', 'name': 'Click + Coins', 'price': 10, 'type': 'upgrade',
+     'effect': {'multiplier_increase': 0.25, 'coin_yield': 0.1}, 'max_level': 3},
+    {'id': 'penalty', 'name': 'Penalty', 'price': 10, 'type': 'upgrade',
+     'effect': {'penalty_reduction': 0.4}, 'max_level': 10},
+    {'id': 'foes', 'name': 'Foes', 'price': 10, 'type': 'upgrade',
+     'effect': {'foe_spawn_rate': -0.5}, 'max_level': 4},
+    {'id': 'red', 'name': 'Red', 'price': 10, 'type': 'theme', 'color': [1, 0, 0, 1]},
+]
+
+
+@pytest.fixture
+def catalog():
+    return Catalog(ITEMS)
+
+
+@pytest.fixture
+def deltas(catalog):
+    return {item['id']: item_deltas(item) for item in catalog.of_type('upgrade')}
+
+
+def test_no_levels_gives_base(deltas):
+    assert compute_effects(deltas, {}, base_effects()) == base_effects()
+
+
+def test_levels_stack_linearly(deltas):
+    effects = compute_effects(deltas, {'click': 3}, base_effects())
+    assert effects.click_multiplier == pytest.approx(1.0 + 3 * 0.5)
+    assert effects._replace(click_multiplier=1.0) == base_effects()
+
+
+def test_items_on_same_field_stack(deltas):
+    effects = compute_effects(deltas, {'click': 2, 'click_coins': 2}, base_effects())
+    assert effects.click_multiplier == pytest.approx(1.0 + 2 * 0.5 + 2 * 0.25)
+    assert effects.coin_yield == pytest.approx(1.0 + 2 * 0.1)
+
+
+def test_zero_negative_and_unknown_levels_ignored(deltas):
+    effects = compute_effects(deltas, {'click': 0, 'penalty': -2, 'gone': 4}, base_effects())
+    assert effects == base_effects()
+
+
+def test_penalty_reduction_floored(deltas):
+    effects = compute_effects(deltas, {'penalty': 2}, base_effects())
+    assert effects.penalty_time == pytest.approx(1.0 - 2 * 0.4)
+    effects = compute_effects(deltas, {'penalty': 10}, base_effects())
+    assert effects.penalty_time == EFFECT_MINIMUMS['penalty_time']
+
+
+def test_spawn_rate_floored(deltas):
+    effects = compute_effects(deltas, {'foes': 4}, base_effects())
+    assert effects.foe_spawn_rate == EFFECT_MINIMUMS['foe_spawn_rate']
+
+
+def test_floor_applies_to_custom_base(deltas):
+    effects = compute_effects(deltas, {}, base_effects(penalty_time=0.0))
+    assert effects.penalty_time == EFFECT_MINIMUMS['penalty_time']
+
+
+def test_levels_capped_at_max_level(deltas):
+    max_levels = {'click': 5, 'click_coins': 3}
+    capped = compute_effects(deltas, {'click': 9, 'click_coins': 7}, base_effects(), max_levels)
+    at_max = compute_effects(deltas, {'click': 5, 'click_coins': 3}, base_effects())
+    assert capped == at_max
+
+
+def test_engine_caps_each_upgrade_at_its_max_level(catalog):
+    engine = EffectsEngine(catalog, lambda: {'click': 50, 'click_coins': 50})
+    effects = engine.current()
+    assert effects.click_multiplier == pytest.approx(1.0 + 5 * 0.5 + 3 * 0.25)
+    assert effects.coin_yield == pytest.approx(1.0 + 3 * 0.1)
+
+
+def test_unknown_effect_rejected():
+    item = dict(ITEMS[0], effect={'teleport': 1})
+    with pytest.raises(CatalogError):
+        item_deltas(item)
+
+
+def test_engine_caches_until_invalidated(catalog):
+    levels = {'click': 1}
+    calls = []
+
+    def provider():
+        calls.append(1)
+        return levels
+
+    engine = EffectsEngine(catalog, provider)
+    first = engine.current()
+    levels['click'] = 4
+    assert engine.current() is first
+    assert len(calls) == 1
+
+    engine.invalidate()
+    updated = engine.current()
+    assert len(calls) == 2
+    assert updated.click_multiplier == pytest.approx(1.0 + 4 * 0.5)
+    assert engine.current() is updated
+
+
+def test_invalidate_accepts_event_arguments(catalog):
+    levels = {}
+    engine = EffectsEngine(catalog, lambda: levels)
+    assert engine.current() == base_effects()
+    levels['penalty'] = 1
+    engine.invalidate('upgrade_levels', {'penalty': 1})   # كمستمع حدث
+    assert engine.current().penalty_time == pytest.approx(0.6)
+
+
+def test_engine_uses_custom_base(catalog):
+    engine = EffectsEngine(catalog, lambda: {'click': 1}, base=base_effects(click_multiplier=2.0))
+    assert engine.current().click_multiplier == pytest.approx(2.5)
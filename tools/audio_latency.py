@@ -0,0 +1,177 @@
+"""
+زمن استجابة المؤثرات الصوتية بلا جهاز صوت (CLICKER_AUDIO=null).
+
+يشغّل ClickerApp بنافذة خارج الشاشة ومحرك أصوات بمزود NullLoader يحاكي كلفة فك
+الترميز (--decode-ms) وبدء التشغيل (--play-ms)، ثم:
+
+1. التحميل المسبق: خطوة لكل إطار كما بعد الإقلاع؛ أطول خطوة وعدد الإطارات.
+2. اللعب: لعبة حقيقية في GameScreen (كل وضع) بنقرات عبر طابور اللمسات بمعدل
+   --rate في الثانية، فتمر الأصوات بنفس مسار العرض؛ زمن كل تشغيل من مقياس
+   audio_trigger في LatencyMonitor.
+3. العاصفة: طلبات عشوائية لكل المؤثرات بمعدل --storm-rate على ساعة افتراضية؛
+   أقصى عدد أصوات متزامنة يجب ألا يتجاوز MAX_VOICES.
+
+الخروج بالرمز 1 إن: حُمِّل أي صوت أثناء اللعب (فك ترميز على مسار النقرة)، أو تجاوز
+p99 زمن التشغيل --budget-ms، أو تجاوزت الأصوات المتزامنة الحد.
+
+    python tools/audio_latency.py
+    python tools/audio_latency.py --decode-ms 15 --play-ms 0.3 --rate 40 --out audio.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import headless  # noqa: E402
+
+os.environ.setdefault('CLICKER_AUDIO', 'null')
+headless.configure_environment()
+
+from audio import EFFECTS, MAX_VOICES, AudioEngine, NullLoader  # noqa: E402
+from instrumentation import METRIC_AUDIO, QuantileSketch  # noqa: E402
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def quantiles(sketch):
+    values = [sketch.quantile(q) for q in QUANTILES]
+    return None if values[0] is None else [round(v, 3) for v in values]
+
+
+def preload(app, engine):
+    """التحميل المسبق خطوة لكل إطار (كما يفعل ClickerApp._preload_audio)."""
+    steps = []
+    while True:
+        started = time.perf_counter()
+        more = engine.preload_step()
+        steps.append((time.perf_counter() - started) * 1000.0)
+        headless.frame()
+        if not more:
+            break
+    return {'frames': len(steps), 'max_step_ms': round(max(steps), 3),
+            'total_ms': round(sum(steps), 3), 'voices': engine.stats['loaded']}
+
+
+def play_mode(app, mode, args):
+    """لعبة واحدة بنقرات متتالية حتى نهايتها أو انتهاء --duration."""
+    from event_log import TAP
+    root = app.root
+    game = root.get_screen('game')
+    game.set_mode(mode)
+    root.current = 'game'
+    headless.frame()
+    game.start_game_on_tap(None)
+    interval = 1.0 / args.rate
+    started = time.perf_counter()
+    next_tap = started
+    count = 0
+    while game.game_running and time.perf_counter() - started < args.duration:
+        now = time.perf_counter()
+        while next_tap <= now:
+            # إصبعان متناوبان بعيدان، فلا تُعد النقرات ارتدادًا
+            game.touches.push(next_tap, TAP, 0.3 + 0.4 * (count % 2), 0.4)
+            next_tap += interval
+            count += 1
+        headless.frame()
+    if game.game_running:
+        game.render(game.core.end())
+    headless.frame()
+    root.current = 'menu'
+    headless.frame()
+    return count
+
+
+def storm(engine, rate, seconds, seed):
+    """طلبات عشوائية على ساعة افتراضية؛ تُرجع أقصى عدد أصوات متزامنة."""
+    rng = random.Random(seed)
+    names = list(EFFECTS)
+    clock = engine.clock
+    now = 0.0
+    engine.clock = lambda: now
+    peak = 0
+    try:
+        while now < seconds:
+            now += rng.expovariate(rate)
+            engine.trigger(rng.choice(names), now)
+            peak = max(peak, engine.active_voices(now))
+    finally:
+        engine.clock = clock
+    return peak
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', default='classic,survival,reaction')
+    parser.add_argument('--rate', type=float, default=30.0, help='taps per second during play')
+    parser.add_argument('--duration', type=float, default=4.0, help='seconds per mode (stops early on game over)')
+    parser.add_argument('--decode-ms', type=float, default=10.0, help='simulated decode cost per voice')
+    parser.add_argument('--play-ms', type=float, default=0.2, help='simulated cost of starting playback')
+    parser.add_argument('--budget-ms', type=float, default=2.0, help='p99 trigger-to-play limit')
+    parser.add_argument('--storm-rate', type=float, default=200.0, help='random triggers per second in the storm')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--out', help='write the JSON report to this path')
+    args = parser.parse_args(argv)
+
+    _main, app, _ = headless.boot_app()
+    loader = NullLoader(decode_cost=args.decode_ms / 1000.0, play_cost=args.play_ms / 1000.0)
+    engine = app.audio = AudioEngine(loader)
+    report = {'decode_ms': args.decode_ms, 'play_ms': args.play_ms, 'max_voices': MAX_VOICES}
+    failures = []
+    try:
+        report['preload'] = preload(app, engine)
+        loaded = len(loader.sounds)
+
+        report['modes'] = {}
+        for mode in args.modes.split(','):
+            before = dict(engine.stats)
+            taps = play_mode(app, mode, args)
+            stats = {key: engine.stats[key] - before[key] for key in ('triggered', 'played', 'coalesced',
+                                                                    'stolen', 'dropped', 'not_loaded')}
+            report['modes'][mode] = dict(stats, taps=taps,
+                                         latency_ms=quantiles(app.latency.sketch(METRIC_AUDIO, mode)))
+        if len(loader.sounds) != loaded:
+            failures.append(f"{len(loader.sounds) - loaded} sound(s) decoded during play")
+
+        overall = QuantileSketch()
+        for mode in report['modes']:
+            overall.merge(app.latency.sketch(METRIC_AUDIO, mode))
+        report['latency_ms'] = quantiles(overall)
+        if report['latency_ms'] and report['latency_ms'][-1] > args.budget_ms:
+            failures.append(f"p99 {report['latency_ms'][-1]} ms above {args.budget_ms} ms")
+
+        before = dict(engine.stats)
+        peak = storm(engine, args.storm_rate, 10.0, args.seed)
+        report['storm'] = {key: engine.stats[key] - before[key]
+                           for key in ('triggered', 'played', 'coalesced', 'stolen', 'dropped')}
+        report['storm']['peak_voices'] = peak
+        if peak > MAX_VOICES:
+            failures.append(f"{peak} simultaneous voices above {MAX_VOICES}")
+    finally:
+        headless.shutdown(app)
+
+    # Kivy يحوّل sys.stderr إلى سجله، فالتقرير يُطبع على الأصلي
+    out = sys.__stderr__
+    pre = report['preload']
+    print(f"preload   {pre['voices']} voices in {pre['frames']} frames, {pre['total_ms']} ms "
+          f"(longest step {pre['max_step_ms']} ms)", file=out)
+    for mode, stats in report['modes'].items():
+        print(f"{mode:9} taps {stats['taps']:4}  sounds {stats['played']}/{stats['triggered']} "
+              f"(coalesced {stats['coalesced']}, stolen {stats['stolen']}, dropped {stats['dropped']}, "
+              f"not loaded {stats['not_loaded']})  p50/p90/p99 {stats['latency_ms']} ms", file=out)
+    s = report['storm']
+    print(f"storm     {s['triggered']} triggers: played {s['played']}, coalesced {s['coalesced']}, "
+          f"stolen {s['stolen']}, dropped {s['dropped']}, peak voices {s['peak_voices']}/{MAX_VOICES}", file=out)
+    print(f"trigger-to-play p50/p90/p99 {report['latency_ms']} ms", file=out)
+    report['failures'] = failures
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+    print("OK" if not failures else "FAIL: " + "; ".join(failures), file=out)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
@@ -0,0 +1,464 @@
+"""
+قياسات أداء المسارات الساخنة (Microbenchmarks) بلا نافذة حقيقية.
+
+المسارات المقاسة:
+- tap.*: كلفة النقرة الواحدة في GameScreen (دفعها إلى طابور اللمسات ثم process_input).
+- hud.*: تحديث نص عداد الوقت حتى جاهزيته للرسم: Label عادي (رسم النسيج بالخط)
+  مقابل GlyphLabel (رؤوس من أطلس الحروف).
+- persistence.*: لقطة الحفظ على خيط الواجهة، الكتابة إلى SQLite، تحميل ملف لاعب
+  كبير، وتحميل ملفات JSON القديمة (load_data).
+- screen.*: MenuScreen.on_enter و ShopScreen.on_enter مع كتالوج كبير.
+- game.*: end_game -> process_stats_and_achievements.
+- achievements.*: كلفة حدث واحد مع كتالوج إنجازات صغير وكبير (يجب أن تتساويا).
+- leaderboard.*: إدراج نتيجة في لوحة ممتلئة (داخلة وأخرى مرفوضة) بحجمين مختلفين.
+
+لكل قياس: ops/s و p50/p99 (ميكروثانية) والتخصيصات لكل عملية (ذروة البايتات عبر
+tracemalloc وصافي الكتل المخصصة). كل مجموعة تُقاس --repeat مرات ويُحفظ وسيط كل
+قيمة. النتائج تُكتب JSON، ووضع المقارنة يفشل (رمز خروج 1) عند تراجع p50 يتجاوز
+الهامش النسبي --tolerance والحد المطلق --floor-us معًا (فروق الميكروثانيات القليلة
+ضجيج توقيت لا تراجع). p99 يُعرض ويُعلَّم فقط: ذيل مسارات القرص يتضاعف بين تشغيلين
+متطابقين، فلا يُفشل المقارنة إلا مع --gate-p99. مقارنة تشغيل بنفسه تنجح.
+
+    python tools/bench.py --out bench.json
+    python tools/bench.py --compare bench.json --tolerance 0.25
+"""
+import argparse
+import json
+import itertools
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import headless  # noqa: E402
+
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_FLOOR_US = 20.0    # فرق p50/p99 أصغر من هذا لا يُعد تراجعًا مهما كانت نسبته
+DEFAULT_REPEAT = 3
+ALLOC_SAMPLE = 200
+
+
+class VirtualClock:
+    """ساعة يدوية لقلب اللعبة حتى لا تنتهي اللعبة بالوقت الحقيقي أثناء القياس."""
+
+    def __init__(self, step):
+        self.now = 0.0
+        self.step = step
+
+    def __call__(self):
+        return self.now
+
+    def advance(self):
+        self.now += self.step
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(op, ops, warmup=50, before=None, alloc_sample=ALLOC_SAMPLE):
+    """
+    تشغيل op عدد ops من المرات وقياس كل عملية على حدة.
+    before (اختياري) يُستدعى قبل كل عملية خارج التوقيت (تهيئة أو تقديم إطار).
+    """
+    for _ in range(warmup):
+        if before:
+            before()
+        op()
+
+    samples = []
+    perf_counter_ns = time.perf_counter_ns
+    for _ in range(ops):
+        if before:
+            before()
+        start = perf_counter_ns()
+        op()
+        samples.append(perf_counter_ns() - start)
+    samples.sort()
+    total_s = sum(samples) / 1e9
+
+    # مرور منفصل للتخصيصات (tracemalloc يبطئ التنفيذ فلا يُخلط مع التوقيت)
+    peaks = []
+    blocks = 0
+    sample = min(ops, alloc_sample)
+    tracemalloc.start()
+    try:
+        for _ in range(sample):
+            if before:
+                before()
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            blocks_before = sys.getallocatedblocks()
+            op()
+            blocks += sys.getallocatedblocks() - blocks_before
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+    peaks.sort()
+
+    return {
+        'ops': ops,
+        'ops_per_sec': round(ops / total_s, 1) if total_s else 0.0,
+        'mean_us': round(total_s * 1e6 / ops, 2),
+        'p50_us': round(_percentile(samples, 0.50) / 1e3, 2),
+        'p99_us': round(_percentile(samples, 0.99) / 1e3, 2),
+        'alloc_peak_bytes': _percentile(peaks, 0.50),
+        'alloc_blocks': round(blocks / sample, 2) if sample else 0.0,
+    }
+
+
+# --- بيانات اختبار كبيرة ---
+
+def large_profile_sections(items=500):
+    from models import DailyStreak
+    return {
+        'coins': 123456,
+        'daily': DailyStreak(5, '2024-01-01').compact(),
+        'upgrades': {f'up_bench_{i}': i % 5 + 1 for i in range(items)},
+        'themes': [f'bg_bench_{i}' for i in range(items)],
+        'achievements': [f'ach_bench_{i}' for i in range(items)],
+    }
+
+
+def sample_session(mode='classic', score=42):
+    from models import Session
+    return Session(mode, score, 60, 2, 0.0, 21, '2024-01-01T00:00:00')
+
+
+def large_catalog(main, themes=100, upgrades=50):
+    from catalog import Catalog
+    items = [dict(item) for item in main.CATALOG.items]
+    for item in items:
+        if 'effect' in item:
+            item['effect'] = dict(item['effect'])
+    items += [{'id': f'bg_bench_{i}', 'name': f'Bench Theme {i}', 'price': 10 + i, 'type': 'theme',
+               'color': [i % 10 / 10, 0.2, 0.3, 1]} for i in range(themes)]
+    items += [{'id': f'up_bench_{i}', 'name': f'Bench Upgrade {i}', 'price': 100 + i, 'type': 'upgrade',
+               'effect': {'multiplier_increase': 0.01}, 'max_level': 5} for i in range(upgrades)]
+    return Catalog(items)
+
+
+# --- القياسات ---
+
+def bench_taps(main, app, ops):
+    from event_log import TAP
+    from game_core import GameCore
+    results = {}
+    game = app.root.get_screen('game')
+
+    def tap():
+        # إصبعان متناوبان (40 نقرة/ث): كل موضع يتكرر بعد مهلة إزالة الارتداد
+        now = state['clock'].now
+        game.touches.push(now, TAP, 0.3 + 0.4 * (state['count'] % 2), 0.4)
+        game.process_input(now)
+
+    for mode, step in (('classic', 0.025), ('reaction', 0.15)):
+        game.set_mode(mode)
+        state = {'clock': None, 'count': 0}
+
+        def before():
+            # لعبة جديدة (بساعة افتراضية) عند انتهاء السابقة، وإطار كل 20 نقرة
+            # (~20 نقرة/ث عند 60 إطارًا في الثانية)
+            if not game.game_running:
+                app.root.current = 'game'
+                headless.pump()
+                game.start_game_on_tap(None)
+                state['clock'] = VirtualClock(step)
+                game.core = GameCore(game.game_mode, effects=game.effects, clock=state['clock'])
+                game.render(game.core.start())
+            state['count'] += 1
+            if state['count'] % 20 == 0:
+                headless.pump()
+            state['clock'].advance()
+
+        results[f'tap.{mode}'] = measure(tap, ops, before=before)
+        if game.game_running:
+            game.render(game.core.end())
+        headless.pump()
+    app.root.current = 'menu'
+    return results
+
+
+def bench_hud(main, ops):
+    from kivy.uix.label import Label
+    results = {}
+    # نص جديد في كل عملية، كما يتغير عداد الوقت في كل إطار
+    times = itertools.cycle([f"{t / 10:.1f}s" for t in range(300, 0, -1)])
+    label = Label(text="Time: 30.0s", font_size='26sp', bold=True)
+
+    def label_update():
+        label.text = f"Time: {next(times)}"
+        label.texture_update()
+
+    glyphs = main.GlyphLabel(prefix="Time: ", text="30.0s", font_size='26sp', bold=True)
+    glyphs.refresh()
+
+    def glyph_update():
+        glyphs.text = next(times)
+        glyphs.refresh()
+
+    results['hud.label'] = measure(label_update, ops)
+    results['hud.glyph'] = measure(glyph_update, ops)
+    return results
+
+
+def large_achievement_rules(rules=1000):
+    """قواعد كثيرة على أحداث ووضع غير المقاسة، وقاعدة تقدم واحدة على كل حدث مقاس."""
+    from achievements import rules_from_list
+    items = [{'id': f'ach_bench_{i}', 'name': f'Bench {i}', 'on': ('game_end', 'streak')[i % 2],
+              'when': {'mode': ['==', 'survival']} if i % 2 == 0 else {},
+              'progress': {'field': 'streak_day' if i % 2 else 'clicks', 'target': 10 ** 9}}
+             for i in range(rules)]
+    items += [{'id': 'ach_bench_taps', 'name': 'Taps', 'on': 'tap', 'progress': {'accumulate': True, 'target': 10 ** 9}},
+              {'id': 'ach_bench_score', 'name': 'Score', 'on': 'game_end', 'when': {'mode': ['==', 'classic']},
+               'progress': {'field': 'clicks', 'target': 10 ** 9}}]
+    return rules_from_list(items)
+
+
+def bench_achievements(ops):
+    from achievements import AchievementEngine, EVENT_GAME_END, EVENT_TAP
+    results = {}
+    for size in (10, 1000):
+        engine = AchievementEngine(large_achievement_rules(size))
+        results[f'achievements.tap_{size}'] = measure(
+            lambda: engine.dispatch(EVENT_TAP, 'classic', clicks=10), ops)
+        results[f'achievements.game_end_{size}'] = measure(
+            lambda: engine.dispatch(EVENT_GAME_END, 'classic', clicks=42, penalties=0, total_games=5), ops)
+    return results
+
+
+def bench_leaderboard(ops):
+    from itertools import count
+    from leaderboard import Entry, Leaderboard
+    results = {}
+    for size in (50, 1000):
+        board = Leaderboard(size, [Entry(float(i), i, '2026-01-01T00:00:00', 0.0) for i in range(size)])
+        seqs = count(size)
+
+        def insert_best():
+            # كل نتيجة أعلى من سابقتها فتدخل دائمًا (أسوأ حالة: إزاحة الجذر + حساب الترتيب)
+            seq = next(seqs)
+            board.insert(Entry(float(seq), seq, '', 0.0))
+
+        results[f'leaderboard.insert_{size}'] = measure(insert_best, ops)
+        results[f'leaderboard.reject_{size}'] = measure(lambda: board.insert(Entry(-1.0, next(seqs), '', 0.0)), ops)
+    return results
+
+
+def bench_persistence(main, ops):
+    from persistence import PersistenceWriter, load_data
+    from profile_repository import ProfileRepository
+    from profile_store import ProfileStore
+
+    results = {}
+    work = tempfile.mkdtemp(prefix='bench_persist_')
+    sections = large_profile_sections()
+
+    # لقطة الأقسام المتسخة على خيط الواجهة (ما كان save_data يفعله في كل نقرة)
+    writer = PersistenceWriter(lambda sections, records: None)
+
+    def snapshot():
+        for name, data in sections.items():
+            writer.mark_dirty(name, data)
+        writer.flush()
+    results['persistence.flush_snapshot'] = measure(snapshot, ops)
+    writer.close(timeout=2.0)
+
+    store = ProfileStore(os.path.join(work, 'save.db'))
+    session = sample_session()
+    results['persistence.save'] = measure(lambda: store.save(sections, [session]), max(ops // 10, 50), warmup=5)
+
+    big = ProfileStore(os.path.join(work, 'load.db'))
+    big.save(sections, [sample_session(mode, i) for i in range(5000) for mode in ('classic', 'survival', 'reaction', 'accuracy')])
+    null_writer = PersistenceWriter(lambda sections, records: None)
+    results['persistence.load_profile'] = measure(
+        lambda: ProfileRepository(big, null_writer).load(), max(ops // 10, 50), warmup=5)
+
+    legacy = os.path.join(work, 'currency.json')
+    with open(legacy, 'w') as f:
+        json.dump({'coins': 123456, 'upgrades': sections['upgrades'], 'unlocked_themes': sections['themes'],
+                   'daily_reward': sections['daily']}, f)
+    results['persistence.load_data'] = measure(lambda: load_data(legacy, {}), ops)
+
+    store.close()
+    big.close()
+    null_writer.close(timeout=2.0)
+    return results
+
+
+def bench_screens(main, app, ops):
+    results = {}
+    root = app.root
+
+    root.current = 'menu'
+    headless.pump()
+    menu = root.get_screen('menu')
+    results['screen.menu_enter'] = measure(menu.on_enter, ops)
+
+    original_catalog = main.CATALOG
+    main.CATALOG = large_catalog(main)
+    try:
+        root.current = 'shop'
+        headless.pump()
+        shop = root.get_screen('shop')
+        results['screen.shop_enter'] = measure(shop.on_enter, max(ops // 200, 5), warmup=1, alloc_sample=2)
+        # تفعيل ثيم مفتوح يحدّث صفين فقط من القائمة
+        profile = app.profile
+        for theme_id in ('bg_bench_0', 'bg_bench_1'):
+            if not profile.is_theme_unlocked(theme_id):
+                profile.unlock_theme(theme_id)
+        previous_theme = app.current_theme
+        themes = itertools.cycle(('bg_bench_0', 'bg_bench_1'))
+        results['screen.shop_equip'] = measure(
+            lambda: shop.purchase_or_activate(next(themes), 0, 'theme'), max(ops // 10, 20))
+        shop.select_theme(previous_theme)
+    finally:
+        main.CATALOG = original_catalog
+        root.current = 'menu'
+        headless.pump()
+    return results
+
+
+def bench_end_game(main, app, ops):
+    from game_core import GameResult
+    results = {}
+    root = app.root
+    game = root.get_screen('game')
+    game.set_mode('classic')
+    result = GameResult(mode='classic', score=42.0, clicks=42.0, taps=42, wrong_taps=1, penalties=1,
+                        time_left=0, coins_gained=21, seed=0, duration=10.0)
+
+    results['game.process_stats'] = measure(lambda: game.process_stats_and_achievements(result), ops)
+
+    def before():
+        if root.current != 'game':
+            root.current = 'game'
+
+    results['game.end_game'] = measure(lambda: game.end_game(result), max(ops // 5, 50), warmup=5, before=before)
+    app.flush_persistence(wait=True)
+    root.current = 'menu'
+    headless.pump()
+    return results
+
+
+def median_stats(runs):
+    """وسيط كل قيمة عبر تكرارات قياس واحد."""
+    return {key: round(statistics.median(stats[key] for stats in runs), 2) for key in runs[0]}
+
+
+def run(ops, repeat=DEFAULT_REPEAT):
+    main, app, _ = headless.boot_app()
+    headless.pump(2)
+    try:
+        results = {}
+        for group in (lambda: bench_taps(main, app, ops),
+                      lambda: bench_hud(main, ops),
+                      lambda: bench_persistence(main, ops),
+                      lambda: bench_screens(main, app, ops),
+                      lambda: bench_end_game(main, app, ops),
+                      lambda: bench_achievements(ops),
+                      lambda: bench_leaderboard(ops)):
+            runs = {}
+            for _ in range(repeat):
+                for name, stats in group().items():
+                    runs.setdefault(name, []).append(stats)
+            for name, stats_runs in runs.items():
+                stats = median_stats(stats_runs)
+                # Kivy يحوّل sys.stderr إلى سجله، فالتقدم يُطبع على الأصلي
+                print(f"{name:32} {stats['ops_per_sec']:>12} ops/s  p99 {stats['p99_us']} us", file=sys.__stderr__)
+                results[name] = stats
+    finally:
+        headless.shutdown(app)
+
+    import kivy
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'kivy': kivy.__version__,
+            'gl_backend': os.environ.get('KIVY_GL_BACKEND'),
+            'ops': ops,
+            'repeat': repeat,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def regressed(current, base, tolerance, floor_us):
+    """تراجع = زيادة تتجاوز الهامش النسبي والحد المطلق (ميكروثانية) معًا."""
+    return current - base > max(base * tolerance, floor_us)
+
+
+def compare(current, baseline, tolerance, floor_us=DEFAULT_FLOOR_US, gate_p99=False):
+    """
+    مقارنة p50 و p99 مع خط الأساس؛ تُرجع قائمة التراجعات (p50 فقط ما لم يُطلب gate_p99).
+    (ops/s مشتق من المتوسط وحساس للضجيج، فيُعرض فقط ولا يُفشل المقارنة.)
+    """
+    regressions = []
+    base_results = baseline.get('results', {})
+    print(f"{'benchmark':32} {'ops/s':>12} {'p50 us':>12} {'base':>12} {'p99 us':>12} {'base':>12}")
+    for name, cur in sorted(current['results'].items()):
+        base = base_results.get(name)
+        if base is None:
+            print(f"{name:32} {cur['ops_per_sec']:>12} {cur['p50_us']:>12} {'(new)':>12} {cur['p99_us']:>12}")
+            continue
+        flags = []
+        if regressed(cur['p50_us'], base['p50_us'], tolerance, floor_us):
+            flags.append('p50')
+        tail = regressed(cur['p99_us'], base['p99_us'], tolerance, floor_us)
+        if tail and gate_p99:
+            flags.append('p99')
+        mark = f"  REGRESSION ({', '.join(flags)})" if flags else ('  (p99 slower)' if tail else '')
+        print(f"{name:32} {cur['ops_per_sec']:>12} {cur['p50_us']:>12} {base['p50_us']:>12} "
+              f"{cur['p99_us']:>12} {base['p99_us']:>12}{mark}")
+        if flags:
+            regressions.append((name, flags))
+    for name in sorted(set(base_results) - set(current['results'])):
+        print(f"{name:32} missing from current run")
+        regressions.append((name, ['missing']))
+    return regressions
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ops', type=int, default=2000, help='operations per benchmark (default 2000)')
+    parser.add_argument('--out', help='write results JSON to this path')
+    parser.add_argument('--compare', metavar='BASELINE', help='compare against a saved results JSON')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed relative slowdown before failing (default 0.25)')
+    parser.add_argument('--floor-us', type=float, default=DEFAULT_FLOOR_US,
+                        help='ignore p50/p99 slowdowns smaller than this many microseconds (default 20)')
+    parser.add_argument('--gate-p99', action='store_true',
+                        help='fail on p99 slowdowns too (noisy on shared machines)')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help='runs per benchmark; the median of each value is kept (default 3)')
+    args = parser.parse_args(argv)
+
+    current = run(args.ops, max(1, args.repeat))
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(current, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.tolerance, args.floor_us, args.gate_p99)
+        if regressions:
+            print(f"\nFAIL: {len(regressions)} benchmark(s) regressed beyond {args.tolerance:.0%}", file=sys.__stderr__)
+            return 1
+        print("\nOK: no regressions")
+    elif not args.out:
+        json.dump(current, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
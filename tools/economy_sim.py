@@ -0,0 +1,383 @@
+"""
+محاكي الاقتصاد (Economy Simulator) لموازنة العملات والأسعار ومكافآت الأيام المتتالية.
+
+أداة تطوير فقط (لا تُضمَّن في APK)، تتطلب NumPy. كل لاعب صف في مصفوفات NumPy
+وكل يوم خطوة واحدة على كل اللاعبين معًا، دون حلقة على اللاعبين أو الألعاب:
+
+- سمات ثابتة لكل لاعب: ألعاب في اليوم، سرعة النقر، النقرات الخاطئة في الثانية،
+  مهارة رد الفعل، زمن التعب في survival، احتمال فتح التطبيق كل يوم، الانقطاع.
+- كل يوم: من يبقى ومن يفتح التطبيق، ثم مكافأة الأيام المتتالية بنفس قاعدة
+  DailyRewardsScreen (اليوم التالي لآخر جمع يزيد السلسلة حتى 7، وإلا تعود 1،
+  واليوم السابع يفتح bg_premium).
+- عدد الألعاب لكل وضع Poisson، والنقرات في اللعبة Poisson بمعدل اللاعب × مدة
+  اللعبة المتوقعة بتأثيرات ترقياته (الوقت الإضافي، العقوبة، +TIME)؛ رد الفعل:
+  النجاحات قبل أول خطأ (هندسي). عملات اليوم إذن مجموع Poisson مركّب، يُسحب
+  بتقريب طبيعي من متوسطه وتباينه (سحب واحد لكل لاعب نشط)، واللحظتان لا تُعادان
+  إلا لمن اشترى ذلك اليوم.
+- العملات كما في GameCore._finish: clicks × COINS_PER_CLICK × click_multiplier ×
+  coin_yield، مع أن clicks في classic و survival تشمل المضاعف أصلًا. int() لكل
+  لعبة يُقرَّب بطرح نصف عملة لكل لعبة.
+- الشراء بعد كل يوم لعب: أرخص عنصر متاح أولًا (أو الترقيات أولًا)، بسعر
+  price × (level + 1) كما في ShopScreen، حتى لا يكفي الرصيد. يوم الوصول لكل
+  مستوى من كل عنصر يُسجَّل.
+
+الناتج لكل إعداد: توزيع أيام الوصول لكل عنصر ومستوى (p10/p50/p90 على كل
+اللاعبين، ومن لم يصل حتى آخر يوم يُحسب "لم يصل")، ودخل اليوم، وانتشار السلسلة.
+--grid يجرّب كل تركيبات القيم (حاصل ضرب ديكارتي) ويطبع جدولًا واحدًا.
+
+    python tools/economy_sim.py --players 1000000 --days 60
+    python tools/economy_sim.py --players 200000 --grid price_scale=0.5,1,2 --grid coins_per_click=0.25,0.5
+    python tools/economy_sim.py --grid streak_scale=0.5,1,1.5 --out economy.json
+"""
+import argparse
+import ast
+import itertools
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+import game_core  # noqa: E402
+from catalog import load_catalog  # noqa: E402
+from upgrades import BASE_EFFECTS, EFFECT_MINIMUMS, Effects, item_deltas  # noqa: E402
+
+CATALOG_FILE = os.path.join(REPO_ROOT, 'data', 'shop_catalog.json')
+MAIN_FILE = os.path.join(REPO_ROOT, 'main.py')
+OWNED_THEME = 'default'
+STREAK_THEME = 'bg_premium'     # يُفتح في اليوم السابع فقط، لا يُشترى
+MODES = ('classic', 'survival', 'reaction', 'accuracy')
+MAX_BUYS_PER_DAY = 16
+POLICIES = ('cheapest', 'upgrades_first')
+
+
+def main_constant(name, path=MAIN_FILE):
+    """قيمة ثابت حرفي من main.py دون استيراده (main.py يستورد Kivy)."""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), path)
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, 'id', None) == name for t in node.targets):
+            return ast.literal_eval(node.value)
+    raise KeyError(f"{name} not found in {path}")
+
+
+# معاملات النموذج: أولها أرقام اللعبة، وبقيتها سمات السكان (الوسيط وانتشار lognormal)
+Params = namedtuple('Params', (
+    'coins_per_click', 'price_scale', 'streak_scale', 'streak_rewards',
+    'games_per_day', 'games_sigma', 'mode_shares',
+    'tap_rate', 'tap_sigma', 'wrong_rate', 'reaction_skill', 'survival_fatigue',
+    'powerup_catch', 'day_active', 'daily_churn', 'policy',
+))
+
+DEFAULT_PARAMS = Params(
+    coins_per_click=game_core.COINS_PER_CLICK,
+    price_scale=1.0,
+    streak_scale=1.0,
+    streak_rewards=None,            # None: DAILY_STREAK_REWARDS من main.py
+    games_per_day=6.0,
+    games_sigma=0.8,
+    mode_shares=(0.45, 0.25, 0.2, 0.1),
+    tap_rate=6.0,                   # نقرات في الثانية
+    tap_sigma=0.25,
+    wrong_rate=0.05,                # نقرات DON'T TAP في الثانية
+    reaction_skill=0.85,            # متوسط احتمال إصابة اللون في وقته
+    survival_fatigue=20.0,          # ثوانٍ قبل أن يتوقف اللاعب في survival
+    powerup_catch=0.7,
+    day_active=0.6,                 # متوسط احتمال فتح التطبيق في يوم ما
+    daily_churn=0.02,
+    policy='cheapest',
+)
+
+
+class Shop:
+    """عناصر المتجر القابلة للشراء كمصفوفات: السعر الأساسي وأقصى مستوى وأعمدة كل مستوى."""
+
+    def __init__(self, catalog, price_scale=1.0):
+        items = [item for item in catalog
+                 if item['id'] not in (OWNED_THEME, STREAK_THEME) and item['price'] > 0]
+        self.ids = [item['id'] for item in items]
+        self.is_upgrade = np.array([item['type'] == 'upgrade' for item in items])
+        self.price = np.array([item['price'] for item in items], dtype=np.float64) * price_scale
+        self.max_level = np.array([item.get('max_level', 1) for item in items], dtype=np.int16)
+        # أعمدة مصفوفة أيام الوصول: عمود لكل (عنصر، مستوى)
+        self.offsets = np.concatenate(([0], np.cumsum(self.max_level)[:-1])).astype(np.int64)
+        self.levels = [(item_id, level) for item_id, top in zip(self.ids, self.max_level)
+                       for level in range(1, top + 1)]
+        # زيادة كل حقل تأثير لكل مستوى من كل عنصر (صفر للثيمات)
+        self.deltas = np.zeros((len(items), len(Effects._fields)))
+        for k, item in enumerate(items):
+            if item['type'] == 'upgrade':
+                for index, delta in item_deltas(item):
+                    self.deltas[k, index] = delta
+
+    def __len__(self):
+        return len(self.ids)
+
+    def next_purchase(self, levels, policy):
+        """(العنصر التالي، سعره) لكل صف من المستويات المملوكة؛ السعر inf إن اكتمل كل شيء."""
+        price = self.price * (levels + 1)
+        price[levels >= self.max_level] = np.inf
+        order = price + np.where(self.is_upgrade, 0.0, 1e12) if policy == 'upgrades_first' else price
+        choice = np.argmin(order, axis=1)
+        return choice, price[np.arange(len(levels)), choice]
+
+    def next_cost(self, levels, policy):
+        return self.next_purchase(levels, policy)[1]
+
+    def effects(self, owned):
+        """متجهات التأثيرات لصفوف owned (لاعب × الحقول) كما في compute_effects."""
+        values = np.asarray(tuple(BASE_EFFECTS.values())) + owned @ self.deltas
+        for field, minimum in EFFECT_MINIMUMS.items():
+            index = Effects._fields.index(field)
+            np.maximum(values[:, index], minimum, out=values[:, index])
+        return values.astype(np.float32)
+
+
+FX = {field: i for i, field in enumerate(Effects._fields)}
+
+
+def lognormal(rng, median, sigma, n):
+    return (median * np.exp(sigma * rng.standard_normal(n))).astype(np.float32)
+
+
+def beta_mean(rng, mean, n, concentration=8.0):
+    return rng.beta(mean * concentration, (1 - mean) * concentration, n).astype(np.float32)
+
+
+def expected_durations(fx, tap_rate, wrong_rate, fatigue, catch):
+    """مدة لعبة classic و survival المتوقعة (ثوانٍ) لكل لاعب بتأثيرات ترقياته (fx: لاعب × الحقول)."""
+    penalty = fx[:, FX['penalty_time']] * wrong_rate          # ثوانٍ تُخصم في كل ثانية لعب
+    # +TIME يظهر أول مرة بعد U(8, 15) / powerup_spawn_rate ثانية ويضيف POWERUP_TIME_BONUS
+    spawn = fx[:, FX['powerup_spawn_rate']]
+    base = game_core.TIME_LIMIT + fx[:, FX['bonus_time']]
+    caught = np.clip((base - 11.5 / spawn) / (7.0 / spawn) + 0.5, 0, 1) * catch
+    classic = (base + game_core.POWERUP_TIME_BONUS * caught) / (1 + penalty)
+    # survival: الوقت يتناقص ثانية ويزيد SURVIVAL_TIME_BONUS لكل نقرة؛ إن زاد فالتعب ينهيها
+    drain = 1 + penalty - game_core.SURVIVAL_TIME_BONUS * tap_rate
+    start = game_core.SURVIVAL_START_TIME + fx[:, FX['bonus_time']]
+    survival = np.where(drain > 0, start / np.maximum(drain, 1e-6), fatigue)
+    return classic, np.minimum(survival, fatigue)
+
+
+class Population:
+    """سمات اللاعبين الثابتة، ولحظتا دخل اليوم (المتوسط والتباين) لكل لاعب بتأثيراته."""
+
+    def __init__(self, rng, params, n):
+        self.params = params
+        self.games = lognormal(rng, params.games_per_day, params.games_sigma, n)
+        shares = np.asarray(params.mode_shares, dtype=np.float64)
+        self.shares = dict(zip(MODES, shares / shares.sum()))
+        self.tap_rate = lognormal(rng, params.tap_rate, params.tap_sigma, n)
+        self.wrong_rate = lognormal(rng, params.wrong_rate, 0.5, n)
+        self.skill = np.clip(beta_mean(rng, params.reaction_skill, n, 20.0), 0.01, 0.99)
+        self.fatigue = lognormal(rng, params.survival_fatigue, 0.5, n)
+        self.catch = beta_mean(rng, params.powerup_catch, n)
+        self.active_p = beta_mean(rng, params.day_active, n, 4.0)
+        self.mean = np.zeros(n, dtype=np.float32)
+        self.std = np.zeros(n, dtype=np.float32)
+
+    def update_income(self, rows, fx):
+        """
+        عدد ألعاب كل وضع في اليوم Poisson(games × حصة الوضع)، فعملات اليوم مجموع
+        Poisson مركّب: المتوسط λ·E[X] والتباين λ·E[X²] لعملات اللعبة الواحدة X.
+        """
+        p, s = self.params, self.shares
+        lam = self.games[rows]
+        multiplier = fx[:, FX['click_multiplier']]
+        per_click = p.coins_per_click * multiplier * fx[:, FX['coin_yield']]
+        rate = self.tap_rate[rows]
+        classic, survival = expected_durations(fx, rate, self.wrong_rate[rows], self.fatigue[rows], self.catch[rows])
+        mean, second = 0.0, 0.0
+        # classic و survival: نقرات Poisson(معدل × مدة)، والنقرة clicks = المضاعف
+        timed_coin = per_click * multiplier
+        for share, length in ((s['classic'], classic), (s['survival'], survival)):
+            taps = rate * length
+            mean = mean + share * timed_coin * taps
+            second = second + share * timed_coin ** 2 * (taps + taps ** 2)
+        # reaction: النجاحات قبل أول خطأ (هندسي)، والنجاح نقرة واحدة بلا مضاعف
+        hit = self.skill[rows]
+        mean = mean + s['reaction'] * per_click * hit / (1 - hit)
+        second = second + s['reaction'] * per_click ** 2 * hit * (1 + hit) / (1 - hit) ** 2
+        # int() لكل لعبة تُسقط نصف عملة في المتوسط
+        mean = mean - 0.5 * (s['classic'] + s['survival'] + s['reaction'])
+        self.mean[rows] = lam * mean
+        self.std[rows] = np.sqrt(lam * second)
+
+    def earnings(self, rng, rows):
+        """عملات يوم لعب: تقريب طبيعي للمجموع المركب (سحب واحد لكل لاعب)."""
+        z = rng.standard_normal(rows.size, dtype=np.float32)
+        return np.maximum(0.0, self.mean[rows] + self.std[rows] * z)
+
+
+def simulate(params=DEFAULT_PARAMS, players=100_000, days=60, seed=0, catalog=None):
+    """
+    محاكاة players لاعب لمدة days يومًا. تُرجع dict: unlock_day (N × أعمدة المستويات،
+    0 = لم يصل)، shop، ومقاييس مجمّعة.
+    """
+    rng = np.random.default_rng(seed)
+    shop = Shop(catalog or load_catalog(CATALOG_FILE), params.price_scale)
+    rewards = np.asarray(params.streak_rewards or main_constant('DAILY_STREAK_REWARDS'),
+                         dtype=np.float64) * params.streak_scale
+    n = players
+    people = Population(rng, params, n)
+
+    alive = np.ones(n, dtype=bool)
+    played_yesterday = np.zeros(n, dtype=bool)
+    streak = np.zeros(n, dtype=np.int8)
+    coins = np.zeros(n, dtype=np.float64)
+    owned = np.zeros((n, len(shop)), dtype=np.int16)
+    unlock_day = np.zeros((n, len(shop.levels)), dtype=np.int16)
+    premium_day = np.zeros(n, dtype=np.int16)
+    # الدخل وكلفة الشراء التالي تُحسب مرة، ثم لمن اشترى فقط
+    everyone = np.arange(n)
+    people.update_income(everyone, shop.effects(owned[:1]).repeat(n, axis=0))
+    next_cost = np.full(n, shop.next_cost(owned[:1], params.policy)[0])
+    earned_total = 0.0
+    active_days = 0
+
+    for day in range(1, days + 1):
+        alive &= rng.random(n, dtype=np.float32) >= params.daily_churn
+        active = alive & (rng.random(n, dtype=np.float32) < people.active_p)
+        act = np.flatnonzero(active)
+        active_days += act.size
+
+        # مكافأة اليوم: السلسلة تستمر فقط إن جُمعت مكافأة الأمس
+        day_streak = np.where(played_yesterday[act], np.minimum(streak[act] + 1, len(rewards)), 1)
+        streak[act] = day_streak
+        first_full = act[(day_streak >= len(rewards)) & (premium_day[act] == 0)]
+        premium_day[first_full] = day
+        played_yesterday = active
+
+        earned = rewards[day_streak - 1] + people.earnings(rng, act)
+        coins[act] += earned
+        earned_total += earned.sum()
+
+        buyers = buy(shop, params.policy, act[coins[act] >= next_cost[act]], coins, owned, unlock_day, day)
+        if buyers.size:
+            people.update_income(buyers, shop.effects(owned[buyers]))
+            next_cost[buyers] = shop.next_cost(owned[buyers], params.policy)
+
+    return {
+        'shop': shop,
+        'unlock_day': unlock_day,
+        'premium_day': premium_day,
+        'days': days,
+        'players': n,
+        'coins_per_active_day': earned_total / max(1, active_days),
+        'final_balance': float(np.median(coins)),
+        'retained': float(alive.mean()),
+    }
+
+
+def buy(shop, policy, rows, coins, owned, unlock_day, day):
+    """جولات شراء حتى لا يستطيع أحد من rows شراء ما يليه؛ تُرجع صفوف من اشترى."""
+    buyers = rows
+    for _ in range(MAX_BUYS_PER_DAY):
+        if not rows.size:
+            break
+        levels = owned[rows]
+        choice, cost = shop.next_purchase(levels, policy)
+        ok = coins[rows] >= cost
+        rows, choice, cost = rows[ok], choice[ok], cost[ok]
+        coins[rows] -= cost
+        owned[rows, choice] += 1
+        unlock_day[rows, shop.offsets[choice] + owned[rows, choice] - 1] = day
+    return buyers
+
+
+def unlock_percentiles(days_column, horizon, qs=(10, 50, 90)):
+    """أيام الوصول عند كل نسبة مئوية؛ None إن لم يصل إليها ذلك القدر من اللاعبين."""
+    reached = np.where(days_column > 0, days_column, horizon + 1)
+    values = np.percentile(reached, qs, method='lower')
+    return [int(v) if v <= horizon else None for v in values]
+
+
+def summarize(result):
+    horizon = result['days']
+    unlock_day = result['unlock_day']
+    items = {}
+    for column, (item_id, level) in enumerate(result['shop'].levels):
+        days_column = unlock_day[:, column]
+        items[f"{item_id}:{level}"] = {
+            'reached': round(float((days_column > 0).mean()), 4),
+            'p10_p50_p90': unlock_percentiles(days_column, horizon),
+        }
+    premium = result['premium_day']
+    items[f"{STREAK_THEME}:streak"] = {
+        'reached': round(float((premium > 0).mean()), 4),
+        'p10_p50_p90': unlock_percentiles(premium, horizon),
+    }
+    return {
+        'coins_per_active_day': round(result['coins_per_active_day'], 2),
+        'median_final_balance': round(result['final_balance'], 1),
+        'retained': round(result['retained'], 4),
+        'items': items,
+    }
+
+
+def parse_grid(specs):
+    """["price_scale=0.5,1", ...] -> [(الحقل، [القيم])]."""
+    grid = []
+    for spec in specs or ():
+        name, _, values = spec.partition('=')
+        if name not in Params._fields or name in ('mode_shares', 'streak_rewards'):
+            raise SystemExit(f"--grid: unknown or non-scalar parameter {name!r}")
+        cast = str if name == 'policy' else float
+        grid.append((name, [cast(v) for v in values.split(',') if v]))
+    return grid
+
+
+def format_days(p):
+    return '/'.join('-' if v is None else str(v) for v in p)
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--players', type=int, default=100_000)
+    parser.add_argument('--days', type=int, default=60)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--policy', choices=POLICIES, default=DEFAULT_PARAMS.policy)
+    parser.add_argument('--grid', action='append', metavar='PARAM=V1,V2',
+                        help=f"sweep a parameter (repeatable); one of {', '.join(Params._fields)}")
+    parser.add_argument('--out', help='write every configuration summary as JSON')
+    args = parser.parse_args(argv)
+
+    grid = parse_grid(args.grid)
+    names = [name for name, _ in grid]
+    base = DEFAULT_PARAMS._replace(policy=args.policy)
+    catalog = load_catalog(CATALOG_FILE)
+    runs = []
+    started = time.perf_counter()
+    for values in itertools.product(*(values for _, values in grid)):
+        params = base._replace(**dict(zip(names, values)))
+        t0 = time.perf_counter()
+        summary = summarize(simulate(params, args.players, args.days, args.seed, catalog))
+        summary['seconds'] = round(time.perf_counter() - t0, 3)
+        summary['params'] = dict(zip(names, values))
+        runs.append(summary)
+    elapsed = time.perf_counter() - started
+
+    columns = list(runs[0]['items'])
+    print(f"{args.players} players x {args.days} days, {len(runs)} configuration(s) in {elapsed:.1f} s; "
+          f"days to unlock p10/p50/p90 ('-' = not reached by then)")
+    label_width = max([len(' '.join(f"{k}={v:g}" if isinstance(v, float) else f"{k}={v}"
+                                    for k, v in run['params'].items())) for run in runs] + [8])
+    for run in runs:
+        label = ' '.join(f"{k}={v:g}" if isinstance(v, float) else f"{k}={v}" for k, v in run['params'].items())
+        print(f"\n{label or 'defaults':{label_width}}  coins/active day {run['coins_per_active_day']:.1f}  "
+              f"retained {run['retained']:.0%}  ({run['seconds']:.2f} s)")
+        for column in columns:
+            item = run['items'][column]
+            print(f"  {column:24} {item['reached']:7.1%}  {format_days(item['p10_p50_p90']):>12}")
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({'players': args.players, 'days': args.days, 'seed': args.seed, 'runs': runs}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
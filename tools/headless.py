@@ -0,0 +1,69 @@
+"""
+تشغيل ClickerApp بلا نافذة حقيقية (لأدوات القياس والتحميل فقط، لا تُضمَّن في APK).
+
+- نافذة SDL2 خارج الشاشة (offscreen) وواجهة OpenGL وهمية (mock) افتراضيًا،
+  ويمكن تجاوزهما بمتغيرات البيئة المعتادة (SDL_VIDEODRIVER, KIVY_GL_BACKEND).
+- ملفات اللاعب (profile.db وملفات JSON القديمة) تُوجَّه إلى مجلد مؤقت حتى لا
+  تُلمس بيانات المطور الحقيقية.
+"""
+import os
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def configure_environment():
+    """ضبط متغيرات بيئة Kivy قبل أول استيراد له."""
+    os.environ.setdefault('KIVY_NO_ARGS', '1')
+    os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+    os.environ.setdefault('KIVY_NO_FILELOG', '1')
+    os.environ.setdefault('SDL_VIDEODRIVER', 'offscreen')
+    os.environ.setdefault('KIVY_GL_BACKEND', 'mock')
+    os.environ.setdefault('KIVY_HOME', tempfile.mkdtemp(prefix='kivy_home_'))
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+
+
+def boot_app(data_dir=None):
+    """
+    إنشاء ClickerApp وبناء واجهته دون تشغيل الحلقة الرئيسية.
+    تُرجع (main, app, data_dir). تقدّم الإطارات يدويًا عبر pump().
+    """
+    configure_environment()
+    # main.py يحمّل الكتالوج و game_design.kv بمسارات نسبية
+    os.chdir(REPO_ROOT)
+    import main
+    from kivy.app import App
+    from kivy.uix.screenmanager import NoTransition
+
+    data_dir = data_dir or tempfile.mkdtemp(prefix='clicker_profile_')
+    main.PROFILE_DB_FILE = os.path.join(data_dir, 'profile.db')
+    main.SCORE_FILE = os.path.join(data_dir, 'high_score.json')
+    main.ACHIEVEMENTS_FILE = os.path.join(data_dir, 'achievements.json')
+    main.CURRENCY_FILE = os.path.join(data_dir, 'currency.json')
+    main.STATS_FILE = os.path.join(data_dir, 'stats.json')
+
+    app = main.ClickerApp()
+    App._running_app = app
+    app._run_prepare()
+    # الانتقالات المتحركة تؤخر on_enter عدة إطارات؛ القياسات تريد الانتقال الفوري
+    app.root.transition = NoTransition()
+    return main, app, data_dir
+
+
+def pump(frames=1):
+    """تقديم Kivy Clock عددًا من الإطارات (المواعيد فقط، دون مدخلات أو رسم)."""
+    from kivy.clock import Clock
+    for _ in range(frames):
+        Clock.tick()
+
+
+def frame():
+    """إطار كامل كما في الحلقة الرئيسية: Clock، ثم مزودو المدخلات، ثم الرسم."""
+    from kivy.base import EventLoop
+    EventLoop.idle()
+
+
+def shutdown(app):
+    app.on_stop()
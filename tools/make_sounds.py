@@ -0,0 +1,75 @@
+"""
+توليد المؤثرات الصوتية القصيرة في data/sounds/ (أداة تطوير فقط، لا تُضمَّن في APK).
+
+كل مؤثر نغمة مركّبة بسيطة (موجة جيبية أو مسح ترددي مع غلاف اضمحلال) تُكتب WAV
+أحادي 16 بت: ملفات صغيرة لا تحتاج فك ضغط عند التحميل (بخلاف mp3)، فيكون
+تحميلها المسبق في audio.py سريعًا. الناتج حتمي، فإعادة التشغيل لا تغيّر الملفات.
+
+    python tools/make_sounds.py
+"""
+import argparse
+import math
+import os
+import struct
+import sys
+import wave
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+from audio import EFFECTS, SOUND_DIR  # noqa: E402
+
+SAMPLE_RATE = 22050
+AMPLITUDE = 0.5
+ATTACK = 0.003        # ثوانٍ؛ بداية ناعمة تمنع النقرة الرقمية
+
+
+def tone(duration, freq_start, freq_end=None, decay=8.0, harmonics=(1.0,), square=False):
+    """عينات [-1, 1] لنغمة يتغير ترددها خطيًا من freq_start إلى freq_end."""
+    freq_end = freq_start if freq_end is None else freq_end
+    n = int(duration * SAMPLE_RATE)
+    samples = []
+    phase = 0.0
+    for i in range(n):
+        t = i / SAMPLE_RATE
+        freq = freq_start + (freq_end - freq_start) * i / max(1, n - 1)
+        phase += 2 * math.pi * freq / SAMPLE_RATE
+        value = sum(weight * math.sin(phase * (k + 1)) for k, weight in enumerate(harmonics))
+        if square:
+            value = 1.0 if value >= 0 else -1.0
+        envelope = min(1.0, t / ATTACK) * math.exp(-decay * t / duration)
+        samples.append(value * envelope / sum(harmonics))
+    return samples
+
+
+SOUNDS = {
+    'tap': lambda: tone(0.045, 1400, 1100, decay=6.0),
+    'wrong': lambda: tone(0.18, 180, 140, decay=3.0, square=True),
+    'powerup': lambda: tone(0.16, 600, 1500, decay=2.5, harmonics=(1.0, 0.3)),
+    'reaction': lambda: tone(0.05, 880, decay=2.0) + tone(0.06, 1320, decay=4.0),
+}
+
+
+def write_wav(path, samples):
+    frames = b''.join(struct.pack('<h', int(max(-1.0, min(1.0, s)) * AMPLITUDE * 32767)) for s in samples)
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(frames)
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', default=os.path.join(REPO_ROOT, SOUND_DIR))
+    args = parser.parse_args(argv)
+    os.makedirs(args.out, exist_ok=True)
+    for name, (filename, _voices) in EFFECTS.items():
+        samples = SOUNDS[name]()
+        path = os.path.join(args.out, filename)
+        write_wav(path, samples)
+        print(f"{path}: {len(samples) / SAMPLE_RATE * 1000:.0f} ms, {os.path.getsize(path)} bytes")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
@@ -0,0 +1,114 @@
+"""
+إعادة تشغيل سجلات أحداث الألعاب المحفوظة (event_log.py) للتحقق والقياس.
+
+يقرأ آخر السجلات من profile.db (مثلًا نسخة من جهاز لاعب أبلغ عن مشكلة)، ويعيد
+كل لعبة على GameCore وحده فورًا ويقارن النتيجة بالمسجلة؛ مع --screen تُعاد
+عبر GameScreen في تطبيق بلا نافذة (tools/headless.py) بالسرعة المطلوبة.
+
+    python tools/replay.py path/to/profile.db --limit 5
+    python tools/replay.py path/to/profile.db --screen --speed 4
+    python tools/replay.py path/to/profile.db --dump 1
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import event_log  # noqa: E402
+from event_log import EventLog, replay_core  # noqa: E402
+from profile_store import ProfileStore  # noqa: E402
+
+
+def load_logs(db_path, limit, mode=None):
+    store = ProfileStore(db_path)
+    try:
+        rows = store.load_game_logs(limit=limit, mode=mode)
+    finally:
+        store.close()
+    return [(row, EventLog.from_record(row['header'], row['events'])) for row in rows]
+
+
+def verdict(log, result):
+    matched = log.matches(result)
+    if matched is None:
+        return 'unverified'
+    return 'match' if matched else f"DIFFERS (recorded {log.result})"
+
+
+def replay_on_screen(logs, speed, timeout):
+    """إعادة كل سجل عبر GameScreen؛ تُرجع [(row, log, result, ثوانٍ)]."""
+    from headless import boot_app, frame, shutdown
+
+    # ملف لاعب مؤقت: إعادة التشغيل لا تكتب شيئًا في القاعدة المقروءة
+    data_dir = tempfile.mkdtemp(prefix='clicker_replay_')
+    main, app, _ = boot_app(data_dir)
+    game = app.root.get_screen('game')
+    results = []
+    try:
+        for row, log in logs:
+            game.set_mode(log.mode)
+            game.pending_replay = (log, speed)
+            app.root.current = 'game'
+            frame()
+            started = time.perf_counter()
+            while game.game_running and time.perf_counter() - started < timeout:
+                frame()
+            replayer = game.replayer
+            results.append((row, log, replayer.result if replayer else None, time.perf_counter() - started))
+            app.root.current = 'menu'
+            frame()
+    finally:
+        shutdown(app)
+        shutil.rmtree(data_dir, ignore_errors=True)
+    return results
+
+
+def dump(log):
+    print(f"mode={log.mode} seed={log.seed} events={len(log)} truncated={log.truncated}")
+    for t, kind, x, y in log:
+        pos = f" x={x:.3f} y={y:.3f}" if x >= 0 else ''
+        print(f"  {t - log.started_at:9.4f}s {event_log.EVENT_NAMES.get(kind, kind)}{pos}")
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('db', help='profile.db containing game_logs')
+    parser.add_argument('--limit', type=int, default=20, help='most recent logs to replay')
+    parser.add_argument('--mode', help='only replay games of this mode')
+    parser.add_argument('--screen', action='store_true', help='replay through GameScreen (headless app)')
+    parser.add_argument('--speed', type=float, default=1.0, help='screen replay speed (default 1x)')
+    parser.add_argument('--timeout', type=float, default=120.0, help='max seconds per screen replay')
+    parser.add_argument('--dump', type=int, metavar='N', help='print the events of the Nth most recent log')
+    args = parser.parse_args(argv)
+
+    logs = load_logs(args.db, args.limit, args.mode)
+    if not logs:
+        print("no game logs found")
+        return 1
+    if args.dump is not None:
+        dump(logs[args.dump - 1][1])
+        return 0
+
+    failures = 0
+    if args.screen:
+        rows = replay_on_screen(logs, args.speed, args.timeout)
+    else:
+        rows = []
+        for row, log in logs:
+            started = time.perf_counter()
+            result = replay_core(log)
+            rows.append((row, log, result, time.perf_counter() - started))
+    for row, log, result, seconds in rows:
+        status = verdict(log, result) if result is not None else 'did not finish'
+        failures += status not in ('match', 'unverified')
+        score = f"{result.score:g}" if result is not None else '-'
+        print(f"#{row['id']:<5} {row['played_at']:19} {log.mode:9} events={len(log):5} "
+              f"score={score:>8} {seconds * 1000:9.2f} ms  {status}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
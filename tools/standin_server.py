@@ -0,0 +1,216 @@
+"""
+خادم نتائج محلي بديل (Stand-in Server) لتجربة طابور الإرسال (submission.py) دون شبكة.
+
+serve: خادم HTTP/1.1 بإبقاء الاتصال مفتوحًا يستقبل POST /v1/scores (JSON مضغوط
+gzip)، ويزيل التكرار بمفتاح كل نتيجة، ويمكن أن يفشل عمدًا بنسبة محددة (503 مع
+Retry-After) أو يقطع الاتصال بعد حفظ الدفعة وقبل الرد، أو يتأخر. GET /stats تُرجع العدادات.
+
+load: يشغّل الخادم في نفس العملية ويرسل N نتيجة عبر Submitter حقيقي وطابور في
+قاعدة مؤقتة، ثم يطبع الإنتاجية وعدد الدفعات والاتصالات وإعادات المحاولة والتكرارات.
+الخروج بالرمز 1 إن لم تصل كل النتائج مرة واحدة بالضبط.
+
+    python tools/standin_server.py serve --port 8765 --fail-rate 0.2
+    CLICKER_SUBMIT_URL=http://127.0.0.1:8765 python main.py
+    python tools/standin_server.py load --results 1000 --fail-rate 0.3 --drop-rate 0.05
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from profile_store import OUTBOX_LIMIT  # noqa: E402
+from submission import SUBMIT_PATH  # noqa: E402
+
+
+class StandinState:
+    def __init__(self, fail_rate=0.0, drop_rate=0.0, latency=0.0, seed=None):
+        self.fail_rate = fail_rate
+        self.drop_rate = drop_rate
+        self.latency = latency
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.keys = set()
+        self.batch_keys = set()
+        self.stats = {'requests': 0, 'batches': 0, 'results': 0, 'duplicates': 0, 'failed': 0,
+                      'dropped': 0, 'bytes': 0, 'raw_bytes': 0, 'connections': 0}
+
+    def roll(self, rate):
+        with self.lock:
+            return self.rng.random() < rate
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'   # keep-alive
+    disable_nagle_algorithm = True  # الترويسات والجسم كتابتان؛ بدونه يتأخر كل رد ~40ms (delayed ACK)
+    state = None
+
+    def setup(self):
+        super().setup()
+        with self.state.lock:
+            self.state.stats['connections'] += 1
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _reply(self, status, payload, headers=()):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != '/stats':
+            self._reply(404, {'error': 'not found'})
+            return
+        with self.state.lock:
+            self._reply(200, dict(self.state.stats, unique=len(self.state.keys)))
+
+    def do_POST(self):
+        state = self.state
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        with state.lock:
+            state.stats['requests'] += 1
+            state.stats['bytes'] += len(body)
+        if self.path != SUBMIT_PATH:
+            self._reply(404, {'error': 'not found'})
+            return
+        if state.latency:
+            time.sleep(state.latency)
+        if state.roll(state.fail_rate):
+            with state.lock:
+                state.stats['failed'] += 1
+            self._reply(503, {'error': 'unavailable'}, [('Retry-After', '0')])
+            return
+        try:
+            raw = gzip.decompress(body) if self.headers.get('Content-Encoding') == 'gzip' else body
+            results = json.loads(raw)['results']
+            keys = [item['key'] for item in results]
+        except (OSError, ValueError, KeyError, TypeError):
+            self._reply(400, {'error': 'malformed batch'})
+            return
+        accepted, duplicates = [], []
+        with state.lock:
+            state.stats['raw_bytes'] += len(raw)
+            state.stats['batches'] += 1
+            state.batch_keys.add(self.headers.get('Idempotency-Key', ''))
+            for key in keys:
+                if key in state.keys:
+                    duplicates.append(key)
+                else:
+                    state.keys.add(key)
+                    accepted.append(key)
+            state.stats['results'] += len(accepted)
+            state.stats['duplicates'] += len(duplicates)
+        if state.roll(state.drop_rate):
+            # الدفعة حُفظت لكن الرد ضاع: العميل سيعيد إرسالها، ومفاتيحها تمنع تكرارها
+            with state.lock:
+                state.stats['dropped'] += 1
+            self.close_connection = True
+            return
+        self._reply(200, {'accepted': accepted, 'duplicates': duplicates})
+
+
+def make_server(port=0, **state_options):
+    state = StandinState(**state_options)
+    handler = type('Handler', (StandinHandler,), {'state': state})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    return server, state
+
+
+def serve(args):
+    server, state = make_server(args.port, fail_rate=args.fail_rate, drop_rate=args.drop_rate,
+                                latency=args.latency / 1000.0)
+    print(f"stand-in score server on http://127.0.0.1:{server.server_address[1]}{SUBMIT_PATH} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(dict(state.stats, unique=len(state.keys))))
+    return 0
+
+
+def load(args):
+    from profile_store import ProfileStore
+    from submission import Submitter
+
+    server, state = make_server(fail_rate=args.fail_rate, drop_rate=args.drop_rate,
+                                latency=args.latency / 1000.0, seed=args.seed)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    data_dir = tempfile.mkdtemp(prefix='clicker_submit_')
+    store = ProfileStore(os.path.join(data_dir, 'profile.db'))
+    # التراجع الحقيقي يبدأ من ثانية؛ هنا يُصغَّر حتى تنتهي التجربة بسرعة
+    submitter = Submitter(store, f"http://127.0.0.1:{server.server_address[1]}",
+                          batch_size=args.batch_size, linger=args.linger, backoff_base=args.backoff_base,
+                          backoff_max=args.backoff_max, rng=random.Random(args.seed))
+    try:
+        started = time.perf_counter()
+        for i in range(args.results):
+            submitter.submit({'mode': 'classic', 'score': i, 'taps': i, 'wrong_taps': 0, 'seed': i})
+        enqueued = time.perf_counter() - started
+        deadline = started + args.timeout
+        while time.perf_counter() < deadline and (state.stats['results'] < args.results or store.outbox_count()):
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - started
+        submitter.close(timeout=5.0)
+        left = store.outbox_count()
+    finally:
+        server.shutdown()
+        server.server_close()
+        store.close()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    stats = state.stats
+    print(f"results       {args.results} submitted in {enqueued * 1000:.1f} ms on the caller thread")
+    print(f"delivered     {stats['results']} unique in {elapsed:.2f} s ({stats['results'] / elapsed:.0f}/s)")
+    print(f"batches       {stats['batches']} ok / {stats['requests']} requests over {stats['connections']} connections")
+    print(f"failures      {stats['failed']} 503, {stats['dropped']} dropped, client retries {submitter.stats['retries']}")
+    print(f"duplicates    {stats['duplicates']} (resent after a lost reply, ignored by key)")
+    if stats['raw_bytes']:
+        print(f"compression   {stats['bytes'] / 1024:.1f} KiB sent for {stats['raw_bytes'] / 1024:.1f} KiB of JSON")
+    ok = stats['results'] == args.results and left == 0
+    print("OK" if ok else f"FAIL: {args.results - stats['results']} results missing, {left} left in outbox")
+    return 0 if ok else 1
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+    for name in ('serve', 'load'):
+        p = sub.add_parser(name)
+        p.add_argument('--fail-rate', type=float, default=0.0, help='fraction of batches answered 503')
+        p.add_argument('--drop-rate', type=float, default=0.0,
+                       help='fraction of stored batches whose reply is lost (connection closed)')
+        p.add_argument('--latency', type=float, default=0.0, help='server latency per request (ms)')
+    sub.choices['serve'].add_argument('--port', type=int, default=8765)
+    load_parser = sub.choices['load']
+    load_parser.add_argument('--results', type=int, default=1000)
+    load_parser.add_argument('--batch-size', type=int, default=50)
+    load_parser.add_argument('--linger', type=float, default=0.05)
+    load_parser.add_argument('--backoff-base', type=float, default=0.01)
+    load_parser.add_argument('--backoff-max', type=float, default=0.5)
+    load_parser.add_argument('--timeout', type=float, default=60.0)
+    load_parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    if args.command == 'load' and args.results > OUTBOX_LIMIT:
+        parser.error(f"--results above the outbox limit ({OUTBOX_LIMIT}) would drop the oldest results")
+    return serve(args) if args.command == 'serve' else load(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
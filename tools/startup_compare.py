@@ -0,0 +1,60 @@
+"""
+مقارنة تتبعَي إقلاع (startup_trace.py) بين إصدارين.
+
+ملف التتبع يُنتج بتشغيل التطبيق مع CLICKER_STARTUP_TRACE (على الجهاز أو سطح
+المكتب)، ثم يُقارن هنا: أول إطار، إجمالي الاستيراد، وكل مرحلة وشاشة بأسمائها.
+الخروج بالرمز 1 إن تباطأ أول إطار أو إجمالي الاستيراد أكثر من الحد المسموح.
+
+    CLICKER_STARTUP_TRACE=new.json python main.py
+    python tools/startup_compare.py old.json new.json --tolerance 0.15
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from startup_trace import totals  # noqa: E402
+
+DEFAULT_TOLERANCE = 0.15
+# المراحل الصغيرة جدًا ضجيج؛ لا تُفشل المقارنة
+GATED = ('first_frame', 'imports')
+
+
+def load_totals(path):
+    with open(path) as f:
+        return totals(json.load(f).get('traceEvents', []))
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('baseline', help='trace JSON from the previous release')
+    parser.add_argument('current', help='trace JSON from the build under test')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed relative slowdown of first_frame/imports (default 0.15)')
+    args = parser.parse_args(argv)
+
+    base = load_totals(args.baseline)
+    cur = load_totals(args.current)
+    regressions = []
+    print(f"{'phase':28} {'base ms':>10} {'now ms':>10} {'change':>9}")
+    for name in sorted(set(base) | set(cur), key=lambda n: (n not in GATED, n)):
+        b, c = base.get(name), cur.get(name)
+        if b is None or c is None:
+            print(f"{name:28} {'-' if b is None else f'{b:.1f}':>10} {'-' if c is None else f'{c:.1f}':>10}")
+            continue
+        change = (c - b) / b if b else 0.0
+        mark = ''
+        if name in GATED and change > args.tolerance:
+            mark = '  REGRESSION'
+            regressions.append(name)
+        print(f"{name:28} {b:>10.1f} {c:>10.1f} {change:>+8.0%}{mark}")
+    if regressions:
+        print(f"FAIL: {', '.join(regressions)} slower than baseline by more than {args.tolerance:.0%}")
+        return 1
+    print("OK: no startup regressions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
@@ -0,0 +1,294 @@
+"""
+حمل لمسات اصطناعي (Touch Storm) على GameScreen من طرف إلى طرف.
+
+يشغّل ClickerApp بنافذة خارج الشاشة ويضيف مزود مدخلات (MotionEventProvider)
+يحقن لمسات MotionEvent مجدولة بالوقت الحقيقي نحو tap_button و foe_button و
+power_button، بمعدلات قابلة للضبط ومع ضربات متعددة الأصابع. اللمسات تمر بنفس
+المسار الحقيقي: EventLoop.dispatch_input -> Window.on_motion -> on_touch_down/up.
+
+لكل وضع يُبلَّغ عن: اللمسات المحقونة مقابل المقبولة (زر النقر: خرجت من طابور
+اللمسات إلى القلب؛ الزران الآخران: أطلقا on_release)، زمن المعالجة لكل لمسة (من
+موعد الحقن إلى قبولها)، عدادات الطابور (المرتدة والمكررة وأكبر دفعة)، توزيع
+زمن الإطار، وأقصى عدد من مواعيد Clock المعلقة.
+
+    python tools/touch_storm.py --rate 30 --fingers 3 --duration 8
+    python tools/touch_storm.py --modes classic,reaction --out storm.json
+"""
+import argparse
+import heapq
+import itertools
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import headless  # noqa: E402
+
+headless.configure_environment()
+
+from kivy.clock import Clock  # noqa: E402
+from kivy.core.window import Window  # noqa: E402
+from kivy.input.motionevent import MotionEvent  # noqa: E402
+from kivy.input.provider import MotionEventProvider  # noqa: E402
+
+FRAME_BUDGET = 1 / 60.0
+LATE_FRAME = 1.5 * FRAME_BUDGET
+LATE_TAP = 2 * FRAME_BUDGET
+LIFT_TIME = 0.04        # أقصر زمن يرفع فيه الإصبع نفسه قبل أن يضغط من جديد
+TARGETS = ('tap_button', 'foe_button', 'power_button')
+# الزر الرئيسي يدفع كل ضغطة إلى طابور اللمسات، وزرا DON'T TAP و +TIME يستجيبان عند الرفع
+RELEASE_TARGETS = ('foe_button', 'power_button')
+
+
+class StormTouch(MotionEvent):
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('is_touch', True)
+        kwargs.setdefault('type_id', 'touch')
+        super().__init__(*args, **kwargs)
+        self.profile = ['pos']
+
+    def depack(self, args):
+        self.sx, self.sy = args
+        super().depack(args)
+
+
+class StormProvider(MotionEventProvider):
+    """
+    طابور لمسات مجدولة بأوقات perf_counter مطلقة. يُفرَّغ المستحق منها في كل
+    إطار، تمامًا كما يسلّم مزود الجهاز الحقيقي الأحداث المتراكمة بين إطارين.
+    اللمسات تأتي من عدد ثابت من الأصابع، لكل إصبع مسار أفقي خاص في الزر، ولا
+    يضغط الإصبع من جديد قبل أن يُرفع ويمضي LIFT_TIME (كما في الضرب الحقيقي).
+    """
+
+    def __init__(self, rng, fingers=2):
+        super().__init__('storm', None)
+        self.rng = rng
+        self.queue = []
+        self.seq = itertools.count()
+        self.touches = {}       # uid -> معلومات اللمسة
+        self.on_begin = None
+        self.fingers = max(2, fingers)
+        self.free_at = [0.0] * self.fingers
+
+    def schedule_burst(self, due, target, fingers, hold):
+        """ضربة بعدة أصابع متزامنة على زر واحد (الأصابع الأسبق تحررًا)."""
+        chosen = sorted(range(self.fingers), key=self.free_at.__getitem__)[:fingers]
+        for finger in chosen:
+            uid = next(self.seq)
+            begin = max(due, self.free_at[finger]) + self.rng.uniform(0, 0.004)
+            release = begin + hold * self.rng.uniform(0.7, 1.3)
+            self.free_at[finger] = release + LIFT_TIME
+            heapq.heappush(self.queue, (begin, uid, 'begin', (target, finger)))
+            heapq.heappush(self.queue, (release, uid, 'end', (target, finger)))
+
+    def clear(self):
+        self.queue.clear()
+        self.free_at = [0.0] * self.fingers
+
+    def update(self, dispatch_fn):
+        now = time.perf_counter()
+        queue = self.queue
+        while queue and queue[0][0] <= now:
+            due, uid, etype, (target, finger) = heapq.heappop(queue)
+            if etype == 'begin':
+                widget = target()
+                # الإصبع يصيب نقطة قريبة من مساره داخل الزر حيث يظهر الآن
+                lane = -0.3 + 0.6 * (finger + 0.5) / self.fingers
+                x = widget.center_x + widget.width * (lane + self.rng.uniform(-0.05, 0.05))
+                y = widget.center_y + widget.height * self.rng.uniform(-0.3, 0.3)
+                touch = StormTouch(self.device, uid, [x / Window.width, y / Window.height])
+                self.touches[uid] = {'touch': touch, 'begin_due': due, 'end_due': None}
+                if self.on_begin:
+                    self.on_begin(uid, widget)
+                dispatch_fn('begin', touch)
+            else:
+                info = self.touches.get(uid)
+                if info is None:
+                    continue
+                info['end_due'] = due
+                touch = info['touch']
+                touch.update_time_end()
+                dispatch_fn('end', touch)
+
+
+def summarize(values_ms):
+    if not values_ms:
+        return {'count': 0}
+    values = sorted(values_ms)
+
+    def pct(fraction):
+        return round(values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))], 3)
+    return {'count': len(values), 'p50': pct(0.50), 'p90': pct(0.90), 'p99': pct(0.99),
+            'max': round(values[-1], 3)}
+
+
+def schedule_target(provider, rng, start, duration, target, rate, max_fingers, multi_chance):
+    if rate <= 0:
+        return
+    t = start + rng.expovariate(rate)
+    while t < start + duration:
+        fingers = rng.randint(2, max_fingers) if max_fingers > 1 and rng.random() < multi_chance else 1
+        provider.schedule_burst(t, target, fingers, hold=rng.uniform(0.03, 0.12))
+        t += rng.expovariate(rate)
+
+
+def run_mode(app, provider, mode, args, rng):
+    root = app.root
+    game = root.get_screen('game')
+    game.set_mode(mode)
+    root.current = 'game'
+    for _ in range(3):
+        headless.frame()
+    game.start_game_on_tap(None)
+    core = game.core
+
+    stats = {name: {'injected': 0, 'injected_visible': 0, 'accepted': 0, 'latency_ms': []}
+             for name in TARGETS}
+    widgets = {name: getattr(game.ids, name) for name in TARGETS}
+    owner = {}
+    storm_ids = {}      # MotionEvent.uid -> معرّف اللمسة في المزود
+    input_before = dict(game.touches.stats)
+
+    def on_begin(uid, widget):
+        if not core.running:
+            return
+        name = next(n for n, w in widgets.items() if w is widget)
+        owner[uid] = name
+        storm_ids[provider.touches[uid]['touch'].uid] = uid
+        stats[name]['injected'] += 1
+        if not widget.disabled and widget.opacity > 0:
+            stats[name]['injected_visible'] += 1
+    provider.on_begin = on_begin
+
+    def listener(name):
+        def record(button):
+            touch = button.last_touch
+            info = provider.touches.get(touch.id) if touch is not None else None
+            if info is None or owner.get(touch.id) != name:
+                return
+            stats[name]['accepted'] += 1
+            stats[name]['latency_ms'].append((time.perf_counter() - info['end_due']) * 1000.0)
+        return record
+
+    def tap_accepted(touch_uid, kind, t):
+        uid = storm_ids.get(touch_uid)
+        info = provider.touches.get(uid)
+        if info is None or owner.get(uid) != 'tap_button':
+            return
+        stats['tap_button']['accepted'] += 1
+        stats['tap_button']['latency_ms'].append((time.perf_counter() - info['begin_due']) * 1000.0)
+    game.touches.observer = tap_accepted
+
+    bindings = []
+    for name in RELEASE_TARGETS:
+        widget = widgets[name]
+        callback = listener(name)
+        widget.fbind('on_release', callback)
+        bindings.append((widget, 'on_release', callback))
+
+    start = time.perf_counter()
+    for name, rate in (('tap_button', args.rate), ('foe_button', args.foe_rate), ('power_button', args.power_rate)):
+        schedule_target(provider, rng, start, args.duration, lambda n=name: widgets[n], rate,
+                        args.fingers, args.multi_chance)
+
+    frame_ms = []
+    max_pending = 0
+    last = start
+    while time.perf_counter() - start < args.duration and core.running:
+        headless.frame()
+        now = time.perf_counter()
+        frame_ms.append((now - last) * 1000.0)
+        last = now
+        max_pending = max(max_pending, len(Clock.get_events()))
+    elapsed = time.perf_counter() - start
+    game_over = not core.running
+
+    provider.clear()
+    # لمسات الإطار الأخير تُعالج في الإطار الذي يليه
+    headless.frame()
+    provider.on_begin = None
+    game.touches.observer = None
+    for widget, event, callback in bindings:
+        widget.funbind(event, callback)
+    if core.running:
+        game.render(core.end())
+    provider.touches.clear()
+    for _ in range(3):
+        headless.frame()
+
+    targets = {}
+    for name, s in stats.items():
+        expected = s['injected'] if name == 'tap_button' else s['injected_visible']
+        latencies = s['latency_ms']
+        targets[name] = {
+            'injected': s['injected'],
+            'injected_visible': s['injected_visible'],
+            'accepted': s['accepted'],
+            # ضغطات متعددة الأصابع مقبولة كلها، فالمفقود لا يكون سالبًا
+            'lost': max(0, expected - s['accepted']),
+            'late': sum(1 for v in latencies if v > LATE_TAP * 1000.0),
+            'latency_ms': summarize(latencies),
+        }
+    return {
+        'duration_s': round(elapsed, 3),
+        'game_over': game_over,
+        'frames': len(frame_ms),
+        'frame_ms': summarize(frame_ms),
+        'late_frames': sum(1 for v in frame_ms if v > LATE_FRAME * 1000.0),
+        'max_pending_clock_events': max_pending,
+        'input': {key: value - input_before[key] if key != 'max_batch' else value
+                  for key, value in game.touches.stats.items()},
+        'targets': targets,
+        'core': {'taps': core.taps, 'wrong_taps': core.wrong_taps, 'clicks': core.clicks},
+    }
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', default='classic,survival,accuracy,reaction')
+    parser.add_argument('--rate', type=float, default=30.0, help='tap_button bursts per second (default 30)')
+    parser.add_argument('--foe-rate', type=float, default=2.0, help='foe_button bursts per second')
+    parser.add_argument('--power-rate', type=float, default=1.0, help='power_button bursts per second')
+    parser.add_argument('--fingers', type=int, default=3, help='max simultaneous fingers per burst')
+    parser.add_argument('--multi-chance', type=float, default=0.25, help='chance a burst is multi-finger')
+    parser.add_argument('--duration', type=float, default=8.0, help='seconds per mode (stops early on game over)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--out', help='write the JSON report to this path')
+    args = parser.parse_args(argv)
+
+    from kivy.base import EventLoop
+    main, app, _ = headless.boot_app()
+    rng = random.Random(args.seed)
+    provider = StormProvider(rng, args.fingers)
+    EventLoop.add_input_provider(provider)
+    provider.start()
+
+    report = {'config': vars(args), 'modes': {}}
+    try:
+        for mode in args.modes.split(','):
+            result = run_mode(app, provider, mode.strip(), args, rng)
+            report['modes'][mode] = result
+            tap = result['targets']['tap_button']
+            # Kivy يحوّل sys.stderr إلى سجله، فالتقدم يُطبع على الأصلي
+            print(f"{mode:9} taps {tap['accepted']}/{tap['injected']} (lost {tap['lost']}, late {tap['late']}, "
+                  f"bounced {result['input']['bounced']}, max batch {result['input']['max_batch']}) "
+                  f"latency p99 {tap['latency_ms'].get('p99')} ms, frame p99 {result['frame_ms'].get('p99')} ms",
+                  file=sys.__stderr__)
+    finally:
+        provider.stop()
+        EventLoop.remove_input_provider(provider)
+        headless.shutdown(app)
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
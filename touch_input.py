@@ -0,0 +1,102 @@
+"""
+طابور لمسات اللعب (Touch Input Batching).
+
+مسار الحدث (on_touch_down على خيط الواجهة) لا يفعل سوى push(): سجل واحد بوقت
+اللمسة وموضعها ومعرّف الإصبع، دون أي منطق لعب أو عرض. كل الأصابع المتزامنة
+تُقبل، فلا يضيع ضغط إصبع ثانٍ والأول ما زال على الشاشة.
+
+مرة في كل إطار تُفرغ الشاشة الطابور عبر drain(floor, ceiling): السجلات مرتبة
+بوقتها (لا بترتيب وصولها)، ومحصورة بين آخر وقت مرّ على قلب اللعبة ووقت الإطار
+الحالي حتى لا يعود وقت القلب إلى الوراء، بعد قواعد إزالة الارتداد:
+- معرّف الإصبع نفسه لا يُحتسب إلا مرة (لمسة أعيد إرسالها للودجة).
+- لمسة من نفس النوع خلال DEBOUNCE_INTERVAL من لمسة مقبولة وفي حدود
+  DEBOUNCE_DISTANCE منها ارتداد (شاشات تبلّغ عن لمسة شبح بجانب الحقيقية)؛
+  إصبعان في موضعين مختلفين يُقبلان معًا مهما تقاربا في الزمن، ونفس الإصبع
+  لا يرفع ويضغط فعليًا في أقل من ذلك.
+الوحدة لا تعتمد على Kivy.
+"""
+from collections import deque
+
+DEBOUNCE_INTERVAL = 0.03       # ثوانٍ
+DEBOUNCE_DISTANCE = 0.03       # بإحداثيات الشاشة النسبية (0..1)
+RECENT_TOUCHES = 8             # اللمسات المقبولة التي تُقارن بها كل لمسة جديدة
+SEEN_IDS = 64                  # معرّفات الأصابع المتذكرة لإزالة التكرار
+
+
+class TouchBatcher:
+    """
+    طابور اللمسات بين إطارين. observer اختياري (touch_id, kind, t) يُستدعى لكل
+    لمسة مقبولة عند التفريغ (لأدوات القياس)، لا على مسار الحدث.
+    """
+
+    def __init__(self, interval=DEBOUNCE_INTERVAL, distance=DEBOUNCE_DISTANCE):
+        self.interval = interval
+        self.distance_sq = distance * distance
+        self._pending = []
+        self._spare = []
+        self._recent = deque(maxlen=RECENT_TOUCHES)
+        self._seen = deque(maxlen=SEEN_IDS)
+        self.observer = None
+        self.stats = {'received': 0, 'accepted': 0, 'bounced': 0, 'repeated': 0, 'batches': 0, 'max_batch': 0}
+
+    def __len__(self):
+        return len(self._pending)
+
+    def push(self, t, kind, sx=-1.0, sy=-1.0, touch_id=None):
+        """مسار الحدث: تسجيل اللمسة فقط (t بساعة القلب، sx/sy نسبية أو -1)."""
+        self._pending.append((t, kind, sx, sy, touch_id))
+
+    def clear(self):
+        """بداية لعبة جديدة: لا لمسات معلقة ولا تاريخ ارتداد."""
+        self._pending.clear()
+        self._recent.clear()
+        self._seen.clear()
+
+    def drain(self, floor, ceiling):
+        """
+        اللمسات المقبولة منذ الإفراغ السابق [(t, kind, sx, sy), ...] مرتبة بالوقت،
+        وكل وقت محصور في [floor, ceiling].
+        """
+        pending = self._pending
+        if not pending:
+            return []
+        # قائمتان تتبادلان: ما يصل أثناء المعالجة يذهب للإطار التالي
+        self._pending, self._spare = self._spare, pending
+        stats = self.stats
+        stats['received'] += len(pending)
+        stats['batches'] += 1
+        stats['max_batch'] = max(stats['max_batch'], len(pending))
+        if len(pending) > 1:
+            pending.sort(key=_time_key)
+        accepted = []
+        observer = self.observer
+        for t, kind, sx, sy, touch_id in pending:
+            if touch_id is not None:
+                if touch_id in self._seen:
+                    stats['repeated'] += 1
+                    continue
+                self._seen.append(touch_id)
+            if self._bounced(t, kind, sx, sy):
+                stats['bounced'] += 1
+                continue
+            self._recent.append((t, kind, sx, sy))
+            t = min(max(t, floor), ceiling)
+            accepted.append((t, kind, sx, sy))
+            if observer is not None:
+                observer(touch_id, kind, t)
+        pending.clear()
+        stats['accepted'] += len(accepted)
+        return accepted
+
+    def _bounced(self, t, kind, sx, sy):
+        if sx < 0:
+            return False
+        for t0, kind0, sx0, sy0 in self._recent:
+            if (kind0 == kind and sx0 >= 0 and abs(t - t0) < self.interval
+                    and (sx - sx0) ** 2 + (sy - sy0) ** 2 < self.distance_sq):
+                return True
+        return False
+
+
+def _time_key(record):
+    return record[0]
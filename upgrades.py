@@ -0,0 +1,105 @@
+"""
+محرك تأثيرات الترقيات (Upgrade Effects).
+
+كل مستويات الترقيات المملوكة تُطوى في متجه تأثيرات واحد (Effects) يُحسب
+مرة واحدة ويُخزَّن، ولا يُعاد حسابه إلا بعد invalidate() (أي عند شراء ترقية).
+مستوى كل ترقية يُحصر في max_level الخاص بها من الكتالوج (مستوى محفوظ أعلى، من
+كتالوج أقدم مثلًا، لا يضاعف التأثير).
+أنواع التأثيرات معرّفة في جدول EFFECT_KINDS، فإضافة نوع جديد سطر واحد بلا
+تفرعات if جديدة. الوحدة لا تعتمد على Kivy ويمكن اختبارها مباشرة.
+"""
+from collections import namedtuple
+
+from catalog import CatalogError
+
+# --- حقول متجه التأثيرات وقيمها الأساسية ---
+BASE_EFFECTS = {
+    "click_multiplier": 1.0,     # مضاعف النقرات
+    "penalty_time": 1.0,         # عقوبة النقر على زر DON'T TAP (ثوانٍ)
+    "foe_spawn_rate": 1.0,       # مضاعف سرعة ظهور زر DON'T TAP
+    "powerup_spawn_rate": 1.0,   # مضاعف سرعة ظهور زر +TIME
+    "bonus_time": 0.0,           # وقت إضافي عند بداية اللعبة (ثوانٍ)
+    "coin_yield": 1.0,           # مضاعف العملات المكتسبة
+}
+
+Effects = namedtuple('Effects', tuple(BASE_EFFECTS))
+
+# --- أنواع التأثيرات: اسم التأثير في الكتالوج -> (الحقل، الإشارة) ---
+# كل مستوى يضيف (الإشارة × القيمة) إلى الحقل.
+EFFECT_KINDS = {
+    "multiplier_increase": ("click_multiplier", +1),
+    "penalty_reduction": ("penalty_time", -1),
+    "foe_spawn_rate": ("foe_spawn_rate", +1),
+    "powerup_spawn_rate": ("powerup_spawn_rate", +1),
+    "bonus_time": ("bonus_time", +1),
+    "coin_yield": ("coin_yield", +1),
+}
+
+# --- حدود دنيا للحقول بعد تطبيق كل الترقيات ---
+EFFECT_MINIMUMS = {
+    "penalty_time": 0.1,
+    "foe_spawn_rate": 0.1,
+    "powerup_spawn_rate": 0.1,
+}
+
+_FIELD_INDEX = {field: i for i, field in enumerate(Effects._fields)}
+
+
+def base_effects(**overrides):
+    """متجه التأثيرات الأساسي (بدون أي ترقية) مع إمكانية تعديل القيم الأساسية."""
+    unknown = set(overrides) - set(BASE_EFFECTS)
+    if unknown:
+        raise KeyError(f"unknown effect fields {sorted(unknown)}")
+    return Effects(**dict(BASE_EFFECTS, **overrides))
+
+
+def item_deltas(item):
+    """تحويل تأثير عنصر ترقية إلى ((فهرس الحقل، الزيادة لكل مستوى), ...)."""
+    deltas = []
+    for name, amount in item['effect'].items():
+        if name not in EFFECT_KINDS:
+            raise CatalogError(f"upgrade {item['id']!r}: unknown effect {name!r}")
+        field, sign = EFFECT_KINDS[name]
+        deltas.append((_FIELD_INDEX[field], sign * amount))
+    return tuple(deltas)
+
+
+def compute_effects(deltas_by_item, levels, base, max_levels=None):
+    """طي المستويات المملوكة في متجه واحد (دالة نقية). max_levels: {item_id: أقصى مستوى}."""
+    values = list(base)
+    for item_id, level in levels.items():
+        if max_levels is not None:
+            level = min(level, max_levels.get(item_id, level))
+        if level <= 0:
+            continue
+        for index, delta in deltas_by_item.get(item_id, ()):
+            values[index] += delta * level
+    for field, minimum in EFFECT_MINIMUMS.items():
+        index = _FIELD_INDEX[field]
+        values[index] = max(minimum, values[index])
+    return Effects(*values)
+
+
+class EffectsEngine:
+    """
+    يحسب متجه التأثيرات من مستويات الترقيات ويخزّنه.
+    levels_provider: دالة تُرجع {item_id: level} (مثل ProfileRepository.upgrade_levels).
+    """
+
+    def __init__(self, catalog, levels_provider, base=None):
+        self.base = base if base is not None else base_effects()
+        self.levels_provider = levels_provider
+        # التحقق من أنواع التأثيرات وحساب زيادات كل عنصر مرة واحدة
+        upgrades = catalog.of_type('upgrade')
+        self._deltas = {item['id']: item_deltas(item) for item in upgrades}
+        self._max_levels = {item['id']: item['max_level'] for item in upgrades}
+        self._cached = None
+
+    def current(self):
+        """متجه التأثيرات الحالي (بحث في الذاكرة ما لم يُلغَ التخزين)."""
+        if self._cached is None:
+            self._cached = compute_effects(self._deltas, self.levels_provider(), self.base, self._max_levels)
+        return self._cached
+
+    def invalidate(self, *args):
+        self._cached = None